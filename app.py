@@ -1,37 +1,68 @@
+import argparse
+import asyncio
+import json
 import os
-from typing import Dict, List, Optional
+import time
+from typing import AsyncIterator, Dict, List, Optional
 
-import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
-from chains.translation_chain import create_translation_chain
-from utils.tongyi_utils import validate_credentials
+from utils.app_services import AppServices
+from utils.document_segmenter import reassemble_document, segment_document
+from utils.metrics import (
+    HTTP_REQUEST_SECONDS,
+    REGISTRY,
+    server_timing_header,
+    start_request_timing,
+)
+from utils.translation_jobs import COMPLETED
 
 # 加载环境变量
 load_dotenv()
 
-# 初始化FastAPI应用
-app = FastAPI()
+# 是否在响应中附加Server-Timing头，列出本次请求各阶段的耗时
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING", "false").lower() in ("1", "true", "yes")
 
-# 挂载静态文件
-app.mount("/.well-known", StaticFiles(directory=".well-known"), name="well-known")
+# 文档切块的默认最大字符数（与TranslationTool一致，此处读取环境变量以免提前导入langchain）
+DOCUMENT_CHUNK_CHARS = int(os.getenv("DOCUMENT_CHUNK_CHARS", "1500"))
 
-# 配置CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# 翻译链等重量级组件，启动后在后台预热
+services = AppServices()
+
+router = APIRouter()
 
-# 检查是否设置了凭证
-if not validate_credentials():
-    print("警告：通义千问API密钥未正确配置！请检查DASHSCOPE_API_KEY环境变量。")
+
+async def record_request_metrics(request: Request, call_next):
+    # 记录请求耗时；开启SERVER_TIMING时收集各阶段耗时写入响应头
+    start = time.perf_counter()
+    timings = start_request_timing() if SERVER_TIMING_ENABLED else None
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+
+    # 只按已注册的路由（或挂载点）路径统计，避免任意路径造成标签膨胀
+    route_paths = {route.path for route in request.app.routes}
+    path = request.url.path
+    if path not in route_paths:
+        path = next(
+            (prefix for prefix in route_paths if prefix and path.startswith(prefix + "/")),
+            "unmatched",
+        )
+    HTTP_REQUEST_SECONDS.observe(
+        elapsed, method=request.method, path=path, status=response.status_code
+    )
+    if timings is not None:
+        response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    return response
 
 
 # 请求模型
@@ -41,34 +72,152 @@ class TranslationRequest(BaseModel):
     target_language: str
     context: Optional[List[Dict[str, str]]] = None
     use_terminology: bool = True
+    glossaries: Optional[List[str]] = None  # 使用的术语表名称，为空时使用默认术语表
+    route: Optional[str] = None  # 路由标记（路由规则中的flag或后端名称），为空时按规则选择模型
 
 
 class TranslationResponse(BaseModel):
     translated_text: str
     detected_language: Optional[str] = None
+    language_confidence: Optional[float] = None  # 语言检测置信度 (0-1)
+    terminology_matches: Optional[List[Dict[str, str]]] = None
+    prompt_tokens: Optional[int] = None  # 估算的提示词token数
+
+
+class DocumentTranslationRequest(TranslationRequest):
+    max_chunk_chars: Optional[int] = None
+
+
+class DocumentTranslationResponse(TranslationResponse):
+    chunks: int
+
+
+class BatchTranslationRequest(BaseModel):
+    segments: List[str]
+    source_language: str = "auto"  # 'zh'、'en'或'auto'
+    target_language: str
+    context: Optional[List[Dict[str, str]]] = None
+    use_terminology: bool = True
+    glossaries: Optional[List[str]] = None
+    route: Optional[str] = None
+
+
+class BatchTranslationItem(BaseModel):
+    index: int
+    status: str  # 'success'或'error'
+    translated_text: Optional[str] = None
+    detected_language: Optional[str] = None
+    language_confidence: Optional[float] = None
     terminology_matches: Optional[List[Dict[str, str]]] = None
+    prompt_tokens: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BatchTranslationResponse(BaseModel):
+    results: List[BatchTranslationItem]
+    succeeded: int
+    failed: int
+
 
+class JobRequest(BaseModel):
+    segments: Optional[List[str]] = None  # 片段列表，与text二选一
+    text: Optional[str] = None  # 整篇文档，按块切分后翻译，下载时拼接为全文
+    source_language: str = "auto"  # 'zh'、'en'或'auto'
+    target_language: str
+    context: Optional[List[Dict[str, str]]] = None
+    use_terminology: bool = True
+    glossaries: Optional[List[str]] = None
+    route: Optional[str] = None
+    max_chunk_chars: Optional[int] = None
 
-# 初始化翻译链
-translation_chain = create_translation_chain()
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str  # 'queued'、'running'、'completed'或'cancelled'
+    total: int
+    completed: int
+    failed: int
+    progress: float  # 已处理片段占比 (0-1)
+    created_at: float
+    updated_at: float
+
+
+class JobResultItem(BaseModel):
+    index: int
+    status: str  # 'pending'、'running'、'done'或'error'
+    translated_text: Optional[str] = None
+    detected_language: Optional[str] = None
+    error: Optional[str] = None
 
 
-@app.get("/")
+class JobResultsResponse(BaseModel):
+    job_id: str
+    status: str
+    results: List[JobResultItem]
+    next_offset: Optional[int] = None  # 为空表示已到末尾
+
+
+class TermItem(BaseModel):
+    term: str
+    translation: str
+
+
+class TerminologyUpdateRequest(BaseModel):
+    terms: List[TermItem]
+    glossary: str = "default"  # 写入的术语表，不存在时自动创建
+
+
+async def _check_glossaries(glossaries: Optional[List[str]]) -> None:
+    # 翻译前校验术语表名称，未知术语表直接返回404而不是在翻译中途报错
+    if not glossaries:
+        return
+    registry = (await services.atranslation_tool()).glossary_registry
+    for name in glossaries:
+        try:
+            exists = registry.exists(name)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not exists:
+            raise HTTPException(status_code=404, detail=f"术语表不存在：{name}")
+    # 在工作线程中预先加载术语表（读取JSON、重放WAL、构建索引），避免阻塞事件循环
+    await asyncio.to_thread(registry.resolve, glossaries)
+
+
+async def _check_route(route: Optional[str]) -> None:
+    # 未知的路由标记直接返回400，而不是静默使用默认模型
+    if not route:
+        return
+    await services.atranslation_chain()
+    from utils.tongyi_utils import get_model_router
+
+    flags = get_model_router().flags()
+    if route not in flags:
+        raise HTTPException(
+            status_code=400, detail=f"未知的路由标记：{route}（可用：{', '.join(flags)}）"
+        )
+
+
+@router.get("/")
 async def root():
     return {"message": "翻译插件API正在运行"}
 
 
-@app.post("/translate", response_model=TranslationResponse)
+@router.post("/translate", response_model=TranslationResponse)
 async def translate(request: TranslationRequest):
+    await _check_glossaries(request.glossaries)
+    await _check_route(request.route)
     try:
-        # 通过LangChain处理翻译请求
-        result = translation_chain.invoke(
+        # 通过LangChain异步处理翻译请求，避免阻塞事件循环
+        translation_chain = await services.atranslation_chain()
+        result = await translation_chain.ainvoke(
             {
                 "text": request.text,
                 "source_language": request.source_language,
                 "target_language": request.target_language,
                 "context": request.context or [],
                 "use_terminology": request.use_terminology,
+                "glossaries": request.glossaries,
+                "route": request.route,
             }
         )
 
@@ -78,10 +227,401 @@ async def translate(request: TranslationRequest):
         raise HTTPException(status_code=500, detail=f"翻译错误：{str(e)}")
 
 
-@app.get("/health")
+def format_sse(event: str, data: Dict) -> str:
+    """格式化为Server-Sent Events消息"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/translate/stream")
+async def translate_stream(request: TranslationRequest):
+    await _check_glossaries(request.glossaries)
+    await _check_route(request.route)
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            translation_tool = await services.atranslation_tool()
+            async for item in translation_tool.astream(
+                text=request.text,
+                source_language=request.source_language,
+                target_language=request.target_language,
+                context=request.context or [],
+                use_terminology=request.use_terminology,
+                glossaries=request.glossaries,
+                route=request.route,
+            ):
+                yield format_sse(item["event"], item["data"])
+        except Exception as e:
+            print(f"流式翻译错误：{str(e)}")
+            yield format_sse("error", {"detail": f"翻译错误：{str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/translate/document", response_model=DocumentTranslationResponse)
+async def translate_document(request: DocumentTranslationRequest):
+    await _check_glossaries(request.glossaries)
+    await _check_route(request.route)
+    try:
+        translation_tool = await services.atranslation_tool()
+        return await translation_tool.atranslate_document(
+            text=request.text,
+            source_language=request.source_language,
+            target_language=request.target_language,
+            context=request.context or [],
+            use_terminology=request.use_terminology,
+            max_chunk_chars=request.max_chunk_chars,
+            glossaries=request.glossaries,
+            route=request.route,
+        )
+    except Exception as e:
+        print(f"文档翻译错误：{str(e)}")
+        raise HTTPException(status_code=500, detail=f"文档翻译错误：{str(e)}")
+
+
+@router.post("/translate/batch", response_model=BatchTranslationResponse)
+async def translate_batch(request: BatchTranslationRequest):
+    await _check_glossaries(request.glossaries)
+    await _check_route(request.route)
+    try:
+        translation_tool = await services.atranslation_tool()
+        results = await translation_tool.abatch_translate(
+            segments=request.segments,
+            source_language=request.source_language,
+            target_language=request.target_language,
+            context=request.context or [],
+            use_terminology=request.use_terminology,
+            glossaries=request.glossaries,
+            route=request.route,
+        )
+
+        succeeded = sum(1 for item in results if item["status"] == "success")
+        return {
+            "results": results,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+        }
+    except Exception as e:
+        print(f"批量翻译错误：{str(e)}")
+        raise HTTPException(status_code=500, detail=f"批量翻译错误：{str(e)}")
+
+
+@router.post("/terminology")
+async def add_terminology(request: TerminologyUpdateRequest):
+    registry = (await services.atranslation_tool()).glossary_registry
+    try:
+        registry.path(request.glossary)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def add_terms() -> Dict:
+        # 写入期间持有术语表，避免它被淘汰关闭后写入不再刷盘
+        with registry.acquire([request.glossary], create=True) as (terminology_db,):
+            terminology_db.add_terms([item.model_dump() for item in request.terms])
+            return terminology_db.stats()
+
+    try:
+        # 新术语表首次加载需要构建索引，与写入（文件IO和索引更新）一起放到线程池中执行
+        stats = await asyncio.to_thread(add_terms)
+        return {
+            "glossary": request.glossary,
+            "updated": len(request.terms),
+            **stats,
+        }
+    except Exception as e:
+        print(f"更新术语错误：{str(e)}")
+        raise HTTPException(status_code=500, detail=f"更新术语错误：{str(e)}")
+
+
+@router.get("/glossaries")
+async def list_glossaries():
+    # 可用的术语表名称，以及当前已加载术语表的状态
+    registry = (await services.atranslation_tool()).glossary_registry
+    return {"glossaries": await asyncio.to_thread(registry.names), **registry.stats()}
+
+
+@router.get("/livez")
+async def liveness():
+    # 存活检查：进程能处理请求即可，不依赖预热
+    return {"status": "alive"}
+
+
+@router.get("/readyz")
+async def readiness():
+    # 就绪检查：预热完成后才接收流量
+    if not services.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming_up", "error": services.error},
+        )
+    return {"status": "ready", "warmup_seconds": round(services.warmup_seconds, 3)}
+
+
+@router.get("/health")
 async def health_check():
-    return {"status": "健康"}
+    if not services.ready:
+        return JSONResponse(
+            status_code=503, content={"status": "启动中", "error": services.error}
+        )
+
+    from utils.tongyi_utils import upstream_stats
+
+    translation_tool = services.translation_chain.translation_tool
+    return {
+        "status": "健康",
+        "cache": translation_tool.cache.stats(),
+        "translation_memory": (
+            translation_tool.memory.stats() if translation_tool.memory is not None else None
+        ),
+        "terminology": translation_tool.terminology_db.stats(),
+        "glossaries": translation_tool.glossary_registry.stats(),
+        "coalescing": translation_tool.flights.stats(),
+        "upstream": upstream_stats(),
+    }
+
+
+async def _get_job_runner():
+    await services.atranslation_chain()
+    if services.job_runner is None:
+        raise HTTPException(status_code=503, detail="批量任务未启用（JOB_WORKERS=0）")
+    return services.job_runner
+
+
+def _job_status(job: Dict) -> Dict:
+    processed = job["completed"] + job["failed"]
+    return {
+        **job,
+        "progress": round(processed / job["total"], 4) if job["total"] else 1.0,
+    }
+
+
+async def _get_job(job_id: str) -> Dict:
+    # 任务存储的调用可能等待执行器持有的写锁，放到工作线程中执行，避免阻塞事件循环
+    job = await asyncio.to_thread((await _get_job_runner()).store.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在：{job_id}")
+    return job
+
+
+@router.post("/jobs", response_model=JobStatusResponse, status_code=202)
+async def create_job(request: JobRequest):
+    runner = await _get_job_runner()
+    await _check_glossaries(request.glossaries)
+    await _check_route(request.route)
+    if (request.segments is None) == (request.text is None):
+        raise HTTPException(status_code=400, detail="segments和text必须且只能提供一个")
+
+    separators = None
+    segments = request.segments
+    if request.text is not None:
+        segments, separators = segment_document(
+            request.text, request.max_chunk_chars or DOCUMENT_CHUNK_CHARS
+        )
+    if not segments:
+        raise HTTPException(status_code=400, detail="没有需要翻译的内容")
+
+    job = await runner.submit(
+        segments=segments,
+        source_language=request.source_language,
+        target_language=request.target_language,
+        context=request.context,
+        use_terminology=request.use_terminology,
+        separators=separators,
+        glossaries=request.glossaries,
+        route=request.route,
+    )
+    return _job_status(job)
+
+
+@router.post("/jobs/file", response_model=JobStatusResponse, status_code=202)
+async def create_job_from_file(
+    request: Request,
+    target_language: str,
+    source_language: str = "auto",
+    use_terminology: bool = True,
+    mode: str = "lines",
+    glossaries: Optional[List[str]] = Query(None),
+    route: Optional[str] = None,
+):
+    # 请求体为UTF-8纯文本文件；lines模式每行一个片段，document模式按文档切块
+    runner = await _get_job_runner()
+    await _check_glossaries(glossaries)
+    await _check_route(route)
+    if mode not in ("lines", "document"):
+        raise HTTPException(status_code=400, detail="mode必须为lines或document")
+    try:
+        text = (await request.body()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="文件必须为UTF-8编码的文本")
+
+    separators = None
+    if mode == "lines":
+        segments = text.splitlines()
+    else:
+        segments, separators = segment_document(text, DOCUMENT_CHUNK_CHARS)
+    if not any(segment.strip() for segment in segments):
+        raise HTTPException(status_code=400, detail="没有需要翻译的内容")
+
+    job = await runner.submit(
+        segments=segments,
+        source_language=source_language,
+        target_language=target_language,
+        use_terminology=use_terminology,
+        separators=separators,
+        glossaries=glossaries,
+        route=route,
+    )
+    return _job_status(job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    return _job_status(await _get_job(job_id))
+
+
+@router.delete("/jobs/{job_id}", response_model=JobStatusResponse)
+async def cancel_job(job_id: str):
+    await _get_job(job_id)
+    await asyncio.to_thread((await _get_job_runner()).store.cancel_job, job_id)
+    return _job_status(await _get_job(job_id))
+
+
+@router.get("/jobs/{job_id}/results", response_model=JobResultsResponse)
+async def get_job_results(job_id: str, offset: int = 0, limit: int = 1000):
+    # 按片段下标分页，客户端可从上次的next_offset继续拉取
+    job = await _get_job(job_id)
+    limit = max(1, min(limit, 10000))
+    results = await asyncio.to_thread(
+        (await _get_job_runner()).store.results, job_id, offset, limit
+    )
+    next_offset = results[-1]["index"] + 1 if len(results) == limit else None
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "results": results,
+        "next_offset": next_offset,
+    }
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_job(job_id: str, format: str = "jsonl"):
+    # jsonl逐行输出每个片段的结果；text输出拼接后的译文，需任务已完成
+    job = await _get_job(job_id)
+    store = (await _get_job_runner()).store
+
+    if format == "jsonl":
+        def lines():
+            for item in store.iter_results(job_id):
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(
+            lines(),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{job_id}.jsonl"'},
+        )
+
+    if format != "text":
+        raise HTTPException(status_code=400, detail="format必须为jsonl或text")
+    if job["status"] != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"任务尚未完成：{job['status']}")
+
+    translations = await asyncio.to_thread(store.translations, job_id)
+    if job["separators"] is not None:
+        content = reassemble_document(translations, job["separators"])
+    else:
+        content = "\n".join(translations)
+    return Response(
+        content,
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{job_id}.txt"'},
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus文本格式；多worker模式下每个进程各自统计
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def create_app(warm_up: bool = True) -> FastAPI:
+    """创建FastAPI应用
+
+    只注册路由和中间件，不导入langchain等重量级依赖，存活检查立即可用；
+    翻译链、术语索引等组件在启动后由后台任务预热，预热完成后就绪检查才返回200。
+
+    Args:
+        warm_up: 是否在启动时后台预热；为False时在首个请求到达时构建
+
+    Returns:
+        FastAPI应用
+    """
+    app = FastAPI()
+
+    # 挂载静态文件
+    app.mount("/.well-known", StaticFiles(directory=".well-known"), name="well-known")
+
+    # 配置CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.middleware("http")(record_request_metrics)
+    app.include_router(router)
+
+    warmup_tasks = []
+
+    @app.on_event("startup")
+    async def start_warm_up():
+        # 后台预热，不阻塞服务启动；完成后启动批量任务worker，续跑未完成的任务
+        if warm_up:
+            warmup_tasks.append(asyncio.create_task(services.awarm_up()))
+
+    @app.on_event("shutdown")
+    async def close_services():
+        for task in warmup_tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*warmup_tasks, return_exceptions=True)
+        await services.aclose()
+
+    return app
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="翻译插件API服务")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WORKERS", "1")),
+        help="worker进程数，大于1时以生产模式运行（关闭自动重载）",
+    )
+    args = parser.parse_args()
+
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "8000"))
+
+    if args.workers > 1:
+        # 生产模式：各worker内存映射同一份术语索引，写入时加文件锁追加共享的写前日志，
+        # 其他worker在后台读取日志增量，检查点发布新版本索引后原子切换
+        os.environ.setdefault("TERMINOLOGY_SHARED", "1")
+        os.environ.setdefault("TERMINOLOGY_RELOAD_INTERVAL", "2")
+        services.build()
+        terminology_db = services.translation_chain.translation_tool.terminology_db
+        if terminology_db.generation == 0:
+            terminology_db.save_index()
+        uvicorn.run("app:app", host=host, port=port, workers=args.workers)
+    else:
+        uvicorn.run("app:app", host=host, port=port, reload=True)
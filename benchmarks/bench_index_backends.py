@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+术语索引后端基准测试 - 报告近似后端相对暴力检索的召回率与查询延迟
+
+用法:
+    python -m benchmarks.bench_index_backends --sizes 10000 100000 --max-postings 50 100 200 500
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_terminology import (  # noqa: E402
+    build_database,
+    make_glossary,
+    make_vocabulary,
+)
+from utils.index_backends import BruteForceBackend, PrunedInvertedBackend  # noqa: E402
+
+
+def make_queries(rng, words, glossary, count):
+    """生成包含（带拼写扰动的）术语的查询句子"""
+    queries = []
+    for _ in range(count):
+        term = rng.choice(glossary)["term"]
+        if len(term) > 4 and rng.random() < 0.5:
+            pos = rng.randrange(len(term))
+            term = term[:pos] + rng.choice("abcdefghijklmnopqrstuvwxyz") + term[pos + 1:]
+        filler = [rng.choice(words) for _ in range(rng.randint(4, 12))]
+        filler.insert(rng.randrange(len(filler) + 1), term)
+        queries.append(" ".join(filler))
+    return queries
+
+
+def timed_search(db, queries):
+    """返回逐条查询结果及平均延迟（毫秒）"""
+    start = time.perf_counter()
+    results = db.search_many(queries)
+    elapsed = (time.perf_counter() - start) * 1000
+    return [{item["term"] for item in matches} for matches in results], elapsed / len(queries)
+
+
+def recall(expected, actual):
+    """以暴力检索结果为基准计算召回率"""
+    total = sum(len(items) for items in expected)
+    if total == 0:
+        return 1.0
+    hits = sum(len(e & a) for e, a in zip(expected, actual))
+    return hits / total
+
+
+def run(sizes, max_postings_values, query_count, seed):
+    """运行基准测试
+
+    Returns:
+        每个 (术语数, 后端配置) 组合的召回率与延迟
+    """
+    rng = random.Random(seed)
+    words = make_vocabulary(rng)
+    results = []
+
+    for size in sizes:
+        glossary = make_glossary(rng, words, size)
+        db = build_database(glossary)
+        queries = make_queries(rng, words, glossary, query_count)
+
+        db.backend = BruteForceBackend()
+        # 预热倒排索引，不计入查询延迟
+        db.search_many(queries[:1])
+        expected, brute_ms = timed_search(db, queries)
+        results.append({
+            "glossary_size": size,
+            "backend": "brute",
+            "recall": 1.0,
+            "latency_ms": round(brute_ms, 3),
+        })
+        print(f"术语数 {size:>8} | brute{'':<26} | 召回 100.0% | {brute_ms:>8.3f} ms/查询")
+
+        for max_postings in max_postings_values:
+            db.backend = PrunedInvertedBackend(max_postings=max_postings)
+            # 预热倒排索引，不计入查询延迟
+            db.search_many(queries[:1])
+            actual, pruned_ms = timed_search(db, queries)
+            value = recall(expected, actual)
+            results.append({
+                "glossary_size": size,
+                "backend": "pruned",
+                "max_postings": max_postings,
+                "recall": round(value, 4),
+                "latency_ms": round(pruned_ms, 3),
+            })
+            label = f"pruned(max_postings={max_postings})"
+            print(
+                f"术语数 {size:>8} | {label:<31} | 召回 {value * 100:>5.1f}% | "
+                f"{pruned_ms:>8.3f} ms/查询"
+            )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="术语索引后端召回率/延迟基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--max-postings", type=int, nargs="+", default=[50, 100, 200, 500])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    print("🚀 开始术语索引后端基准测试...\n")
+    results = run(args.sizes, args.max_postings, args.queries, args.seed)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 结果已写入 {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+模型路由基准测试 - 对比单一模型、按长度路由、路由+对冲三种配置的延迟分布和估算费用
+
+启动两个DashScope模拟服务作为模型后端：
+    turbo  低价、低延迟（模拟qwen-turbo）
+    plus   高价、较高延迟（模拟qwen-plus）
+两者都按--slow-rate的比例注入长尾延迟。工作负载由短界面文案和长段落混合组成，
+每种配置在独立子进程中按相应的TONGYI_BACKENDS/TONGYI_ROUTES环境变量直接调用acall_tongyi_api：
+    single        全部请求使用plus（原先的固定模型）
+    routed        短文本使用turbo，长文本使用plus，不对冲
+    routed+hedge  同routed，首选后端超过其p95未返回时向另一个后端发出对冲请求
+
+用法:
+    python -m benchmarks.bench_router --requests 1000 --concurrency 16 --json router.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.load_test import stop_servers, wait_until_ready  # noqa: E402
+from benchmarks.report import format_summary, summarize, write_report  # noqa: E402
+
+SCENARIOS = ("single", "routed", "routed+hedge")
+# 短文本的字符数上限，不超过时路由到turbo
+SHORT_CHARS = 80
+
+UI_STRINGS = [
+    "Save", "Cancel", "Delete file", "Settings", "Sign in", "Log out",
+    "Upload complete", "Are you sure?", "Search results", "No items found",
+    "Retry", "Copy link", "Open in new tab", "Change password", "Help center",
+]
+PROSE = (
+    "Machine translation systems must balance fluency against faithfulness to the source, "
+    "and terminology consistency matters as much as grammar when documents are long. "
+    "A good system keeps product names, units and legal phrasing intact while still "
+    "producing text that reads naturally in the target language. "
+)
+
+
+def make_texts(rng, count, short_ratio):
+    """生成短界面文案与长段落混合的工作负载"""
+    texts = []
+    for index in range(count):
+        if rng.random() < short_ratio:
+            texts.append(f"{rng.choice(UI_STRINGS)} ({index})")
+        else:
+            texts.append(PROSE * rng.randint(1, 3) + f"({index})")
+    return texts
+
+
+def scenario_env(name, ports, hedge_ratio):
+    """返回场景对应的路由配置环境变量"""
+    backends = {
+        "turbo": {"name": "turbo", "model": "qwen-turbo", "cost": 0.3,
+                  "base_url": f"http://127.0.0.1:{ports[0]}/api/v1"},
+        "plus": {"name": "plus", "model": "qwen-plus", "cost": 0.8,
+                 "base_url": f"http://127.0.0.1:{ports[1]}/api/v1"},
+    }
+    env = {"TONGYI_RATE_LIMIT_RPS": "0", "DASHSCOPE_API_KEY": "mock"}
+    if name == "single":
+        env["TONGYI_BACKENDS"] = json.dumps([backends["plus"]])
+        env["TONGYI_HEDGE_RATIO"] = "0"
+        return env
+
+    env["TONGYI_BACKENDS"] = json.dumps([backends["turbo"], backends["plus"]])
+    env["TONGYI_ROUTES"] = json.dumps([
+        {"max_chars": SHORT_CHARS, "backends": ["turbo", "plus"]},
+        {"backends": ["plus", "turbo"]},
+    ])
+    env["TONGYI_HEDGE_RATIO"] = str(hedge_ratio) if name == "routed+hedge" else "0"
+    return env
+
+
+def measure(name, env, texts, concurrency):
+    """在子进程中运行：按场景配置路由器并以固定并发翻译全部文本"""
+    os.environ.update(env)
+    from utils.model_router import make_route
+    from utils.tongyi_utils import acall_tongyi_api, create_tongyi_messages, get_model_router
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        timings = []
+        failures = 0
+
+        async def one(text):
+            nonlocal failures
+            messages = create_tongyi_messages(text, "en", "zh")
+            async with semaphore:
+                begin = time.perf_counter()
+                response = await acall_tongyi_api(
+                    messages, max_retries=1, route=make_route(text, "en", "zh")
+                )
+                timings.append((time.perf_counter() - begin) * 1000)
+                if not response["success"]:
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one(text) for text in texts])
+        elapsed = time.perf_counter() - start
+        router = get_model_router()
+        stats = router.stats()
+        await router.aclose()
+        return timings, elapsed, failures, stats
+
+    timings, elapsed, failures, stats = asyncio.run(run())
+    result = summarize(timings, elapsed, failures, scenario=name)
+    result["estimated_cost"] = round(
+        sum(backend["estimated_cost"] for backend in stats["backends"].values()), 4
+    )
+    result["hedges"] = stats["hedges"]
+    result["hedge_wins"] = stats["hedge_wins"]
+    result["backend_requests"] = {
+        backend_name: backend["requests"] for backend_name, backend in stats["backends"].items()
+    }
+    return result
+
+
+def start_backends(args):
+    """启动turbo和plus两个模拟后端"""
+    processes = []
+    for port, latency in ((args.turbo_port, args.turbo_latency), (args.plus_port, args.plus_latency)):
+        processes.append(subprocess.Popen(
+            [
+                sys.executable, "-m", "benchmarks.mock_dashscope",
+                "--port", str(port),
+                "--latency", str(latency),
+                "--jitter", str(latency * 0.2),
+                "--slow-rate", str(args.slow_rate),
+                "--slow-latency", str(args.slow_latency),
+            ],
+            cwd=ROOT,
+        ))
+    try:
+        for port, process in zip((args.turbo_port, args.plus_port), processes):
+            wait_until_ready(f"http://127.0.0.1:{port}/stats", process)
+    except Exception:
+        stop_servers(processes)
+        raise
+    return processes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模型路由与对冲请求基准")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--short-ratio", type=float, default=0.7, help="短界面文案的比例")
+    parser.add_argument("--hedge-ratio", type=float, default=0.1, help="对冲请求数上限比例")
+    parser.add_argument("--turbo-port", type=int, default=8011)
+    parser.add_argument("--plus-port", type=int, default=8012)
+    parser.add_argument("--turbo-latency", type=float, default=0.05)
+    parser.add_argument("--plus-latency", type=float, default=0.2)
+    parser.add_argument("--slow-rate", type=float, default=0.03, help="长尾请求的比例")
+    parser.add_argument("--slow-latency", type=float, default=1.5, help="长尾请求的附加延迟（秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    texts = make_texts(random.Random(args.seed), args.requests, args.short_ratio)
+    context = multiprocessing.get_context("fork")
+
+    print("🚀 开始模型路由基准测试...\n")
+    processes = start_backends(args)
+    results = []
+    try:
+        for name in args.scenarios:
+            env = scenario_env(name, (args.turbo_port, args.plus_port), args.hedge_ratio)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(measure, name, env, texts, args.concurrency).result()
+            print(
+                format_summary(result, f"{name:<12}")
+                + f" | 估算费用 {result['estimated_cost']:>8.3f}"
+                + f" | 对冲 {result['hedges']}（胜出 {result['hedge_wins']}）"
+                + f" | 后端请求 {result['backend_requests']}"
+            )
+            results.append(result)
+    finally:
+        stop_servers(processes)
+
+    if args.json_path:
+        write_report(args.json_path, results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
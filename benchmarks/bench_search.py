@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+术语检索微基准 - 测量search/batch_search单次调用在不同术语库规模下的p50/p95/p99延迟
+
+用法:
+    python -m benchmarks.bench_search --sizes 1000 10000 100000 --queries 500 --json search.json
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_index_backends import make_queries  # noqa: E402
+from benchmarks.bench_terminology import (  # noqa: E402
+    build_database,
+    make_glossary,
+    make_vocabulary,
+)
+from benchmarks.report import format_summary, summarize, write_report  # noqa: E402
+
+# (操作名, 调用方式)
+OPERATIONS = {
+    "search": lambda db, text: db.search(text),
+    "batch_search_exact": lambda db, text: db.batch_search(text, mode="exact"),
+    "batch_search_fuzzy": lambda db, text: db.batch_search(text, mode="fuzzy"),
+    "batch_search_hybrid": lambda db, text: db.batch_search(text, mode="hybrid"),
+}
+
+
+def timed_calls(func, db, queries):
+    """逐条调用并记录每次的耗时（毫秒），返回 (耗时列表, 总秒数)"""
+    timings = []
+    start = time.perf_counter()
+    for text in queries:
+        begin = time.perf_counter()
+        func(db, text)
+        timings.append((time.perf_counter() - begin) * 1000)
+    return timings, time.perf_counter() - start
+
+
+def run(sizes, operations, query_count, seed):
+    """运行基准测试
+
+    Returns:
+        每个 (术语数, 操作) 组合的延迟分布与吞吐
+    """
+    rng = random.Random(seed)
+    words = make_vocabulary(rng)
+    results = []
+
+    for size in sizes:
+        glossary = make_glossary(rng, words, size)
+        db = build_database(glossary)
+        queries = make_queries(rng, words, glossary, query_count)
+
+        for name in operations:
+            func = OPERATIONS[name]
+            # 预热索引和匹配自动机，不计入延迟
+            func(db, queries[0])
+            timings, elapsed = timed_calls(func, db, queries)
+            result = summarize(timings, elapsed, operation=name, glossary_size=size)
+            results.append(result)
+            print(format_summary(result, f"术语数 {size:>8} | {name:<20}"))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="术语检索延迟微基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument(
+        "--operations", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS)
+    )
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    print("🚀 开始术语检索微基准...\n")
+    results = run(args.sizes, args.operations, args.queries, args.seed)
+
+    if args.json_path:
+        write_report(args.json_path, results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
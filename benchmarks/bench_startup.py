@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+冷启动基准测试 - 导入耗时分析（python -X importtime）以及服务存活/就绪所需时间
+
+用法:
+    python -m benchmarks.bench_startup --modules app chains.translation_chain --runs 3 --json startup.json
+"""
+
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.report import write_report  # noqa: E402
+
+# python -X importtime 的输出行：import time: self [us] | cumulative | imported package
+_IMPORTTIME_PATTERN = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def profile_import(module, top):
+    """在新进程中导入模块，返回总耗时及累计耗时最高的直接依赖
+
+    Args:
+        module: 模块名
+        top: 返回的依赖数量
+
+    Returns:
+        {"module", "import_ms", "top_imports": [{"module", "cumulative_ms"}]}
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    total = 0
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_PATTERN.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if name == module and indent == 0:
+            total = cumulative
+        # 缩进为2的是被测模块的直接依赖
+        elif indent == 2:
+            entries.append((cumulative, name))
+    entries.sort(reverse=True)
+    return {
+        "module": module,
+        "import_ms": round(total / 1000, 1),
+        "top_imports": [
+            {"module": name, "cumulative_ms": round(cumulative / 1000, 1)}
+            for cumulative, name in entries[:top]
+        ],
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def poll(url, deadline):
+    """轮询url直到返回200，返回成功时刻；超时返回None"""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.02)
+    return None
+
+
+def measure_startup(timeout):
+    """启动服务进程，返回存活（/livez）和就绪（/readyz）所需秒数"""
+    port = free_port()
+    env = dict(os.environ)
+    # 冷启动测量不需要真实上游
+    env.setdefault("DASHSCOPE_API_KEY", "mock")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + timeout
+        live = poll(f"http://127.0.0.1:{port}/livez", deadline)
+        ready = poll(f"http://127.0.0.1:{port}/readyz", deadline)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return (
+        round(live - start, 3) if live else None,
+        round(ready - start, 3) if ready else None,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动基准测试")
+    parser.add_argument("--modules", nargs="+", default=["app", "chains.translation_chain"])
+    parser.add_argument("--top", type=int, default=8, help="每个模块列出的耗时最高的依赖数")
+    parser.add_argument("--runs", type=int, default=3, help="服务启动测量次数")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    print("🚀 开始冷启动基准测试...\n")
+    results = []
+    for module in args.modules:
+        result = profile_import(module, args.top)
+        results.append({"kind": "import", **result})
+        print(f"导入 {module:<28} {result['import_ms']:>9.1f} ms")
+        for item in result["top_imports"]:
+            print(f"    {item['module']:<32} {item['cumulative_ms']:>9.1f} ms")
+
+    live_times, ready_times = [], []
+    for _ in range(args.runs):
+        live, ready = measure_startup(args.timeout)
+        live_times.append(live)
+        ready_times.append(ready)
+        print(f"\n启动 | 存活 {live} s | 就绪 {ready} s", end="")
+    print()
+
+    def median(values):
+        values = [value for value in values if value is not None]
+        return round(statistics.median(values), 3) if values else None
+
+    results.append({
+        "kind": "startup",
+        "runs": args.runs,
+        "live_s": live_times,
+        "ready_s": ready_times,
+        "live_median_s": median(live_times),
+        "ready_median_s": median(ready_times),
+    })
+    print(f"中位数 | 存活 {median(live_times)} s | 就绪 {median(ready_times)} s")
+
+    if args.json_path:
+        write_report(args.json_path, results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
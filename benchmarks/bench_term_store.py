@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+术语存储基准测试 - 对比 Python并行列表（+dict）与紧凑术语存储（TermStore）的内存占用和精确查找延迟
+
+每种存储在独立子进程中加载术语表，用tracemalloc统计加载后常驻的内存和加载过程中的峰值，
+再测量命中/未命中两类精确查找的单次延迟：
+    lists       并行列表，list.index查找（O(n)，仅用少量查询）
+    lists+dict  并行列表 + 术语到行号的dict
+    store       TermStore，从JSON构建
+    store-mmap  TermStore，从二进制索引中的数组以只读内存映射方式加载
+
+用法:
+    python -m benchmarks.bench_term_store --sizes 100000 1000000 --queries 20000 --json store.json
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_terminology import make_glossary, make_vocabulary  # noqa: E402
+from benchmarks.report import format_summary, summarize, write_report  # noqa: E402
+from utils.term_store import TermStore  # noqa: E402
+
+STORES = ("lists", "lists+dict", "store", "store-mmap")
+STORE_ARRAYS = ("slots", "term_arena", "translation_arena", "table")
+
+
+def load(kind, data_path, arrays_path):
+    """加载术语表并构建指定存储，返回 (存储对象, 查找函数)"""
+    if kind == "store-mmap":
+        store = TermStore.from_arrays({
+            name: np.load(os.path.join(arrays_path, f"{name}.npy"), mmap_mode="r")
+            for name in STORE_ARRAYS
+        })
+        return store, store.get
+
+    with open(data_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if kind == "store":
+        store = TermStore.from_items((item["term"], item["translation"]) for item in data)
+        del data
+        return store, store.get
+
+    terms = [item["term"] for item in data]
+    translations = [item["translation"] for item in data]
+    del data
+    if kind == "lists+dict":
+        term_ids = {term: idx for idx, term in enumerate(terms)}
+        return (terms, translations, term_ids), term_ids.get
+
+    def index_lookup(term):
+        try:
+            return terms.index(term)
+        except ValueError:
+            return None
+
+    return (terms, translations), index_lookup
+
+
+def timed_lookups(lookup, queries):
+    """逐条查找并记录耗时（毫秒），返回 (耗时列表, 总秒数)"""
+    timings = []
+    start = time.perf_counter()
+    for term in queries:
+        begin = time.perf_counter()
+        lookup(term)
+        timings.append((time.perf_counter() - begin) * 1000)
+    return timings, time.perf_counter() - start
+
+
+def measure(kind, data_path, arrays_path, size, hits, misses):
+    """在子进程中运行：加载存储，统计内存并测量查找延迟"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    holder, lookup = load(kind, data_path, arrays_path)
+    load_seconds = time.perf_counter() - start
+    gc.collect()
+    traced, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    results = [{
+        "store": kind,
+        "glossary_size": size,
+        "load_s": round(load_seconds, 3),
+        "traced_bytes": traced,
+        "bytes_per_term": round(traced / size, 1),
+        "peak_bytes": peak,
+    }]
+    for name, queries in (("hit", hits), ("miss", misses)):
+        timings, elapsed = timed_lookups(lookup, queries)
+        results.append(summarize(timings, elapsed, store=kind, glossary_size=size, lookup=name))
+    del holder
+    return results
+
+
+def run(sizes, stores, query_count, index_queries, seed):
+    """运行基准测试
+
+    Returns:
+        每个 (术语数, 存储) 组合的内存统计与查找延迟
+    """
+    rng = random.Random(seed)
+    words = make_vocabulary(rng)
+    results = []
+    context = multiprocessing.get_context("fork")
+
+    for size in sizes:
+        glossary = make_glossary(rng, words, size)
+        known = {item["term"] for item in glossary}
+        hits = [rng.choice(glossary)["term"] for _ in range(query_count)]
+        misses = []
+        while len(misses) < query_count:
+            term = " ".join(rng.choice(words) for _ in range(4))
+            if term not in known:
+                misses.append(term)
+        del known
+
+        with tempfile.TemporaryDirectory(prefix="bench_store_") as directory:
+            data_path = os.path.join(directory, "terminology.json")
+            with open(data_path, "w", encoding="utf-8") as f:
+                json.dump(glossary, f, ensure_ascii=False)
+            if "store-mmap" in stores:
+                store = TermStore.from_items(
+                    (item["term"], item["translation"]) for item in glossary
+                )
+                for name, array in store.to_arrays().items():
+                    np.save(os.path.join(directory, f"{name}.npy"), array)
+                del store
+
+            for kind in stores:
+                # list.index为O(n)，只取少量查询
+                count = index_queries if kind == "lists" else query_count
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    measured = pool.submit(
+                        measure, kind, data_path, directory, size, hits[:count], misses[:count]
+                    ).result()
+
+                memory, lookups = measured[0], measured[1:]
+                print(
+                    f"术语数 {size:>9} | {kind:<10} | 加载 {memory['load_s']:>7.2f} s | "
+                    f"内存 {memory['traced_bytes'] / 2 ** 20:>8.1f} MiB "
+                    f"({memory['bytes_per_term']:>6.1f} B/术语) | "
+                    f"峰值 {memory['peak_bytes'] / 2 ** 20:>8.1f} MiB"
+                )
+                for result in lookups:
+                    print(format_summary(result, f"    查找 {result['lookup']:<4}"))
+                results.extend(measured)
+        del glossary
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="术语存储内存与查找基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--stores", nargs="+", choices=STORES, default=list(STORES))
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument(
+        "--index-queries", type=int, default=20, help="lists（list.index）存储的查询数"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    print("🚀 开始术语存储基准测试...\n")
+    results = run(args.sizes, args.stores, args.queries, args.index_queries, args.seed)
+
+    if args.json_path:
+        write_report(args.json_path, results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+术语写入基准测试 - 对比写前日志追加与整表重写JSON的单次术语写入延迟
+
+在不同规模的术语库上逐条写入新术语，记录add_term的p50/p99延迟：
+    wal          追加写前日志，fsync由后台线程批量执行（默认配置）
+    wal-fsync    追加写前日志，每次写入都fsync
+    rewrite      旧实现：每次写入后把全部术语重新序列化并覆盖JSON文件
+同时记录写入后首次模糊检索（批量计算新术语向量）和一次检查点（重写JSON快照）的耗时。
+
+用法:
+    python -m benchmarks.bench_term_writes --sizes 10000 100000 --writes 500 --json writes.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_terminology import make_glossary, make_vocabulary  # noqa: E402
+from benchmarks.report import format_summary, summarize, write_report  # noqa: E402
+from utils.term_log import TermLog  # noqa: E402
+from utils.terminology_db import TerminologyDatabase  # noqa: E402
+
+MODES = ("wal", "wal-fsync", "rewrite")
+
+
+def rewrite_json(db):
+    """旧实现的保存方式：整表序列化后覆盖JSON文件"""
+    data = [
+        {"term": term, "translation": translation}
+        for term, translation in zip(db.terms, db.translations)
+    ]
+    with open(db.data_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def timed(func):
+    """执行一次并返回耗时（毫秒）"""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(mode, glossary, new_terms):
+    """在临时目录中加载术语库并逐条写入新术语
+
+    Returns:
+        写入延迟汇总，以及首次模糊检索和检查点的耗时
+    """
+    with tempfile.TemporaryDirectory(prefix="bench_writes_") as directory:
+        data_path = os.path.join(directory, "terminology.json")
+        with open(data_path, "w", encoding="utf-8") as f:
+            json.dump(glossary, f, ensure_ascii=False)
+
+        db = TerminologyDatabase(data_path=data_path)
+        db.log.close()
+        db.log = TermLog(db.log.path, sync_interval=0 if mode == "wal-fsync" else None)
+
+        timings = []
+        start = time.perf_counter()
+        for item in new_terms:
+            if mode == "rewrite":
+                def write():
+                    db.store.put(item["term"], item["translation"])
+                    rewrite_json(db)
+            else:
+                def write():
+                    db.add_term(item["term"], item["translation"])
+            timings.append(timed(write))
+        elapsed = time.perf_counter() - start
+
+        result = summarize(timings, elapsed, mode=mode, glossary_size=len(glossary))
+        result["first_fuzzy_search_ms"] = round(timed(lambda: db.search(new_terms[0]["term"])), 3)
+        if mode != "rewrite":
+            result["checkpoint_ms"] = round(timed(db.checkpoint), 3)
+        db.close()
+    return result
+
+
+def run(sizes, modes, writes, rewrite_writes, seed):
+    """运行基准测试
+
+    Returns:
+        每个 (术语数, 写入方式) 组合的写入延迟统计
+    """
+    rng = random.Random(seed)
+    words = make_vocabulary(rng)
+    results = []
+
+    for size in sizes:
+        glossary = make_glossary(rng, words, size + writes)
+        glossary, extra = glossary[:size], glossary[size:]
+
+        for mode in modes:
+            # 整表重写的单次耗时随术语库线性增长，只取少量写入
+            count = rewrite_writes if mode == "rewrite" else writes
+            result = measure(mode, glossary, extra[:count])
+            line = format_summary(result, f"术语数 {size:>8} | {mode:<9}")
+            line += f" | 首次模糊检索 {result['first_fuzzy_search_ms']:>8.2f} ms"
+            if "checkpoint_ms" in result:
+                line += f" | 检查点 {result['checkpoint_ms']:>8.2f} ms"
+            print(line)
+            results.append(result)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="术语写入延迟基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--writes", type=int, default=500)
+    parser.add_argument(
+        "--rewrite-writes", type=int, default=20, help="rewrite（整表重写）方式的写入次数"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    print("🚀 开始术语写入基准测试...\n")
+    results = run(args.sizes, args.modes, args.writes, args.rewrite_writes, args.seed)
+
+    if args.json_path:
+        write_report(args.json_path, results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+术语检索基准测试 - 对比逐句查询与批量向量化查询随句子数和术语库规模的扩展情况
+
+用法:
+    python -m benchmarks.bench_terminology --sizes 1000 10000 50000 --sentences 10 100 300
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.terminology_db import TerminologyDatabase  # noqa: E402
+
+
+def make_vocabulary(rng, size=5000):
+    """生成随机英文单词表"""
+    return [
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+        for _ in range(size)
+    ]
+
+
+def make_glossary(rng, words, size):
+    """生成包含size个术语的合成术语表"""
+    return [
+        {
+            "term": " ".join(rng.choice(words) for _ in range(rng.randint(1, 3))),
+            "translation": f"术语{i}",
+        }
+        for i in range(size)
+    ]
+
+
+def make_sentences(rng, words, count):
+    """生成count个随机句子"""
+    return [
+        " ".join(rng.choice(words) for _ in range(rng.randint(8, 20)))
+        for _ in range(count)
+    ]
+
+
+def build_database(glossary):
+    """在临时目录中构建术语数据库"""
+    directory = tempfile.mkdtemp(prefix="bench_terms_")
+    db = TerminologyDatabase(
+        data_path=os.path.join(directory, "terminology.json"), match_mode="fuzzy"
+    )
+    db.add_terms(glossary)
+    db.compact()
+    return db
+
+
+def measure(func, repeat):
+    """返回多次运行耗时的中位数（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(sizes, sentence_counts, repeat, seed):
+    """运行基准测试
+
+    Returns:
+        每个 (术语数, 句子数) 组合的测量结果
+    """
+    rng = random.Random(seed)
+    words = make_vocabulary(rng)
+    results = []
+
+    for size in sizes:
+        db = build_database(make_glossary(rng, words, size))
+
+        for count in sentence_counts:
+            sentences = make_sentences(rng, words, count)
+
+            loop_ms = measure(lambda: [db.search(s) for s in sentences], repeat)
+            batch_ms = measure(lambda: db.search_many(sentences), repeat)
+
+            results.append({
+                "glossary_size": size,
+                "sentences": count,
+                "loop_ms": round(loop_ms, 3),
+                "batch_ms": round(batch_ms, 3),
+                "speedup": round(loop_ms / batch_ms, 2) if batch_ms else None,
+            })
+            print(
+                f"术语数 {size:>8} | 句子数 {count:>5} | "
+                f"逐句 {loop_ms:>10.2f} ms | 批量 {batch_ms:>10.2f} ms | "
+                f"加速 {loop_ms / batch_ms:>6.1f}x"
+            )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="术语检索基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--sentences", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    print("🚀 开始术语检索基准测试...\n")
+    results = run(args.sizes, args.sentences, args.repeat, args.seed)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 结果已写入 {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+通义千问客户端基准测试 - 对比SDK逐次调用与HTTP连接池客户端的吞吐和延迟
+
+需要先启动模拟服务（或指向真实接口）:
+    python -m benchmarks.mock_dashscope --port 8001 --latency 0.05
+    python -m benchmarks.bench_tongyi_client --base-url http://127.0.0.1:8001/api/v1
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dashscope  # noqa: E402
+
+from benchmarks.report import format_summary, summarize, write_report  # noqa: E402
+from utils.tongyi_client import HTTPClient, SDKClient  # noqa: E402
+from utils.tongyi_utils import _build_request_params, create_tongyi_messages  # noqa: E402
+
+
+async def run_client(client, requests, concurrency):
+    """以固定并发发送requests个请求，返回每个请求的耗时（毫秒）"""
+    params = _build_request_params(
+        create_tongyi_messages("Machine learning is a subfield of AI.", "en", "zh")
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.acall(params)
+            timings.append((time.perf_counter() - start) * 1000)
+            if response["status_code"] != 200:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return timings, elapsed, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="通义千问客户端基准测试")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8001/api/v1")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--clients", nargs="+", default=["sdk", "http"])
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    # SDK同样指向模拟服务
+    dashscope.base_http_api_url = args.base_url
+    dashscope.api_key = os.getenv("DASHSCOPE_API_KEY", "mock")
+
+    print(f"🚀 {args.requests}个请求，并发{args.concurrency}，接口 {args.base_url}\n")
+    results = []
+    for name in args.clients:
+        if name == "sdk":
+            client = SDKClient()
+        else:
+            client = HTTPClient(base_url=args.base_url, pool_size=args.concurrency)
+        timings, elapsed, failures = asyncio.run(
+            run_client(client, args.requests, args.concurrency)
+        )
+        result = summarize(timings, elapsed, failures, client=name)
+        results.append(result)
+        print(format_summary(result, f"{name:>5}"))
+
+    if args.json_path:
+        write_report(args.json_path, results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+翻译服务压测 - 对app.py运行单请求、并发、批量和流式场景，报告吞吐与p50/p95/p99延迟
+
+默认在本地启动DashScope模拟服务和翻译服务（指向模拟服务），无需API密钥即可离线运行:
+    python -m benchmarks.load_test --requests 200 --concurrency 32 --json report.json
+
+也可以对已运行的服务压测（此时--mock-*参数不生效）:
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --scenarios concurrent stream
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_terminology import make_vocabulary  # noqa: E402
+from benchmarks.report import format_summary, summarize, write_report  # noqa: E402
+
+SCENARIOS = ("single", "concurrent", "batch", "stream")
+
+
+class TextFactory:
+    """生成压测文本：随机单词句子中插入术语库中的术语
+
+    hot_ratio比例的请求从一小组固定句子中抽取，用于观察缓存和请求合并的效果；
+    其余句子各不相同，每次都会真正调用上游。
+    """
+
+    def __init__(self, seed: int, hot_ratio: float, hot_size: int = 20):
+        self.rng = random.Random(seed)
+        self.words = make_vocabulary(self.rng, size=2000)
+        path = os.path.join(ROOT, "data", "terminology.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.terms = [item["term"] for item in json.load(f)]
+        except (OSError, ValueError, KeyError):
+            self.terms = []
+        self.hot_ratio = hot_ratio
+        self.hot = [self._sentence() for _ in range(hot_size)]
+
+    def _sentence(self) -> str:
+        words = [self.rng.choice(self.words) for _ in range(self.rng.randint(8, 20))]
+        if self.terms:
+            words.insert(self.rng.randrange(len(words) + 1), self.rng.choice(self.terms))
+        return " ".join(words).capitalize() + "."
+
+    def sentence(self) -> str:
+        if self.hot_ratio and self.rng.random() < self.hot_ratio:
+            return self.rng.choice(self.hot)
+        return self._sentence()
+
+
+async def post_json(session, url, payload):
+    """发送一次JSON请求，返回 (是否成功, 耗时毫秒)"""
+    start = time.perf_counter()
+    try:
+        async with session.post(url, json=payload) as response:
+            body = await response.json()
+            ok = response.status == 200 and body.get("failed", 0) == 0
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        ok = False
+    return ok, (time.perf_counter() - start) * 1000
+
+
+async def post_stream(session, url, payload):
+    """发送一次流式请求，返回 (是否成功, 总耗时毫秒, 首个增量的耗时毫秒)"""
+    start = time.perf_counter()
+    first = None
+    ok = False
+    try:
+        async with session.post(url, json=payload) as response:
+            event = None
+            async for raw in response.content:
+                line = raw.decode("utf-8").rstrip("\r\n")
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                    if event == "delta" and first is None:
+                        first = (time.perf_counter() - start) * 1000
+                    elif event == "done":
+                        ok = response.status == 200
+                    elif event == "error":
+                        ok = False
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        ok = False
+    return ok, (time.perf_counter() - start) * 1000, first
+
+
+async def run_scenario(name, base_url, texts, requests, concurrency, batch_size):
+    """运行一个场景
+
+    Args:
+        name: 场景名（single/concurrent/batch/stream）
+        base_url: 翻译服务地址
+        texts: 压测文本生成器
+        requests: 请求总数
+        concurrency: 并发数（single场景固定为1）
+        batch_size: batch场景每个请求包含的句段数
+
+    Returns:
+        场景汇总结果
+    """
+    if name == "single":
+        concurrency = 1
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+    first_delta = []
+    failures = 0
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=120)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+
+        async def one():
+            nonlocal failures
+            payload = {"source_language": "en", "target_language": "zh"}
+            if name == "batch":
+                payload["segments"] = [texts.sentence() for _ in range(batch_size)]
+            else:
+                payload["text"] = texts.sentence()
+
+            async with semaphore:
+                if name == "stream":
+                    ok, elapsed, first = await post_stream(
+                        session, f"{base_url}/translate/stream", payload
+                    )
+                    if first is not None:
+                        first_delta.append(first)
+                else:
+                    path = "/translate/batch" if name == "batch" else "/translate"
+                    ok, elapsed = await post_json(session, base_url + path, payload)
+            timings.append(elapsed)
+            if not ok:
+                failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(requests)])
+        elapsed = time.perf_counter() - start
+
+    result = summarize(timings, elapsed, failures, scenario=name, concurrency=concurrency)
+    if name == "batch":
+        result["batch_size"] = batch_size
+        result["segments_per_second"] = round(requests * batch_size / elapsed, 1)
+    if name == "stream":
+        first = summarize(first_delta, elapsed)
+        result["first_delta_p50_ms"] = first["p50_ms"]
+        result["first_delta_p95_ms"] = first["p95_ms"]
+        result["first_delta_p99_ms"] = first["p99_ms"]
+    return result
+
+
+async def fetch_json(url):
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+        async with session.get(url) as response:
+            return await response.json()
+
+
+def wait_until_ready(url, process, timeout=60.0):
+    """轮询url直到服务可用"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise Exception(f"服务启动失败，退出码 {process.returncode}")
+        try:
+            asyncio.run(fetch_json(url))
+            return
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+            time.sleep(0.3)
+    raise Exception(f"等待服务启动超时：{url}")
+
+
+def start_servers(args):
+    """启动模拟上游与翻译服务，返回 (服务地址, 进程列表)"""
+    mock = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.mock_dashscope",
+            "--port", str(args.mock_port),
+            "--latency", str(args.mock_latency),
+            "--jitter", str(args.mock_jitter),
+            "--error-rate", str(args.mock_error_rate),
+            "--error-status", str(args.mock_error_status),
+        ],
+        cwd=ROOT,
+    )
+    env = dict(os.environ)
+    env["DASHSCOPE_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}/api/v1"
+    env.setdefault("DASHSCOPE_API_KEY", "mock")
+    # 压测的是服务自身的开销，默认不让进程内限流成为瓶颈
+    env.setdefault("TONGYI_RATE_LIMIT_RPS", "0")
+    app = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app:app",
+            "--host", "127.0.0.1", "--port", str(args.app_port),
+            "--log-level", "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    processes = [mock, app]
+    try:
+        wait_until_ready(f"http://127.0.0.1:{args.mock_port}/stats", mock)
+        wait_until_ready(f"http://127.0.0.1:{args.app_port}/health", app)
+    except Exception:
+        stop_servers(processes)
+        raise
+    return f"http://127.0.0.1:{args.app_port}", processes
+
+
+def stop_servers(processes):
+    for process in reversed(processes):
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="翻译服务压测")
+    parser.add_argument("--url", help="已运行的翻译服务地址；为空时在本地启动模拟上游和服务")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="每个场景的请求数")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--hot-ratio", type=float, default=0.0, help="重复文本的请求比例（命中缓存）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--app-port", type=int, default=8010)
+    parser.add_argument("--mock-port", type=int, default=8011)
+    parser.add_argument("--mock-latency", type=float, default=0.2)
+    parser.add_argument("--mock-jitter", type=float, default=0.05)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-error-status", type=int, default=429)
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    processes = []
+    base_url = args.url.rstrip("/") if args.url else None
+    if base_url is None:
+        print(f"🔧 启动模拟上游（延迟 {args.mock_latency}s，错误率 {args.mock_error_rate}）和翻译服务...")
+        base_url, processes = start_servers(args)
+
+    try:
+        print(f"🚀 每个场景{args.requests}个请求，并发{args.concurrency}，服务 {base_url}\n")
+        texts = TextFactory(args.seed, args.hot_ratio)
+        results = []
+        for name in args.scenarios:
+            result = asyncio.run(
+                run_scenario(
+                    name, base_url, texts, args.requests, args.concurrency, args.batch_size
+                )
+            )
+            results.append(result)
+            print(format_summary(result, f"{name:>10}"))
+
+        health = asyncio.run(fetch_json(f"{base_url}/health"))
+        if args.json_path:
+            write_report(args.json_path, results, {**vars(args), "url": base_url}, server=health)
+    finally:
+        stop_servers(processes)
+
+
+if __name__ == "__main__":
+    main()
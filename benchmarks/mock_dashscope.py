@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+DashScope模拟服务 - 实现文本生成HTTP接口，用于离线压测和联调
+
+返回的“译文”为原文逐行加上前缀，保留批量翻译的<<<编号>>>标记，
+因此批量拆分、流式输出等逻辑都能正常工作。可配置响应延迟、抖动、
+长尾延迟（按比例额外等待）、错误率和错误状态码（429模拟限流，5xx模拟上游故障），
+运行中也可以通过 POST /settings 调整，便于压测时注入故障。
+同时启动多个实例（不同端口、不同延迟）即可模拟多个模型后端。
+
+用法:
+    python -m benchmarks.mock_dashscope --port 8001 --latency 0.3
+    DASHSCOPE_BASE_URL=http://127.0.0.1:8001/api/v1 python app.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+from typing import Any, Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="DashScope模拟服务")
+
+# 运行参数，由命令行或环境变量设置
+settings = {
+    "latency": float(os.getenv("MOCK_LATENCY", "0.2")),
+    "jitter": float(os.getenv("MOCK_JITTER", "0.0")),
+    "slow_rate": float(os.getenv("MOCK_SLOW_RATE", "0.0")),
+    "slow_latency": float(os.getenv("MOCK_SLOW_LATENCY", "2.0")),
+    "error_rate": float(os.getenv("MOCK_ERROR_RATE", "0.0")),
+    "error_status": int(os.getenv("MOCK_ERROR_STATUS", "429")),
+    "chunk_chars": int(os.getenv("MOCK_CHUNK_CHARS", "8")),
+    "chunk_delay": float(os.getenv("MOCK_CHUNK_DELAY", "0.01")),
+}
+counters = {"requests": 0, "errors": 0}
+
+# 错误状态码 -> DashScope错误码和信息
+ERRORS = {
+    429: ("Throttling.RateQuota", "Requests rate limit exceeded"),
+    500: ("InternalError", "Internal server error"),
+    503: ("ServiceUnavailable", "Service temporarily unavailable"),
+}
+
+
+def fake_translation(messages: List[Dict[str, str]]) -> str:
+    """根据用户消息生成确定性的“译文”"""
+    content = messages[-1]["content"]
+    # 用户消息形如“请将此文本从en翻译成zh：\n\n原文”
+    text = content.split("\n\n", 1)[1] if "\n\n" in content else content
+    return "\n".join(
+        line if line.startswith("<<<") or not line.strip() else f"[译]{line}"
+        for line in text.split("\n")
+    )
+
+
+def usage(messages: List[Dict[str, str]], output: str) -> Dict[str, int]:
+    input_tokens = sum(len(message["content"]) for message in messages) // 2
+    output_tokens = len(output) // 2
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+    }
+
+
+def payload(content: str, messages: List[Dict[str, str]], finish: str) -> Dict[str, Any]:
+    return {
+        "output": {
+            "choices": [
+                {
+                    "finish_reason": finish,
+                    "message": {"role": "assistant", "content": content},
+                }
+            ]
+        },
+        "usage": usage(messages, content),
+        "request_id": f"mock-{counters['requests']}",
+    }
+
+
+async def wait() -> None:
+    delay = settings["latency"] + random.uniform(0, settings["jitter"])
+    if random.random() < settings["slow_rate"]:
+        delay += settings["slow_latency"]
+    await asyncio.sleep(delay)
+
+
+@app.post("/api/v1/services/aigc/text-generation/generation")
+async def generation(request: Request):
+    counters["requests"] += 1
+    body = await request.json()
+    messages = body["input"]["messages"]
+    stream = request.headers.get("X-DashScope-SSE") == "enable"
+
+    await wait()
+
+    if random.random() < settings["error_rate"]:
+        counters["errors"] += 1
+        status = settings["error_status"]
+        code, message = ERRORS.get(status, ("InternalError", "Internal server error"))
+        return JSONResponse(status_code=status, content={"code": code, "message": message})
+
+    output = fake_translation(messages)
+    if not stream:
+        return payload(output, messages, "stop")
+
+    async def events():
+        size = settings["chunk_chars"]
+        pieces = [output[i:i + size] for i in range(0, len(output), size)] or [""]
+        for index, piece in enumerate(pieces):
+            finish = "stop" if index == len(pieces) - 1 else "null"
+            data = json.dumps(payload(piece, messages, finish), ensure_ascii=False)
+            yield f"id:{index + 1}\nevent:result\n:HTTP_STATUS/200\ndata:{data}\n\n"
+            await asyncio.sleep(settings["chunk_delay"])
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def stats():
+    return {**counters, **settings}
+
+
+@app.post("/settings")
+async def update_settings(request: Request):
+    """运行中调整延迟、错误率等参数，只接受已有的键"""
+    body = await request.json()
+    for key, value in body.items():
+        if key in settings:
+            settings[key] = type(settings[key])(value)
+    return settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DashScope模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=settings["latency"], help="响应延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=settings["jitter"], help="随机附加延迟上限（秒）")
+    parser.add_argument("--slow-rate", type=float, default=settings["slow_rate"], help="长尾请求的比例")
+    parser.add_argument(
+        "--slow-latency", type=float, default=settings["slow_latency"], help="长尾请求的附加延迟（秒）"
+    )
+    parser.add_argument("--error-rate", type=float, default=settings["error_rate"], help="返回错误的比例")
+    parser.add_argument("--error-status", type=int, default=settings["error_status"], help="错误响应的HTTP状态码")
+    args = parser.parse_args()
+
+    settings.update(
+        latency=args.latency,
+        jitter=args.jitter,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    print(f"DashScope模拟服务：http://{args.host}:{args.port}/api/v1")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试报告工具 - 统一的分位数统计与JSON报告格式
+"""
+
+import json
+import platform
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+
+def percentile(values: List[float], q: float) -> float:
+    """返回q分位数（values需已排序）"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(
+    timings: List[float], elapsed: float, failures: int = 0, **extra: Any
+) -> Dict[str, Any]:
+    """汇总一组请求的延迟与吞吐
+
+    Args:
+        timings: 每个请求的耗时（毫秒）
+        elapsed: 整轮测试的墙钟时间（秒）
+        failures: 失败请求数
+        **extra: 附加到结果中的字段（场景名、并发数等）
+
+    Returns:
+        包含请求数、吞吐和p50/p95/p99延迟的字典
+    """
+    values = sorted(timings)
+    total = len(values)
+    return {
+        **extra,
+        "requests": total,
+        "failures": failures,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1) if elapsed > 0 else None,
+        "mean_ms": round(statistics.fmean(values), 3) if values else None,
+        "p50_ms": round(percentile(values, 0.50), 3),
+        "p95_ms": round(percentile(values, 0.95), 3),
+        "p99_ms": round(percentile(values, 0.99), 3),
+        "max_ms": round(values[-1], 3) if values else None,
+    }
+
+
+def format_summary(result: Dict[str, Any], label: str) -> str:
+    """将汇总结果格式化为一行输出"""
+    return (
+        f"{label} | 吞吐 {result['throughput_rps'] or 0:>8.1f} req/s | "
+        f"p50 {result['p50_ms']:>8.2f} ms | p95 {result['p95_ms']:>8.2f} ms | "
+        f"p99 {result['p99_ms']:>8.2f} ms | 失败 {result['failures']}"
+    )
+
+
+def write_report(
+    path: str,
+    results: List[Dict[str, Any]],
+    config: Optional[Dict[str, Any]] = None,
+    **sections: Any,
+) -> None:
+    """将结果连同运行环境和参数写入JSON文件，便于不同版本间对比
+
+    Args:
+        path: 输出文件路径
+        results: 各场景的汇总结果
+        config: 运行参数
+        **sections: 附加到报告顶层的其他内容（如服务端统计）
+    """
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "config": config or {},
+        "results": results,
+        **sections,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n📄 结果已写入 {path}")
@@ -18,7 +18,13 @@ class TranslationChain(Chain):
     @property
     def output_keys(self) -> List[str]:
         """链的输出键"""
-        return ["translated_text", "detected_language", "terminology_matches"]
+        return [
+            "translated_text",
+            "detected_language",
+            "language_confidence",
+            "terminology_matches",
+            "prompt_tokens",
+        ]
     
     def _call(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """运行链
@@ -35,6 +41,8 @@ class TranslationChain(Chain):
         target_language = inputs.get("target_language", "en")
         context = inputs.get("context", [])
         use_terminology = inputs.get("use_terminology", True)
+        glossaries = inputs.get("glossaries")
+        route = inputs.get("route")
         
         # 运行翻译工具
         result = self.translation_tool._run(
@@ -42,7 +50,9 @@ class TranslationChain(Chain):
             source_language=source_language,
             target_language=target_language,
             context=context,
-            use_terminology=use_terminology
+            use_terminology=use_terminology,
+            glossaries=glossaries,
+            route=route
         )
         
         return result
@@ -55,6 +65,8 @@ class TranslationChain(Chain):
         target_language = inputs.get("target_language", "en")
         context = inputs.get("context", [])
         use_terminology = inputs.get("use_terminology", True)
+        glossaries = inputs.get("glossaries")
+        route = inputs.get("route")
         
         # 运行翻译工具
         result = await self.translation_tool._arun(
@@ -62,7 +74,9 @@ class TranslationChain(Chain):
             source_language=source_language,
             target_language=target_language,
             context=context,
-            use_terminology=use_terminology
+            use_terminology=use_terminology,
+            glossaries=glossaries,
+            route=route
         )
         
         return result
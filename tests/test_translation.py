@@ -5,9 +5,20 @@ import requests
 import json
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # 服务器URL
 URL = "http://localhost:8000/translate"
+BATCH_URL = "http://localhost:8000/translate/batch"
+STREAM_URL = "http://localhost:8000/translate/stream"
+DOCUMENT_URL = "http://localhost:8000/translate/document"
+HEALTH_URL = "http://localhost:8000/health"
+METRICS_URL = "http://localhost:8000/metrics"
+JOBS_URL = "http://localhost:8000/jobs"
+LIVE_URL = "http://localhost:8000/livez"
+READY_URL = "http://localhost:8000/readyz"
+TERMINOLOGY_URL = "http://localhost:8000/terminology"
+GLOSSARIES_URL = "http://localhost:8000/glossaries"
 
 def print_result(response):
     """美化打印翻译结果"""
@@ -65,6 +76,20 @@ def test_auto_detect():
     response = requests.post(URL, json=data)
     return print_result(response)
 
+def test_detect_japanese():
+    """测试日文自动检测"""
+    print("\n🗾 测试日文自动检测...")
+    data = {
+        "text": "これは機械学習についての文章です。",
+        "source_language": "auto",
+        "target_language": "zh"
+    }
+    response = requests.post(URL, json=data)
+    result = print_result(response)
+    print(f"📊 检测结果: {result['detected_language']}（置信度 {result['language_confidence']}）")
+    assert result["detected_language"] == "ja"
+    return result
+
 def test_with_terminology():
     """测试带术语库的翻译"""
     print("\n📚 测试术语库匹配...")
@@ -127,6 +152,276 @@ def test_complex_text():
     response = requests.post(URL, json=data)
     return print_result(response)
 
+def test_batch_translation():
+    """测试批量翻译"""
+    print("\n📦 测试批量翻译...")
+    data = {
+        "segments": [
+            "Save",
+            "Cancel",
+            "  ",
+            "Machine learning is a subfield of artificial intelligence.",
+            "深度学习使用多层神经网络。"
+        ],
+        "source_language": "auto",
+        "target_language": "zh"
+    }
+    response = requests.post(BATCH_URL, json=data)
+    result = response.json()
+    print(f"✅ 成功: {result['succeeded']}, ❌ 失败: {result['failed']}")
+    for item in result["results"]:
+        if item["status"] == "success":
+            print(f"  [{item['index']}] {item['translated_text']}")
+        else:
+            print(f"  [{item['index']}] 错误: {item['error']}")
+    assert len(result["results"]) == len(data["segments"])
+    # 空白片段原样返回，不发往上游
+    blank = result["results"][2]
+    assert blank["status"] == "success"
+    assert blank["translated_text"] == "  "
+    assert blank["prompt_tokens"] == 0
+    return result
+
+def test_document_translation():
+    """测试长文档分块翻译"""
+    print("\n📄 测试长文档翻译...")
+    paragraphs = [
+        "Machine learning is a subfield of artificial intelligence. " * 10,
+        "Deep learning uses multi-layer neural networks. " * 10,
+        "Natural language processing enables computers to understand text. " * 10
+    ]
+    data = {
+        "text": "\n\n".join(paragraphs),
+        "source_language": "auto",
+        "target_language": "zh",
+        "max_chunk_chars": 600
+    }
+    response = requests.post(DOCUMENT_URL, json=data)
+    result = print_result(response)
+    print(f"📊 分块数: {result['chunks']}")
+    assert result["chunks"] >= len(paragraphs)
+    return result
+
+def test_translation_memory():
+    """测试翻译记忆复用高度相似的片段"""
+    print("\n🧠 测试翻译记忆...")
+    text = "Click the Save button to store your changes before closing the editor window"
+    requests.post(URL, json={"text": text, "source_language": "en", "target_language": "zh"})
+    before = requests.get(HEALTH_URL).json()["translation_memory"]
+    # 仅标点不同，应直接复用记忆中的译文
+    response = requests.post(
+        URL, json={"text": text + ".", "source_language": "en", "target_language": "zh"}
+    )
+    result = print_result(response)
+    after = requests.get(HEALTH_URL).json()["translation_memory"]
+    print(f"📊 复用次数: {before['reuses']} ➜ {after['reuses']}")
+    assert after["reuses"] > before["reuses"]
+    return result
+
+def test_upstream_health():
+    """测试健康检查中的上游限流和熔断状态"""
+    print("\n🚦 测试上游状态...")
+    upstream = requests.get(HEALTH_URL).json()["upstream"]
+    print(f"📊 限流器: {upstream['rate_limiter']}")
+    print(f"📊 熔断器: {upstream['circuit_breaker']}")
+    assert upstream["circuit_breaker"]["state"] in ("closed", "open", "half_open")
+    return upstream
+
+def test_request_coalescing():
+    """测试相同请求并发时合并为一次上游调用"""
+    print("\n🔗 测试请求合并...")
+    data = {
+        "text": f"Breaking news headline {time.time()}",
+        "source_language": "en",
+        "target_language": "zh"
+    }
+    before = requests.get(HEALTH_URL).json()["coalescing"]
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        responses = list(executor.map(lambda _: requests.post(URL, json=data), range(10)))
+    after = requests.get(HEALTH_URL).json()["coalescing"]
+    translations = {response.json()["translated_text"] for response in responses}
+    print(f"📊 合并请求数: {before['coalesced']} ➜ {after['coalesced']}")
+    assert len(translations) == 1
+    # 开启SERVER_TIMING时，被合并的请求记录等待共享调用的耗时
+    timings = [response.headers.get("Server-Timing") for response in responses]
+    if all(timings) and after["coalesced"] > before["coalesced"]:
+        assert any("singleflight_wait" in timing for timing in timings)
+    return after
+
+def test_metrics():
+    """测试Prometheus指标中的分阶段耗时和上游token用量"""
+    print("\n📈 测试指标接口...")
+    data = {
+        "text": f"Metrics probe sentence {time.time()}",
+        "source_language": "auto",
+        "target_language": "zh"
+    }
+    response = requests.post(URL, json=data)
+    assert response.status_code == 200
+    if "Server-Timing" in response.headers:
+        print(f"⏱️ Server-Timing: {response.headers['Server-Timing']}")
+    metrics = requests.get(METRICS_URL)
+    assert metrics.status_code == 200
+    text = metrics.text
+    for name in (
+        'translation_stage_duration_seconds_count{stage="detect_language"}',
+        'translation_stage_duration_seconds_count{stage="upstream"}',
+        'translation_cache_lookups_total{result="miss"}',
+        'translation_upstream_requests_total{status="200"}',
+        "translation_upstream_tokens_total",
+    ):
+        assert name in text, name
+    print(f"📊 指标行数: {len(text.splitlines())}")
+    return text
+
+def test_bulk_job():
+    """测试异步批量任务：提交、轮询进度、分页拉取结果和下载译文"""
+    print("\n📦 测试批量任务...")
+    segments = [f"Localization string number {i} for the nightly run." for i in range(45)]
+    segments.insert(10, "")
+    response = requests.post(JOBS_URL, json={
+        "segments": segments,
+        "source_language": "en",
+        "target_language": "zh"
+    })
+    assert response.status_code == 202
+    job = response.json()
+    print(f"🆔 任务: {job['job_id']} ({job['status']})")
+
+    deadline = time.time() + 60
+    while job["status"] not in ("completed", "cancelled") and time.time() < deadline:
+        time.sleep(0.5)
+        job = requests.get(f"{JOBS_URL}/{job['job_id']}").json()
+        print(f"⏳ 进度: {job['progress'] * 100:.0f}%")
+    assert job["status"] == "completed"
+    assert job["completed"] + job["failed"] == len(segments)
+
+    results = []
+    offset = 0
+    while offset is not None:
+        page = requests.get(
+            f"{JOBS_URL}/{job['job_id']}/results", params={"offset": offset, "limit": 20}
+        ).json()
+        results.extend(page["results"])
+        offset = page["next_offset"]
+    assert [item["index"] for item in results] == list(range(len(segments)))
+    assert results[10]["translated_text"] == ""
+
+    text = requests.get(
+        f"{JOBS_URL}/{job['job_id']}/download", params={"format": "text"}
+    ).text
+    assert len(text.split("\n")) == len(segments)
+    print(f"✅ 完成 {job['completed']} 段，失败 {job['failed']} 段")
+    return job
+
+def test_liveness_and_readiness():
+    """测试存活检查与就绪检查"""
+    print("\n💓 测试存活/就绪检查...")
+    assert requests.get(LIVE_URL).json()["status"] == "alive"
+    ready = requests.get(READY_URL)
+    assert ready.status_code == 200
+    print(f"⏱️ 预热耗时: {ready.json()['warmup_seconds']}秒")
+    return ready.json()
+
+def test_prompt_budget():
+    """测试大量上下文时提示词大小受预算限制"""
+    print("\n📏 测试提示词预算...")
+    context = [
+        {"source": f"Sentence number {i} about an unrelated topic.", "target": f"关于无关话题的第{i}句。"}
+        for i in range(500)
+    ]
+    data = {
+        "text": "Machine learning models learn from data.",
+        "source_language": "en",
+        "target_language": "zh",
+        "context": context
+    }
+    response = requests.post(URL, json=data)
+    result = print_result(response)
+    print(f"📊 估算提示词token数: {result['prompt_tokens']}")
+    assert result["prompt_tokens"] < 2000
+    return result
+
+def test_glossaries():
+    """测试命名术语表：写入术语表、按请求选择术语表、未知术语表返回404"""
+    print("\n📒 测试命名术语表...")
+    response = requests.post(TERMINOLOGY_URL, json={
+        "glossary": "test_medical",
+        "terms": [{"term": "myocardial infarction", "translation": "心肌梗死"}]
+    })
+    assert response.status_code == 200
+    assert "test_medical" in requests.get(GLOSSARIES_URL).json()["glossaries"]
+
+    text = "The patient had a myocardial infarction and machine learning was used."
+    data = {"text": text, "source_language": "en", "target_language": "zh"}
+    default_terms = {item["term"] for item in requests.post(URL, json=data).json()["terminology_matches"]}
+    assert "myocardial infarction" not in default_terms
+
+    data["glossaries"] = ["test_medical"]
+    result = print_result(requests.post(URL, json=data))
+    terms = {item["term"] for item in result["terminology_matches"]}
+    assert terms == {"myocardial infarction"}
+
+    data["glossaries"] = ["test_medical", "default"]
+    batch = requests.post(BATCH_URL, json={**data, "segments": [text], "text": None}).json()
+    terms = {item["term"] for item in batch["results"][0]["terminology_matches"]}
+    assert "myocardial infarction" in terms and terms & default_terms
+
+    data["glossaries"] = ["no_such_glossary"]
+    assert requests.post(URL, json=data).status_code == 404
+    return result
+
+def test_model_routing():
+    """测试模型路由：按路由标记选择后端，未知路由标记返回400"""
+    print("\n🔀 测试模型路由...")
+    router = requests.get(HEALTH_URL).json()["upstream"]["router"]
+    print(f"📊 模型后端: {list(router['backends'])}")
+    backend = next(iter(router["backends"]))
+    before = router["backends"][backend]["successes"]
+
+    data = {
+        "text": f"Routing test {time.time()}: the model is selected per request.",
+        "source_language": "en",
+        "target_language": "zh",
+        "route": backend,
+    }
+    result = print_result(requests.post(URL, json=data))
+    assert result is not None
+    after = requests.get(HEALTH_URL).json()["upstream"]["router"]["backends"][backend]
+    assert after["successes"] > before
+
+    data["route"] = "no_such_route"
+    assert requests.post(URL, json=data).status_code == 400
+    return result
+
+def test_stream_translation():
+    """测试流式翻译"""
+    print("\n🌊 测试流式翻译...")
+    data = {
+        "text": "机器学习是人工智能的一个分支，它使计算机能够从数据中学习。",
+        "source_language": "auto",
+        "target_language": "en"
+    }
+    final = None
+    with requests.post(STREAM_URL, json=data, stream=True) as response:
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                payload = json.loads(line[len("data: "):])
+                if event == "delta":
+                    print(payload["text"], end="", flush=True)
+                elif event == "done":
+                    final = payload
+                elif event == "error":
+                    print(f"\n❌ 错误: {payload['detail']}")
+    print()
+    assert final is not None
+    if final.get("detected_language"):
+        print(f"🔍 检测到的语言: {final['detected_language']}")
+    return final
+
 def run_health_check():
     """检查API服务是否正常运行"""
     try:
@@ -155,9 +450,22 @@ def main():
         test_simple_en_to_zh,
         test_simple_zh_to_en,
         test_auto_detect,
+        test_detect_japanese,
         test_with_terminology,
         test_with_context,
-        test_complex_text
+        test_complex_text,
+        test_batch_translation,
+        test_document_translation,
+        test_translation_memory,
+        test_upstream_health,
+        test_request_coalescing,
+        test_metrics,
+        test_bulk_job,
+        test_liveness_and_readiness,
+        test_prompt_budget,
+        test_glossaries,
+        test_model_routing,
+        test_stream_translation
     ]
     
     for test in tests:
@@ -1,16 +1,42 @@
-from typing import Any, ClassVar, Dict, List, Optional, Type
+import asyncio
+import os
+from typing import Any, AsyncIterator, ClassVar, Dict, List, Optional, Tuple, Type
 
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from utils.terminology_db import TerminologyDatabase
+from utils.document_segmenter import (
+    reassemble_document,
+    segment_document,
+    split_sentences,
+)
+from utils.language_detection import detect_language_with_confidence
+from utils.metrics import CACHE_LOOKUPS, stage
+from utils.glossary_registry import GlossaryRegistry
+from utils.model_router import make_route
+from utils.translation_cache import create_translation_cache
+from utils.single_flight import SingleFlight
+from utils.translation_memory import DEFAULT_SCOPE, create_translation_memory
 from utils.tongyi_utils import (
+    acall_tongyi_api,
+    astream_tongyi_api,
     call_tongyi_api,
+    create_tongyi_batch_messages,
     create_tongyi_messages,
-    detect_language,
+    estimate_messages_tokens,
     extract_translation,
+    split_batch_translation,
 )
 
+# 批量翻译时每次API调用最多打包的片段数和字符数
+BATCH_MAX_SEGMENTS = int(os.getenv("BATCH_MAX_SEGMENTS", "20"))
+BATCH_MAX_CHARS = int(os.getenv("BATCH_MAX_CHARS", "2000"))
+
+# 文档翻译：每块最大字符数、单个文档的并发块数、滚动上下文包含的前序块数
+DOCUMENT_CHUNK_CHARS = int(os.getenv("DOCUMENT_CHUNK_CHARS", "1500"))
+DOCUMENT_CONCURRENCY = int(os.getenv("DOCUMENT_CONCURRENCY", "8"))
+DOCUMENT_CONTEXT_WINDOW = int(os.getenv("DOCUMENT_CONTEXT_WINDOW", "2"))
+
 
 class TranslationInput(BaseModel):
     """翻译工具的输入"""
@@ -24,6 +50,12 @@ class TranslationInput(BaseModel):
         default=None, description="用于上下文一致性的先前翻译"
     )
     use_terminology: bool = Field(default=True, description="是否使用术语数据库")
+    glossaries: Optional[List[str]] = Field(
+        default=None, description="使用的术语表名称，为空时使用默认术语表"
+    )
+    route: Optional[str] = Field(
+        default=None, description="路由标记（路由规则中的flag或后端名称），为空时按规则选择模型"
+    )
 
 
 class TranslationTool(BaseTool):
@@ -33,12 +65,168 @@ class TranslationTool(BaseTool):
     description: ClassVar[str] = "在语言之间翻译文本，保持上下文和术语一致性"
     args_schema: Type[BaseModel] = TranslationInput
 
-    # 添加terminology_db作为模型字段
+    # 添加术语表注册表和默认术语表作为模型字段
+    glossary_registry: Any = Field(default=None, exclude=True)
     terminology_db: Any = Field(default=None, exclude=True)
+    cache: Any = Field(default=None, exclude=True)
+    memory: Any = Field(default=None, exclude=True)
+    flights: Any = Field(default=None, exclude=True)
 
     def __init__(self, **data):
         super().__init__(**data)
-        self.terminology_db = TerminologyDatabase()
+        # 合并相同缓存键的并发上游调用
+        self.flights = SingleFlight()
+        self.glossary_registry = GlossaryRegistry()
+        self.terminology_db = self.glossary_registry.default
+        self.cache = create_translation_cache()
+        self.memory = create_translation_memory()
+        # 任一术语表中的术语变更时使相关缓存和翻译记忆失效
+        self.glossary_registry.add_listener(self.cache.invalidate_terms)
+        if self.memory is not None:
+            self.glossary_registry.add_listener(self.memory.invalidate_terms)
+
+    def _prepare(
+        self,
+        text: str,
+        source_language: str,
+        target_language: str,
+        context: Optional[List[Dict[str, str]]],
+        use_terminology: bool,
+        terminology_matches: Optional[List[Dict[str, str]]] = None,
+        glossaries: Optional[List[str]] = None,
+        route: Optional[str] = None,
+    ) -> Tuple[
+        List[Dict[str, str]],
+        Optional[str],
+        Optional[float],
+        List[Dict[str, str]],
+        str,
+        Optional[str],
+    ]:
+        """检测语言、匹配术语、查询翻译记忆并构造API消息
+
+        Args:
+            text: 要翻译的文本
+            source_language: 源语言代码（'en'、'zh'或'auto'）
+            target_language: 目标语言代码（'en'或'zh'）
+            context: 上下文翻译
+            use_terminology: 是否使用术语数据库
+            terminology_matches: 预先批量查询好的术语匹配，为空时在此查询
+            glossaries: 使用的术语表名称，为空时使用默认术语表
+            route: 显式指定的路由标记，缓存键和翻译记忆按该标记区分
+
+        Returns:
+            (API消息, 检测到的语言, 语言检测置信度, 术语匹配, 缓存键, 可直接复用的记忆译文)
+        """
+        # 如果需要，自动检测语言（每个请求只检测一次，结果向下游传递）
+        detected_language = None
+        language_confidence = None
+        if source_language == "auto":
+            with stage("detect_language"):
+                detection = detect_language_with_confidence(text)
+            detected_language = detection["language"]
+            language_confidence = detection["confidence"]
+            source_language = detected_language
+
+        # 如果启用，查找术语匹配
+        if terminology_matches is None:
+            terminology_matches = []
+            if use_terminology and self.glossary_registry:
+                with stage("terminology"):
+                    terminology_matches = self.glossary_registry.batch_search(
+                        text, glossaries
+                    )
+
+        # 查询翻译记忆：高度相似直接复用，较相似则作为参考译文加入上下文
+        # 只在相同术语表组合（和显式路由）下得到的译文中查找
+        reused = None
+        if self.memory is not None:
+            with stage("memory"):
+                match = self.memory.lookup(
+                    text, source_language, target_language,
+                    self._memory_scope(use_terminology, glossaries, route),
+                )
+            if match is not None:
+                if match["reuse"]:
+                    reused = match["target"]
+                else:
+                    context = list(context or []) + [
+                        {"source": match["source"], "target": match["target"]}
+                    ]
+
+        # 为API创建消息
+        with stage("prompt"):
+            messages = create_tongyi_messages(
+                text=text,
+                source_language=source_language,
+                target_language=target_language,
+                context=context,
+                terminology=terminology_matches,
+            )
+
+            # 显式路由的请求不与其他路由共用缓存和在途请求
+            cache_key = self.cache.make_key(
+                text, source_language, target_language, terminology_matches, context,
+                route,
+            )
+
+        return (
+            messages,
+            detected_language,
+            language_confidence,
+            terminology_matches,
+            cache_key,
+            reused,
+        )
+
+    @staticmethod
+    def _memory_scope(
+        use_terminology: bool,
+        glossaries: Optional[List[str]],
+        route: Optional[str] = None,
+    ) -> str:
+        """返回翻译记忆的范围：术语表组合（不使用术语时为"-"），显式路由时附加路由标记"""
+        if not use_terminology:
+            scope = "-"
+        elif not glossaries:
+            scope = DEFAULT_SCOPE
+        else:
+            scope = ",".join(dict.fromkeys(glossaries))
+        return f"{scope}@{route}" if route else scope
+
+    def _store(
+        self,
+        cache_key: str,
+        translated_text: str,
+        terminology_matches: List[Dict[str, str]],
+        text: str,
+        source_language: str,
+        target_language: str,
+        scope: str = DEFAULT_SCOPE,
+    ) -> None:
+        """将成功的翻译写入缓存和翻译记忆（按术语范围），空译文不写入"""
+        if not translated_text:
+            return
+        with stage("store"):
+            self.cache.set(
+                cache_key,
+                translated_text,
+                terms=[item["term"] for item in terminology_matches],
+            )
+            if self.memory is not None:
+                self.memory.add(
+                    text, translated_text, source_language, target_language, scope
+                )
+
+    def _lookup(self, reused: Optional[str], cache_key: str) -> Optional[str]:
+        """优先复用翻译记忆，其次查询缓存，并计入复用统计"""
+        if reused is not None:
+            CACHE_LOOKUPS.inc(result="memory")
+            return reused
+        with stage("cache"):
+            cached = self.cache.get(cache_key)
+        CACHE_LOOKUPS.inc(result="hit" if cached is not None else "miss")
+        return cached
 
     def _run(
         self,
@@ -47,6 +235,8 @@ class TranslationTool(BaseTool):
         target_language: str = "en",
         context: Optional[List[Dict[str, str]]] = None,
         use_terminology: bool = True,
+        glossaries: Optional[List[str]] = None,
+        route: Optional[str] = None,
     ) -> Dict[str, Any]:
         """执行翻译
 
@@ -56,41 +246,53 @@ class TranslationTool(BaseTool):
             target_language: 目标语言代码（'en'或'zh'）
             context: 上下文翻译
             use_terminology: 是否使用术语数据库
+            glossaries: 使用的术语表名称，为空时使用默认术语表
+            route: 路由标记，为空时按路由规则选择模型
 
         Returns:
             包含翻译结果的字典
         """
-        # 如果需要，自动检测语言
-        detected_language = None
-        if source_language == "auto":
-            detected_language = detect_language(text)
-            source_language = detected_language
+        (
+            messages, detected_language, language_confidence,
+            terminology_matches, cache_key, reused,
+        ) = self._prepare(
+            text, source_language, target_language, context, use_terminology,
+            glossaries=glossaries,
+            route=route,
+        )
+        source_language = detected_language or source_language
 
-        # 如果启用，查找术语匹配
-        terminology_matches = []
-        if use_terminology and self.terminology_db:
-            terminology_matches = self.terminology_db.batch_search(text)
+        # 优先复用翻译记忆和缓存结果
+        translated_text = self._lookup(reused, cache_key)
+        if translated_text is None:
 
-        # 为API创建消息
-        messages = create_tongyi_messages(
-            text=text,
-            source_language=source_language,
-            target_language=target_language,
-            context=context,
-            terminology=terminology_matches,
-        )
+            def fetch() -> str:
+                # 调用API
+                with stage("upstream"):
+                    response = call_tongyi_api(
+                        messages,
+                        route=make_route(text, source_language, target_language, route),
+                    )
 
-        # 调用API
-        response = call_tongyi_api(messages)
+                # 提取翻译
+                result = extract_translation(response)
+                self._store(
+                    cache_key, result, terminology_matches,
+                    text, source_language, target_language,
+                    self._memory_scope(use_terminology, glossaries, route),
+                )
+                return result
 
-        # 提取翻译
-        translated_text = extract_translation(response)
+            # 相同请求同时在途时共享一次上游调用
+            translated_text = self.flights.do(cache_key, fetch)
 
         # 返回结果
         return {
             "translated_text": translated_text,
             "detected_language": detected_language,
+            "language_confidence": language_confidence,
             "terminology_matches": terminology_matches,
+            "prompt_tokens": estimate_messages_tokens(messages),
         }
 
     async def _arun(
@@ -100,12 +302,468 @@ class TranslationTool(BaseTool):
         target_language: str = "en",
         context: Optional[List[Dict[str, str]]] = None,
         use_terminology: bool = True,
+        glossaries: Optional[List[str]] = None,
+        route: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """_run的异步版本"""
-        return self._run(
-            text=text,
+        """_run的异步版本，上游调用不会阻塞事件循环
+
+        术语检索、翻译记忆查询和缓存/记忆的SQLite读写在工作线程中执行。
+        """
+        (
+            messages, detected_language, language_confidence,
+            terminology_matches, cache_key, reused,
+        ) = await asyncio.to_thread(
+            self._prepare,
+            text, source_language, target_language, context, use_terminology,
+            glossaries=glossaries,
+            route=route,
+        )
+        source_language = detected_language or source_language
+
+        # 优先复用翻译记忆和缓存结果
+        translated_text = await asyncio.to_thread(self._lookup, reused, cache_key)
+        if translated_text is None:
+
+            async def fetch() -> str:
+                # 异步调用API
+                with stage("upstream"):
+                    response = await acall_tongyi_api(
+                        messages,
+                        route=make_route(text, source_language, target_language, route),
+                    )
+
+                # 提取翻译
+                result = extract_translation(response)
+                await asyncio.to_thread(
+                    self._store,
+                    cache_key, result, terminology_matches,
+                    text, source_language, target_language,
+                    self._memory_scope(use_terminology, glossaries, route),
+                )
+                return result
+
+            # 相同请求同时在途时共享一次上游调用
+            translated_text = await self.flights.ado(cache_key, fetch)
+
+        return {
+            "translated_text": translated_text,
+            "detected_language": detected_language,
+            "language_confidence": language_confidence,
+            "terminology_matches": terminology_matches,
+            "prompt_tokens": estimate_messages_tokens(messages),
+        }
+
+    async def astream(
+        self,
+        text: str,
+        source_language: str = "auto",
+        target_language: str = "en",
+        context: Optional[List[Dict[str, str]]] = None,
+        use_terminology: bool = True,
+        glossaries: Optional[List[str]] = None,
+        route: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """流式翻译
+
+        Args:
+            text: 要翻译的文本
+            source_language: 源语言代码（'en'、'zh'或'auto'）
+            target_language: 目标语言代码（'en'或'zh'）
+            context: 上下文翻译
+            use_terminology: 是否使用术语数据库
+            glossaries: 使用的术语表名称，为空时使用默认术语表
+            route: 路由标记，为空时按路由规则选择模型
+
+        Yields:
+            若干 {"event": "delta", "data": {"text": ...}} 事件，
+            最后是携带完整结果的 {"event": "done", "data": {...}} 事件
+        """
+        (
+            messages, detected_language, language_confidence,
+            terminology_matches, cache_key, reused,
+        ) = await asyncio.to_thread(
+            self._prepare,
+            text, source_language, target_language, context, use_terminology,
+            glossaries=glossaries,
+            route=route,
+        )
+        source_language = detected_language or source_language
+
+        translated_text = await asyncio.to_thread(self._lookup, reused, cache_key)
+        if translated_text is not None:
+            yield {"event": "delta", "data": {"text": translated_text}}
+        else:
+            chunks = []
+            async for chunk in astream_tongyi_api(
+                messages, route=make_route(text, source_language, target_language, route)
+            ):
+                chunks.append(chunk)
+                yield {"event": "delta", "data": {"text": chunk}}
+
+            translated_text = "".join(chunks)
+            await asyncio.to_thread(
+                self._store,
+                cache_key, translated_text, terminology_matches,
+                text, source_language, target_language,
+                self._memory_scope(use_terminology, glossaries, route),
+            )
+
+        yield {
+            "event": "done",
+            "data": {
+                "translated_text": translated_text,
+                "detected_language": detected_language,
+                "language_confidence": language_confidence,
+                "terminology_matches": terminology_matches,
+                "prompt_tokens": estimate_messages_tokens(messages),
+            },
+        }
+
+    async def atranslate_document(
+        self,
+        text: str,
+        source_language: str = "auto",
+        target_language: str = "en",
+        context: Optional[List[Dict[str, str]]] = None,
+        use_terminology: bool = True,
+        max_chunk_chars: Optional[int] = None,
+        glossaries: Optional[List[str]] = None,
+        route: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """分块并发翻译长文档，按原顺序和格式拼接
+
+        每块在限流下并发翻译；开始翻译某块时，已完成的前序块
+        （最多DOCUMENT_CONTEXT_WINDOW个）的末句及其译文会作为上下文传入，
+        保持前后用语一致而不必串行等待。
+
+        Args:
+            text: 文档全文
+            source_language: 源语言代码（'en'、'zh'或'auto'）
+            target_language: 目标语言代码（'en'或'zh'）
+            context: 上下文翻译
+            use_terminology: 是否使用术语数据库
+            max_chunk_chars: 每块最大字符数，为空时使用DOCUMENT_CHUNK_CHARS
+            glossaries: 使用的术语表名称，为空时使用默认术语表
+            route: 路由标记，为空时按路由规则（按块长度等）选择模型
+
+        Returns:
+            包含完整译文、检测到的语言、术语匹配和块数的字典
+        """
+        chunks, separators = segment_document(
+            text, max_chunk_chars or DOCUMENT_CHUNK_CHARS
+        )
+
+        # 整篇文档只检测一次语言
+        detected_language = None
+        language_confidence = None
+        if source_language == "auto":
+            with stage("detect_language"):
+                detection = detect_language_with_confidence(text)
+            detected_language = detection["language"]
+            language_confidence = detection["confidence"]
+            source_language = detected_language
+
+        translations: List[Optional[str]] = [None] * len(chunks)
+        chunk_matches: List[List[Dict[str, str]]] = [[] for _ in chunks]
+        prompt_tokens = [0] * len(chunks)
+        semaphore = asyncio.Semaphore(DOCUMENT_CONCURRENCY)
+
+        async def translate_chunk(index: int) -> None:
+            async with semaphore:
+                # 滚动上下文：最近已完成的前序块的末句
+                rolling = []
+                for previous in range(index - 1, -1, -1):
+                    if len(rolling) >= DOCUMENT_CONTEXT_WINDOW:
+                        break
+                    if translations[previous] is None:
+                        continue
+                    source_sentences = split_sentences(chunks[previous])
+                    target_sentences = split_sentences(translations[previous])
+                    # 只有空白或标点的块、模型返回空译文时没有可用的末句，跳过该块
+                    if not source_sentences or not target_sentences:
+                        continue
+                    source = source_sentences[-1].strip()
+                    target = target_sentences[-1].strip()
+                    if source and target:
+                        rolling.append({"source": source, "target": target})
+                rolling.reverse()
+
+                result = await self._arun(
+                    text=chunks[index],
+                    source_language=source_language,
+                    target_language=target_language,
+                    context=(context or []) + rolling,
+                    use_terminology=use_terminology,
+                    glossaries=glossaries,
+                    route=route,
+                )
+                translations[index] = result["translated_text"]
+                chunk_matches[index] = result["terminology_matches"]
+                prompt_tokens[index] = result["prompt_tokens"]
+
+        await asyncio.gather(*[translate_chunk(i) for i in range(len(chunks))])
+
+        # 合并各块的术语匹配
+        terminology_matches = []
+        seen_terms = set()
+        for matches in chunk_matches:
+            for match in matches:
+                if match["term"] not in seen_terms:
+                    seen_terms.add(match["term"])
+                    terminology_matches.append(match)
+
+        return {
+            "translated_text": reassemble_document(translations, separators),
+            "detected_language": detected_language,
+            "language_confidence": language_confidence,
+            "terminology_matches": terminology_matches,
+            "prompt_tokens": sum(prompt_tokens),
+            "chunks": len(chunks),
+        }
+
+    async def abatch_translate(
+        self,
+        segments: List[str],
+        source_language: str = "auto",
+        target_language: str = "en",
+        context: Optional[List[Dict[str, str]]] = None,
+        use_terminology: bool = True,
+        glossaries: Optional[List[str]] = None,
+        route: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """批量翻译多个片段
+
+        短片段会被打包进同一次API调用，各组并发执行；
+        若打包结果无法解析，则回退为逐段调用。
+
+        Args:
+            segments: 要翻译的片段列表
+            source_language: 源语言代码（'en'、'zh'或'auto'）
+            target_language: 目标语言代码（'en'或'zh'）
+            context: 上下文翻译
+            use_terminology: 是否使用术语数据库
+            glossaries: 使用的术语表名称，为空时使用默认术语表
+            route: 路由标记，为空时按路由规则（按打包后的长度等）选择模型
+
+        Returns:
+            与输入顺序一致的逐条结果，包含status及translated_text或error
+        """
+        results, pending = await asyncio.to_thread(
+            self._prepare_segments,
+            segments, source_language, target_language, context, use_terminology,
+            glossaries, route,
+        )
+
+        tasks = [
+            self._atranslate_group(group, language, target_language, context, results)
+            for language, items in pending.items()
+            for group in self._pack_segments(items)
+        ]
+        await asyncio.gather(*tasks)
+
+        return results
+
+    def _prepare_segments(
+        self,
+        segments: List[str],
+        source_language: str,
+        target_language: str,
+        context: Optional[List[Dict[str, str]]],
+        use_terminology: bool,
+        glossaries: Optional[List[str]],
+        route: Optional[str],
+    ) -> Tuple[List[Optional[Dict[str, Any]]], Dict[str, List[Dict[str, Any]]]]:
+        """批量查询术语、构造各片段的消息并查询复用结果（在工作线程中执行）
+
+        空白片段无需翻译，直接原样作为结果，不发往上游也不参与打包。
+
+        Returns:
+            (逐条结果（只填入空白片段和命中翻译记忆或缓存的片段）, 源语言 -> 待翻译条目)
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(segments)
+        # 源语言 -> 待翻译条目
+        pending: Dict[str, List[Dict[str, Any]]] = {}
+
+        # 一次性查询全部片段的术语
+        matches_per_segment = [[] for _ in segments]
+        if use_terminology and self.glossary_registry:
+            with stage("terminology"):
+                matches_per_segment = self.glossary_registry.batch_search_many(
+                    segments, glossaries
+                )
+
+        for index, segment in enumerate(segments):
+            if not segment.strip():
+                results[index] = self._batch_result(
+                    {
+                        "index": index,
+                        "messages": [],
+                        "detected_language": None,
+                        "language_confidence": None,
+                        "terminology_matches": [],
+                    },
+                    translated_text=segment,
+                )
+                continue
+
+            (
+                messages, detected_language, language_confidence,
+                terminology_matches, cache_key, reused,
+            ) = self._prepare(
+                segment, source_language, target_language, context, use_terminology,
+                terminology_matches=matches_per_segment[index],
+                glossaries=glossaries,
+                route=route,
+            )
+            item = {
+                "index": index,
+                "text": segment,
+                "messages": messages,
+                "cache_key": cache_key,
+                "source_language": detected_language or source_language,
+                "target_language": target_language,
+                "detected_language": detected_language,
+                "language_confidence": language_confidence,
+                "terminology_matches": terminology_matches,
+                "memory_scope": self._memory_scope(use_terminology, glossaries, route),
+                "route": route,
+            }
+
+            cached = self._lookup(reused, cache_key)
+            if cached is not None:
+                results[index] = self._batch_result(item, translated_text=cached)
+            else:
+                pending.setdefault(item["source_language"], []).append(item)
+
+        return results, pending
+
+    @staticmethod
+    def _pack_segments(items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """按片段数和字符数上限将条目分组"""
+        groups: List[List[Dict[str, Any]]] = []
+        current: List[Dict[str, Any]] = []
+        current_chars = 0
+
+        for item in items:
+            length = len(item["text"])
+            if current and (
+                len(current) >= BATCH_MAX_SEGMENTS
+                or current_chars + length > BATCH_MAX_CHARS
+            ):
+                groups.append(current)
+                current = []
+                current_chars = 0
+            current.append(item)
+            current_chars += length
+
+        if current:
+            groups.append(current)
+
+        return groups
+
+    async def _atranslate_group(
+        self,
+        group: List[Dict[str, Any]],
+        source_language: str,
+        target_language: str,
+        context: Optional[List[Dict[str, str]]],
+        results: List[Optional[Dict[str, Any]]],
+    ) -> None:
+        """翻译一组打包的片段，解析失败时回退为逐段翻译"""
+        if len(group) == 1:
+            await self._atranslate_item(group[0], results)
+            return
+
+        # 合并组内各片段的术语匹配
+        terminology: List[Dict[str, str]] = []
+        seen_terms = set()
+        for item in group:
+            for match in item["terminology_matches"]:
+                if match["term"] not in seen_terms:
+                    seen_terms.add(match["term"])
+                    terminology.append(match)
+
+        messages = create_tongyi_batch_messages(
+            segments=[item["text"] for item in group],
             source_language=source_language,
             target_language=target_language,
             context=context,
-            use_terminology=use_terminology,
+            terminology=terminology,
+        )
+        # 打包后的请求按各片段的总长度路由
+        packed_text = "".join(item["text"] for item in group)
+        with stage("upstream"):
+            response = await acall_tongyi_api(
+                messages,
+                route=make_route(
+                    packed_text, source_language, target_language, group[0]["route"]
+                ),
+            )
+
+        translations = None
+        if response["success"]:
+            translations = split_batch_translation(response["content"], len(group))
+
+        if translations is None:
+            print(f"批量翻译结果无法解析，回退为逐段翻译（{len(group)}段）")
+            await asyncio.gather(
+                *[self._atranslate_item(item, results) for item in group]
+            )
+            return
+
+        def store() -> None:
+            for item, translated_text in zip(group, translations):
+                self._store_item(item, translated_text)
+
+        await asyncio.to_thread(store)
+        for item, translated_text in zip(group, translations):
+            results[item["index"]] = self._batch_result(
+                item, translated_text=translated_text
+            )
+
+    async def _atranslate_item(
+        self, item: Dict[str, Any], results: List[Optional[Dict[str, Any]]]
+    ) -> None:
+        """单独翻译一个片段并记录结果"""
+        try:
+            with stage("upstream"):
+                response = await acall_tongyi_api(
+                    item["messages"],
+                    route=make_route(
+                        item["text"], item["source_language"],
+                        item["target_language"], item["route"],
+                    ),
+                )
+            translated_text = extract_translation(response)
+            await asyncio.to_thread(self._store_item, item, translated_text)
+            results[item["index"]] = self._batch_result(
+                item, translated_text=translated_text
+            )
+        except Exception as e:
+            results[item["index"]] = self._batch_result(item, error=str(e))
+
+    def _store_item(self, item: Dict[str, Any], translated_text: str) -> None:
+        """将批量翻译中单个片段的结果写入缓存和翻译记忆"""
+        self._store(
+            item["cache_key"], translated_text, item["terminology_matches"],
+            item["text"], item["source_language"], item["target_language"],
+            item["memory_scope"],
         )
+
+    @staticmethod
+    def _batch_result(
+        item: Dict[str, Any],
+        translated_text: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """构造批量翻译的单条结果"""
+        return {
+            "index": item["index"],
+            "status": "error" if error is not None else "success",
+            "translated_text": translated_text,
+            "detected_language": item["detected_language"],
+            "language_confidence": item["language_confidence"],
+            "terminology_matches": item["terminology_matches"],
+            "prompt_tokens": estimate_messages_tokens(item["messages"]),
+            "error": error,
+        }
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from typing import Any, Optional
+
+
+class AppServices:
+    """延迟构建翻译链、术语库和批量任务执行器等重量级组件
+
+    langchain、sklearn、numpy、dashscope等依赖只在build()中导入，
+    导入app模块和启动HTTP服务几乎不花时间；服务启动后由后台预热任务构建，
+    预热完成前到达的请求会等待同一次构建完成，而不会重复构建。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self.translation_chain: Any = None
+        self.job_runner: Any = None
+        self.error: Optional[str] = None
+        # 构建耗时（秒），未完成时为None
+        self.warmup_seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def build(self) -> None:
+        """导入依赖并构建全部组件（线程安全，只执行一次）
+
+        构建失败时记录错误并重新抛出，下次调用会重试。
+        """
+        if self._ready.is_set():
+            return
+        with self._lock:
+            if self._ready.is_set():
+                return
+            start = time.perf_counter()
+            try:
+                from chains.translation_chain import create_translation_chain
+                from utils.tongyi_utils import validate_credentials
+                from utils.translation_jobs import create_job_runner
+
+                # 检查是否设置了凭证
+                if not validate_credentials():
+                    print("警告：通义千问API密钥未正确配置！请检查DASHSCOPE_API_KEY环境变量。")
+
+                translation_chain = create_translation_chain()
+                self.job_runner = create_job_runner(translation_chain.translation_tool)
+                self.translation_chain = translation_chain
+            except Exception as e:
+                self.error = str(e)
+                print(f"服务初始化错误：{str(e)}")
+                raise
+            self.error = None
+            self.warmup_seconds = time.perf_counter() - start
+            self._ready.set()
+            print(f"服务预热完成，耗时{self.warmup_seconds:.2f}秒")
+
+    async def awarm_up(self) -> None:
+        """在线程池中构建组件，随后在当前事件循环中启动批量任务worker"""
+        await asyncio.to_thread(self.build)
+        if self.job_runner is not None:
+            self.job_runner.start()
+
+    async def atranslation_chain(self) -> Any:
+        """返回翻译链，尚未构建时等待构建完成"""
+        if not self._ready.is_set():
+            await asyncio.to_thread(self.build)
+        return self.translation_chain
+
+    async def atranslation_tool(self) -> Any:
+        return (await self.atranslation_chain()).translation_tool
+
+    async def aclose(self) -> None:
+        """停止批量任务worker、刷写术语日志并关闭上游连接池；未构建时无需清理"""
+        if not self._ready.is_set():
+            return
+        if self.job_runner is not None:
+            await self.job_runner.stop()
+        await asyncio.to_thread(self.translation_chain.translation_tool.glossary_registry.close)
+        from utils.tongyi_utils import get_model_router
+
+        # 各模型后端的客户端（含共享的默认客户端）
+        await get_model_router().aclose()
@@ -0,0 +1,111 @@
+import re
+from typing import List, Tuple
+
+# 段落分隔（空行）
+_PARAGRAPH_PATTERN = re.compile(r"(\n[ \t]*\n\s*)")
+# 句末标点：中文句号/叹号/问号，或后接空白的英文句末标点，可带后引号/括号
+_SENTENCE_END_PATTERN = re.compile(r"(?:[。！？]+|[!?.]+(?=\s|$))[”’\"'）)\]]*|\n")
+_LEADING_SPACE_PATTERN = re.compile(r"\s*")
+
+
+def split_sentences(text: str) -> List[str]:
+    """按中英文句末标点和换行拆分句子，每句保留其后的空白
+
+    Args:
+        text: 要拆分的文本
+
+    Returns:
+        句子列表，拼接后与原文完全一致
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END_PATTERN.finditer(text):
+        end = match.end()
+        end += _LEADING_SPACE_PATTERN.match(text, end).end() - end
+        if end > start:
+            sentences.append(text[start:end])
+            start = end
+    if start < len(text):
+        sentences.append(text[start:])
+    return sentences
+
+
+def _split_units(text: str, max_chars: int) -> List[str]:
+    """将文本拆为段落单元，超长段落再拆为句子单元
+
+    Returns:
+        单元列表，每个单元保留其后的空白，拼接后与原文完全一致
+    """
+    parts = _PARAGRAPH_PATTERN.split(text)
+    units = []
+    # split结果形如 [段落, 分隔, 段落, 分隔, ...]
+    for i in range(0, len(parts), 2):
+        paragraph = parts[i]
+        separator = parts[i + 1] if i + 1 < len(parts) else ""
+        if not paragraph:
+            if units:
+                units[-1] += separator
+            else:
+                units.append(separator)
+            continue
+        if len(paragraph) <= max_chars:
+            units.append(paragraph + separator)
+        else:
+            sentences = split_sentences(paragraph)
+            sentences[-1] += separator
+            units.extend(sentences)
+    return units
+
+
+def segment_document(text: str, max_chars: int = 1500) -> Tuple[List[str], List[str]]:
+    """将文档切分为可独立翻译的块
+
+    连续的段落/句子会被打包到不超过max_chars的块中；
+    块首尾的空白作为分隔符单独保存，翻译后原样拼回以保留原始格式。
+    满足 text == separators[0] + chunks[0] + separators[1] + ... + chunks[-1] + separators[-1]。
+
+    Args:
+        text: 文档全文
+        max_chars: 每块的最大字符数（单个超长句子除外）
+
+    Returns:
+        (块列表, 分隔符列表)，分隔符比块多一个
+    """
+    leading = _LEADING_SPACE_PATTERN.match(text).end()
+    separators = [text[:leading]]
+    chunks: List[str] = []
+
+    current = ""
+    for unit in _split_units(text[leading:], max_chars):
+        if current and len(current.rstrip()) + len(unit.rstrip()) > max_chars:
+            content = current.rstrip()
+            chunks.append(content)
+            separators.append(current[len(content):])
+            current = ""
+        current += unit
+
+    content = current.rstrip()
+    if content:
+        chunks.append(content)
+        separators.append(current[len(content):])
+    else:
+        separators[-1] += current
+
+    return chunks, separators
+
+
+def reassemble_document(translations: List[str], separators: List[str]) -> str:
+    """按原始分隔符拼接各块译文
+
+    Args:
+        translations: 与块顺序一致的译文
+        separators: segment_document返回的分隔符
+
+    Returns:
+        拼接后的完整译文
+    """
+    pieces = [separators[0]]
+    for translation, separator in zip(translations, separators[1:]):
+        pieces.append(translation.strip())
+        pieces.append(separator)
+    return "".join(pieces)
@@ -0,0 +1,280 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from utils.terminology_db import TerminologyDatabase
+
+# 默认术语表（data/terminology.json），未指定术语表的请求使用它
+DEFAULT_GLOSSARY = "default"
+# 术语表名只允许字母、数字、下划线和连字符，避免路径穿越
+_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class GlossaryRegistry:
+    """按名称管理多个术语表
+
+    默认术语表常驻内存；其余术语表存放在GLOSSARY_DIR目录下（<名称>.json），
+    首次被请求引用时才加载并构建索引，最多同时保留capacity个，
+    超出时淘汰最久未使用的一个。每个请求只检索它指定的术语表，
+    检索开销取决于这些术语表的规模，而不是全部术语的总和。
+
+    通过acquire()使用的术语表按引用计数管理：被淘汰时若仍有使用者，
+    等最后一个使用者释放后才关闭（刷写术语日志），期间再次请求会直接复用它。
+    """
+
+    def __init__(
+        self,
+        default: Optional[TerminologyDatabase] = None,
+        directory: Optional[str] = None,
+        capacity: Optional[int] = None,
+    ):
+        """初始化术语表注册表
+
+        Args:
+            default: 默认术语表，为空时加载data/terminology.json
+            directory: 命名术语表目录，为空时读取GLOSSARY_DIR环境变量
+            capacity: 同时加载的命名术语表上限，为空时读取GLOSSARY_CACHE_SIZE环境变量
+        """
+        self.default = default or TerminologyDatabase()
+        self.directory = directory or os.getenv("GLOSSARY_DIR", "data/glossaries")
+        if capacity is None:
+            capacity = int(os.getenv("GLOSSARY_CACHE_SIZE", "8"))
+        self.capacity = max(1, capacity)
+        self._loaded: "OrderedDict[str, TerminologyDatabase]" = OrderedDict()
+        # 术语表 -> 当前使用者数（默认术语表不计数）
+        self._users: Dict[TerminologyDatabase, int] = {}
+        # 已淘汰但仍有使用者的术语表，最后一个使用者释放时关闭
+        self._evicted: Dict[str, TerminologyDatabase] = {}
+        # 正在加载的术语表 -> 加载锁，同一术语表的并发请求只加载一次
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[List[str]], None]] = []
+        self._evictions = 0
+
+    def path(self, name: str) -> str:
+        """返回命名术语表的JSON文件路径"""
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"无效的术语表名称：{name}")
+        return os.path.join(self.directory, f"{name}.json")
+
+    def exists(self, name: str) -> bool:
+        """判断术语表是否存在"""
+        return name == DEFAULT_GLOSSARY or os.path.exists(self.path(name))
+
+    def names(self) -> List[str]:
+        """返回全部可用的术语表名称"""
+        names = [DEFAULT_GLOSSARY]
+        if os.path.isdir(self.directory):
+            for filename in sorted(os.listdir(self.directory)):
+                name, ext = os.path.splitext(filename)
+                if ext == ".json" and _NAME_PATTERN.match(name) and name != DEFAULT_GLOSSARY:
+                    names.append(name)
+        return names
+
+    def add_listener(self, callback: Callable[[List[str]], None]) -> None:
+        """注册术语变更回调，作用于已加载和之后加载的全部术语表"""
+        with self._lock:
+            self._listeners.append(callback)
+            databases = (
+                [self.default] + list(self._loaded.values()) + list(self._evicted.values())
+            )
+        for db in databases:
+            db.add_listener(callback)
+
+    def get(self, name: str, create: bool = False) -> TerminologyDatabase:
+        """返回术语表，未加载时加载并构建索引
+
+        返回的术语表可能随后被淘汰并关闭，需要持有它（检索、写入）时使用acquire()。
+
+        Args:
+            name: 术语表名称
+            create: 术语表不存在时是否创建空术语表
+
+        Returns:
+            术语数据库
+        """
+        return self._get(name, create, acquire=False)
+
+    @contextmanager
+    def acquire(
+        self, names: Optional[List[str]] = None, create: bool = False
+    ) -> Iterator[List[TerminologyDatabase]]:
+        """按名称顺序取得术语表（去重）并在使用期间阻止其被关闭
+
+        Args:
+            names: 术语表名称列表，为空时只使用默认术语表
+            create: 术语表不存在时是否创建空术语表
+
+        Yields:
+            术语数据库列表
+        """
+        databases: List[TerminologyDatabase] = []
+        try:
+            for name in dict.fromkeys(names or [DEFAULT_GLOSSARY]):
+                databases.append(self._get(name, create, acquire=True))
+            yield databases
+        finally:
+            for db in databases:
+                self._release(db)
+
+    def _get(self, name: str, create: bool, acquire: bool) -> TerminologyDatabase:
+        """返回术语表，acquire为True时在同一把锁内登记一个使用者"""
+        if name == DEFAULT_GLOSSARY:
+            return self.default
+
+        path = self.path(name)
+        db = self._cached(name, acquire)
+        if db is not None:
+            return db
+        with self._lock:
+            loading = self._loading.setdefault(name, threading.Lock())
+
+        with loading:
+            db = self._cached(name, acquire)
+            if db is not None:
+                return db
+
+            try:
+                if not create and not os.path.exists(path):
+                    raise ValueError(f"术语表不存在：{name}")
+                db = TerminologyDatabase(data_path=path)
+                print(f"已加载术语表 {name}（{len(db.terms)}个术语）")
+            finally:
+                with self._lock:
+                    self._loading.pop(name, None)
+
+            with self._lock:
+                for callback in self._listeners:
+                    db.add_listener(callback)
+                self._loaded[name] = db
+                if acquire:
+                    self._users[db] = self._users.get(db, 0) + 1
+                closing = self._evict()
+            for evicted in closing:
+                evicted.close()
+        return db
+
+    def _cached(self, name: str, acquire: bool) -> Optional[TerminologyDatabase]:
+        """返回已加载（或已淘汰但仍在使用）的术语表，未加载时返回None"""
+        closing: List[TerminologyDatabase] = []
+        with self._lock:
+            db = self._loaded.get(name)
+            if db is not None:
+                self._loaded.move_to_end(name)
+            else:
+                # 仍在使用中的已淘汰术语表重新放回，避免同一文件同时被两个实例写入
+                db = self._evicted.pop(name, None)
+                if db is None:
+                    return None
+                self._loaded[name] = db
+                closing = self._evict()
+            if acquire:
+                self._users[db] = self._users.get(db, 0) + 1
+        for evicted in closing:
+            evicted.close()
+        return db
+
+    def _evict(self) -> List[TerminologyDatabase]:
+        """淘汰超出容量的术语表，返回可以立即关闭的（调用方需持有self._lock）"""
+        closing = []
+        while len(self._loaded) > self.capacity:
+            evicted_name, evicted = self._loaded.popitem(last=False)
+            if self._users.get(evicted):
+                self._evicted[evicted_name] = evicted
+            else:
+                closing.append(evicted)
+            self._evictions += 1
+            print(f"术语表 {evicted_name} 已被淘汰")
+        return closing
+
+    def _release(self, db: TerminologyDatabase) -> None:
+        """释放一个使用者；已淘汰的术语表在最后一个使用者释放时关闭"""
+        if db is self.default:
+            return
+        with self._lock:
+            remaining = self._users[db] - 1
+            if remaining:
+                self._users[db] = remaining
+                return
+            del self._users[db]
+            closing = False
+            for name, evicted in list(self._evicted.items()):
+                if evicted is db:
+                    del self._evicted[name]
+                    closing = True
+        if closing:
+            db.close()
+
+    def resolve(self, names: Optional[List[str]] = None) -> List[TerminologyDatabase]:
+        """按名称顺序返回术语表（去重），未指定时只使用默认术语表"""
+        if not names:
+            return [self.default]
+        return [self.get(name) for name in dict.fromkeys(names)]
+
+    def batch_search(
+        self, text: str, names: Optional[List[str]] = None
+    ) -> List[Dict[str, str]]:
+        """在指定术语表中查找文本包含的术语
+
+        Args:
+            text: 要查找术语的文本
+            names: 术语表名称列表，为空时只使用默认术语表
+
+        Returns:
+            术语匹配列表，同一术语以排在前面的术语表为准
+        """
+        return self.batch_search_many([text], names)[0]
+
+    def batch_search_many(
+        self, texts: List[str], names: Optional[List[str]] = None
+    ) -> List[List[Dict[str, str]]]:
+        """批量查找多段文本包含的术语，每个术语表只做一次批量检索
+
+        Args:
+            texts: 文本列表
+            names: 术语表名称列表，为空时只使用默认术语表
+
+        Returns:
+            与texts一一对应的术语匹配列表
+        """
+        with self.acquire(names) as databases:
+            if len(databases) == 1:
+                return databases[0].batch_search_many(texts)
+
+            merged: List[List[Dict[str, str]]] = [[] for _ in texts]
+            seen = [set() for _ in texts]
+            for db in databases:
+                for index, matches in enumerate(db.batch_search_many(texts)):
+                    for match in matches:
+                        if match["term"] not in seen[index]:
+                            seen[index].add(match["term"])
+                            merged[index].append(match)
+            return merged
+
+    def close(self) -> None:
+        """关闭全部已加载的术语表（停止热更新并刷写术语日志）"""
+        with self._lock:
+            databases = (
+                [self.default] + list(self._loaded.values()) + list(self._evicted.values())
+            )
+            self._loaded.clear()
+            self._evicted.clear()
+            self._users.clear()
+        for db in databases:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """返回已加载术语表的状态"""
+        with self._lock:
+            loaded = list(self._loaded.items())
+        return {
+            "capacity": self.capacity,
+            "evictions": self._evictions,
+            "loaded": {
+                DEFAULT_GLOSSARY: self.default.stats(),
+                **{name: db.stats() for name, db in loaded},
+            },
+        }
@@ -0,0 +1,187 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple, Type
+
+import numpy as np
+import scipy.sparse as sp
+
+
+class IndexBackend(ABC):
+    """术语向量索引后端接口
+
+    后端负责根据查询向量找出相似度超过阈值的术语，
+    排序、截断和去重由TerminologyDatabase统一完成。
+    """
+
+    name = "base"
+
+    def __init__(self):
+        # (已合并矩阵, 其转置的CSR形式，即按n-gram组织的倒排索引)
+        self._inverted: Tuple[Optional[sp.csr_matrix], Optional[sp.csr_matrix]] = (None, None)
+
+    @abstractmethod
+    def query(
+        self, snapshot: Any, query: sp.csr_matrix, threshold: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """查询相似术语
+
+        Args:
+            snapshot: 术语索引快照（_IndexSnapshot）
+            query: L2归一化的查询TF-IDF矩阵
+            threshold: 相似度阈值 (0-1)
+
+        Returns:
+            (查询行号, 术语下标, 相似度)，顺序不限
+        """
+
+    def stats(self) -> Dict[str, Any]:
+        """返回后端配置，便于诊断"""
+        return {"backend": self.name}
+
+    def _get_inverted(self, matrix: sp.csr_matrix) -> sp.csr_matrix:
+        """返回矩阵的倒排索引（按快照的已合并矩阵缓存）
+
+        直接计算 query @ matrix.T 时scipy每次都会转置整个矩阵，
+        缓存转置结果后单次查询只需遍历查询n-gram的倒排链。
+        """
+        cached_matrix, inverted = self._inverted
+        if cached_matrix is not matrix:
+            inverted = matrix.T.tocsr()
+            self._inverted = (matrix, inverted)
+        return inverted
+
+    @staticmethod
+    def _filter(
+        similarities: sp.spmatrix, threshold: float, col_offset: int = 0
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """按阈值过滤稀疏相似度矩阵"""
+        similarities = similarities.tocoo()
+        keep = similarities.data > threshold
+        return (
+            similarities.row[keep].astype(np.int64),
+            similarities.col[keep].astype(np.int64) + col_offset,
+            similarities.data[keep],
+        )
+
+    def _query_pending(
+        self, snapshot: Any, query: sp.csr_matrix, threshold: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """对尚未合并的术语做精确查询（数量有限，直接暴力计算）"""
+        pending = snapshot.pending_matrix()
+        if pending is None:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+        return self._filter(query @ pending.T, threshold, snapshot.matrix.shape[0])
+
+    def _merge(self, *parts: Tuple[np.ndarray, np.ndarray, np.ndarray]):
+        """合并多段查询结果"""
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+
+class BruteForceBackend(IndexBackend):
+    """暴力余弦相似度：一次稀疏矩阵乘法，结果精确"""
+
+    name = "brute"
+
+    def query(
+        self, snapshot: Any, query: sp.csr_matrix, threshold: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        main = self._filter(query @ self._get_inverted(snapshot.matrix), threshold)
+        return self._merge(main, self._query_pending(snapshot, query, threshold))
+
+
+class PrunedInvertedBackend(IndexBackend):
+    """剪枝倒排索引的近似检索
+
+    只沿查询中较罕见的n-gram的倒排链收集候选术语。常见n-gram
+    （倒排链长度超过max_postings）的IDF很低、对余弦贡献很小，
+    却主导了暴力计算的代价，跳过它们可使查询代价与术语库规模基本无关。
+
+    罕见n-gram得到的部分相似度加上常见n-gram部分的范数即为相似度上界，
+    上界未超过阈值的候选直接丢弃，其余候选再精确重排。
+    只有与查询不共享任何罕见n-gram的术语会被漏召回，
+    max_postings越大召回越高、延迟也越高。
+    """
+
+    name = "pruned"
+
+    # 精确重排时每批处理的候选对数量，限制内存峰值
+    RERANK_CHUNK = 50000
+
+    def __init__(self, max_postings: int = 200):
+        super().__init__()
+        self.max_postings = max_postings
+
+    def query(
+        self, snapshot: Any, query: sp.csr_matrix, threshold: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        matrix = snapshot.matrix
+        inverted = self._get_inverted(matrix)
+        postings = np.diff(inverted.indptr)
+
+        # 按倒排链长度把查询拆成罕见部分和常见部分
+        common_mask = postings[query.indices] > self.max_postings
+        rare = query.copy()
+        rare.data[common_mask] = 0
+        rare.eliminate_zeros()
+        common = query.copy()
+        common.data[~common_mask] = 0
+        common.eliminate_zeros()
+        common_norm = np.sqrt(
+            np.asarray(common.multiply(common).sum(axis=1)).ravel()
+        )
+
+        # 只沿罕见n-gram的倒排链召回候选，并用上界剪枝
+        partial = (rare @ inverted).tocoo()
+        survivors = partial.data + common_norm[partial.row] > threshold
+        rows = partial.row[survivors].astype(np.int64)
+        cols = partial.col[survivors].astype(np.int64)
+        scores = partial.data[survivors]
+
+        # 补上常见n-gram部分，得到精确相似度
+        for start in range(0, len(rows), self.RERANK_CHUNK):
+            end = start + self.RERANK_CHUNK
+            chunk_rows = rows[start:end]
+            needs_common = common_norm[chunk_rows] > 0
+            if not needs_common.any():
+                continue
+            index = np.nonzero(needs_common)[0] + start
+            scores[index] += np.asarray(
+                common[rows[index]].multiply(matrix[cols[index]]).sum(axis=1)
+            ).ravel()
+
+        keep = scores > threshold
+        main = (rows[keep], cols[keep], scores[keep])
+
+        return self._merge(main, self._query_pending(snapshot, query, threshold))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "max_postings": self.max_postings}
+
+
+INDEX_BACKENDS: Dict[str, Type[IndexBackend]] = {
+    BruteForceBackend.name: BruteForceBackend,
+    PrunedInvertedBackend.name: PrunedInvertedBackend,
+}
+
+
+def create_index_backend(name: Optional[str] = None, **options: Any) -> IndexBackend:
+    """根据名称或环境变量创建索引后端
+
+    Args:
+        name: 后端名称（'brute'或'pruned'），为空时读取TERMINOLOGY_INDEX_BACKEND
+        options: 传给后端构造函数的参数，未提供时读取对应环境变量
+
+    Returns:
+        索引后端实例
+    """
+    name = name or os.getenv("TERMINOLOGY_INDEX_BACKEND", "brute")
+    if name not in INDEX_BACKENDS:
+        raise ValueError(f"不支持的术语索引后端：{name}")
+
+    if name == PrunedInvertedBackend.name:
+        options.setdefault(
+            "max_postings", int(os.getenv("TERMINOLOGY_PRUNED_MAX_POSTINGS", "200"))
+        )
+
+    return INDEX_BACKENDS[name](**options)
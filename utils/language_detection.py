@@ -0,0 +1,108 @@
+import re
+from typing import Dict, List
+
+# 各文字系统的预编译Unicode范围；以空格分词的文字按单词计数（模式带+），
+# 汉字、假名、谚文和泰文按字符计数，使一个中文字符与一个英文单词的权重大致相当
+_SCRIPT_PATTERNS = {
+    "han": re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]"),
+    "kana": re.compile(r"[\u3040-\u30ff\u31f0-\u31ff\uff66-\uff9f]"),
+    "hangul": re.compile(r"[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]"),
+    "cyrillic": re.compile(r"[\u0400-\u04ff]+"),
+    "greek": re.compile(r"[\u0370-\u03ff]+"),
+    "arabic": re.compile(r"[\u0600-\u06ff\u0750-\u077f]+"),
+    "hebrew": re.compile(r"[\u0590-\u05ff]+"),
+    "devanagari": re.compile(r"[\u0900-\u097f]+"),
+    "thai": re.compile(r"[\u0e00-\u0e7f]"),
+    "latin": re.compile(r"[A-Za-z\u00c0-\u024f]+"),
+}
+
+# 文字系统 -> 语言代码（日文由汉字+假名共同判定）
+_SCRIPT_LANGUAGES = {
+    "han": "zh",
+    "hangul": "ko",
+    "cyrillic": "ru",
+    "greek": "el",
+    "arabic": "ar",
+    "hebrew": "he",
+    "devanagari": "hi",
+    "thai": "th",
+    "latin": "en",
+}
+
+# 假名在汉字+假名中的占比超过该值时判定为日文
+_KANA_RATIO = 0.1
+
+# 超过该长度的文本只抽样检测
+SAMPLE_WINDOW = 1024
+SAMPLE_WINDOWS = 8
+# 已扫描窗口中领先语言的得分占比超过该值时提前结束
+EARLY_EXIT_CONFIDENCE = 0.95
+EARLY_EXIT_MIN_SCORE = 64
+
+DEFAULT_LANGUAGE = "en"
+
+
+def _sample_windows(text: str) -> List[str]:
+    """长文本均匀抽取若干窗口，短文本整体作为一个窗口"""
+    if len(text) <= SAMPLE_WINDOW * SAMPLE_WINDOWS:
+        windows = range(0, len(text), SAMPLE_WINDOW)
+        return [text[i:i + SAMPLE_WINDOW] for i in windows] or [""]
+    step = (len(text) - SAMPLE_WINDOW) // (SAMPLE_WINDOWS - 1)
+    return [text[i * step:i * step + SAMPLE_WINDOW] for i in range(SAMPLE_WINDOWS)]
+
+
+def _language_scores(counts: Dict[str, int]) -> Dict[str, int]:
+    """将文字系统计数换算为语言得分"""
+    scores: Dict[str, int] = {}
+    cjk = counts["han"] + counts["kana"]
+    if counts["kana"] and counts["kana"] >= cjk * _KANA_RATIO:
+        scores["ja"] = cjk
+    elif counts["han"]:
+        scores["zh"] = counts["han"]
+    for script, language in _SCRIPT_LANGUAGES.items():
+        if script != "han" and counts[script]:
+            scores[language] = scores.get(language, 0) + counts[script]
+    return scores
+
+
+def detect_language_with_confidence(text: str) -> Dict[str, object]:
+    """检测文本语言并给出置信度
+
+    按文字系统的Unicode范围统计，只在C层面执行正则匹配；长文本均匀抽样，
+    且领先语言优势明显时提前结束扫描，耗时与文本长度基本无关。
+    拉丁字母文本统一判定为英文。
+
+    Args:
+        text: 要检测语言的文本
+
+    Returns:
+        {"language": 语言代码, "confidence": 0-1, "scores": 各语言得分}
+    """
+    counts = {script: 0 for script in _SCRIPT_PATTERNS}
+    scores: Dict[str, int] = {}
+    for window in _sample_windows(text):
+        for script, pattern in _SCRIPT_PATTERNS.items():
+            counts[script] += len(pattern.findall(window))
+        scores = _language_scores(counts)
+        total = sum(scores.values())
+        if (
+            total >= EARLY_EXIT_MIN_SCORE
+            and max(scores.values()) >= total * EARLY_EXIT_CONFIDENCE
+        ):
+            break
+
+    total = sum(scores.values())
+    if not total:
+        return {"language": DEFAULT_LANGUAGE, "confidence": 0.0, "scores": {}}
+
+    language = max(scores, key=scores.get)
+    return {
+        "language": language,
+        "confidence": round(scores[language] / total, 3),
+        "scores": scores,
+    }
+
+
+def detect_language(text: str) -> str:
+    """检测文本语言，返回语言代码（'zh'、'en'、'ja'、'ko'等）"""
+    return detect_language_with_confidence(text)["language"]
@@ -0,0 +1,232 @@
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 默认直方图分桶（秒），覆盖本地处理的亚毫秒级到上游调用的数十秒
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        '{}="{}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """单调递增计数器，按标签值分别计数"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram:
+    """累积分桶直方图，按标签值分别统计"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # 标签值 -> [各桶计数（非累积）, 总和]
+        self._values: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(
+                (key, (list(counts), total)) for key, (counts, total) in self._values.items()
+            )
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """进程内指标注册表，按Prometheus文本格式（0.0.4）输出"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        """输出全部指标"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "translation_stage_duration_seconds", "翻译各阶段耗时（秒）", ("stage",)
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "translation_http_request_duration_seconds",
+    "HTTP请求处理耗时（秒，流式响应计到开始返回为止）",
+    ("method", "path", "status"),
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "translation_upstream_requests_total", "上游API调用次数（按响应状态码）", ("status",)
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "translation_upstream_retries_total", "上游API重试次数（按失败原因）", ("reason",)
+)
+UPSTREAM_BACKEND_REQUESTS = REGISTRY.counter(
+    "translation_upstream_backend_requests_total",
+    "各模型后端的调用次数（success/error，cancelled为被对冲取消）",
+    ("backend", "result"),
+)
+UPSTREAM_HEDGES = REGISTRY.counter(
+    "translation_upstream_hedges_total",
+    "对冲请求次数（launched为发出，won为先于首选后端成功返回）",
+    ("result",),
+)
+UPSTREAM_TOKENS = REGISTRY.counter(
+    "translation_upstream_tokens_total", "上游返回的token用量", ("type",)
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "translation_cache_lookups_total",
+    "译文复用查询次数（memory为翻译记忆复用，hit/miss为缓存命中/未命中）",
+    ("result",),
+)
+
+# 当前请求的阶段耗时列表，为None表示未开启按请求记录
+_request_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = (
+    contextvars.ContextVar("request_timings", default=None)
+)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """记录一个阶段的耗时：写入直方图，并在开启按请求记录时追加到当前请求"""
+    STAGE_SECONDS.observe(seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """统计代码块耗时的上下文管理器，同步和异步代码中均可使用"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def start_request_timing() -> List[Tuple[str, float]]:
+    """为当前请求开启阶段耗时记录，返回记录列表
+
+    列表对象随上下文传递给线程池和子任务，各处追加的耗时都会汇总到这里。
+    """
+    timings: List[Tuple[str, float]] = []
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing_header(timings: List[Tuple[str, float]], total: float) -> str:
+    """生成Server-Timing头，同名阶段（如多次重试）的耗时累加
+
+    Args:
+        timings: (阶段名, 秒) 列表
+        total: 请求总耗时（秒）
+
+    Returns:
+        形如 "detect_language;dur=0.12, upstream;dur=230.5, total;dur=232.1" 的头部值（毫秒）
+    """
+    durations: Dict[str, float] = {}
+    for name, seconds in timings:
+        durations[name] = durations.get(name, 0.0) + seconds
+    durations["total"] = total
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in durations.items())
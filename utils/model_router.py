@@ -0,0 +1,359 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from utils.rate_limiter import create_circuit_breaker
+
+# 未配置TONGYI_BACKENDS时唯一后端使用的模型
+DEFAULT_MODEL = os.getenv("TONGYI_MODEL", "qwen-plus")
+# 延迟EWMA的平滑系数，越大越偏向最近的请求
+LATENCY_ALPHA = float(os.getenv("TONGYI_LATENCY_ALPHA", "0.2"))
+# 计算延迟分位数的最近样本数，以及开始使用分位数所需的最少样本数
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+# 过慢的后端每隔该秒数按原优先级放行一次请求作为探测，刷新其延迟EWMA
+SLOW_PROBE_INTERVAL = float(os.getenv("TONGYI_SLOW_PROBE_INTERVAL", "30"))
+# 对冲：样本不足时首选后端的等待时间（秒）、等待时间下限（秒）、
+# 对冲请求数占路由请求数的上限（0表示不对冲）
+HEDGE_DELAY = float(os.getenv("TONGYI_HEDGE_DELAY", "2.0"))
+HEDGE_MIN_DELAY = float(os.getenv("TONGYI_HEDGE_MIN_DELAY", "0.05"))
+HEDGE_RATIO = float(os.getenv("TONGYI_HEDGE_RATIO", "0.1"))
+
+
+def make_route(
+    text: str,
+    source_language: str,
+    target_language: str,
+    flag: Optional[str] = None,
+) -> Dict[str, Any]:
+    """构造路由依据：待翻译文本的字符数、语言对和请求携带的路由标记"""
+    return {
+        "chars": len(text),
+        "source_language": source_language,
+        "target_language": target_language,
+        "flag": flag,
+    }
+
+
+class Backend:
+    """一个上游模型后端：模型名、客户端、独立的熔断器，以及延迟和用量统计"""
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        client: Any,
+        cost: float = 1.0,
+        max_latency: Optional[float] = None,
+    ):
+        """初始化后端
+
+        Args:
+            name: 后端名称，路由规则和请求的路由标记通过它引用后端
+            model: 调用的模型名
+            client: 通义千问客户端（SDKClient或HTTPClient）
+            cost: 每千token的相对价格，用于估算各后端的费用
+            max_latency: 延迟EWMA超过该值（秒）时视为过慢，路由时排到其他候选之后，
+                每隔SLOW_PROBE_INTERVAL秒放行一次探测请求
+        """
+        self.name = name
+        self.model = model
+        self.client = client
+        self.cost = cost
+        self.max_latency = max_latency
+        # 各后端独立熔断，一个模型故障时其余模型仍可接管
+        self.breaker = create_circuit_breaker()
+        self.ewma: Optional[float] = None
+        self._samples: deque = deque(maxlen=LATENCY_WINDOW)
+        # 上次放行探测请求的时间（time.monotonic）
+        self._probed_at = 0.0
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.cancelled = 0
+        self.tokens = 0
+
+    def observe(self, seconds: float) -> None:
+        """记录一次请求的耗时"""
+        with self._lock:
+            self.ewma = seconds if self.ewma is None else (
+                LATENCY_ALPHA * seconds + (1 - LATENCY_ALPHA) * self.ewma
+            )
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """返回最近请求耗时的q分位数（秒），样本不足时返回None"""
+        with self._lock:
+            if len(self._samples) < MIN_LATENCY_SAMPLES:
+                return None
+            values = sorted(self._samples)
+        return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+    def record(self, seconds: Optional[float], success: bool, tokens: int = 0) -> None:
+        """记录一次已完成的请求，只有成功请求的耗时计入延迟统计（seconds为空时不计）"""
+        with self._lock:
+            self.requests += 1
+            if success:
+                self.successes += 1
+                self.tokens += tokens
+            else:
+                self.failures += 1
+        if success and seconds is not None:
+            self.observe(seconds)
+
+    def record_cancelled(self, seconds: float) -> None:
+        """记录一次被对冲取消的请求
+
+        取消时的已等待时间是真实延迟的下界，同样计入延迟统计，
+        否则总是被取消的慢后端会显得很快。
+        """
+        with self._lock:
+            self.requests += 1
+            self.cancelled += 1
+        self.observe(seconds)
+
+    def available(self) -> bool:
+        """熔断器未处于冷却期（不占用半开状态的探测名额）"""
+        return self.breaker.retry_after() == 0
+
+    def slow(self) -> bool:
+        return self.max_latency is not None and (self.ewma or 0.0) > self.max_latency
+
+    def demoted(self) -> bool:
+        """过慢时返回True，排到其他候选之后
+
+        排在末尾的后端很少被调用，延迟EWMA得不到刷新，恢复后也会一直被视为过慢。
+        因此与熔断器的半开状态类似，每隔SLOW_PROBE_INTERVAL秒放行一次请求按原优先级路由，
+        用它的实际耗时更新EWMA。
+        """
+        if not self.slow():
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._probed_at < SLOW_PROBE_INTERVAL:
+                return True
+            self._probed_at = now
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.50), self.percentile(0.95)
+        return {
+            "model": self.model,
+            "requests": self.requests,
+            "successes": self.successes,
+            "failures": self.failures,
+            "cancelled": self.cancelled,
+            "ewma_ms": round(self.ewma * 1000, 1) if self.ewma is not None else None,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "tokens": self.tokens,
+            "estimated_cost": round(self.tokens * self.cost / 1000, 4),
+            "circuit_breaker": self.breaker.stats(),
+        }
+
+
+def _match_languages(patterns: List[str], source_language: str, target_language: str) -> bool:
+    """匹配形如"en-zh"的语言对，任一侧可以是通配符*"""
+    for pattern in patterns:
+        source, _, target = pattern.partition("-")
+        if source in ("*", source_language) and target in ("*", target_language):
+            return True
+    return False
+
+
+class ModelRouter:
+    """按规则为请求选择模型后端，并根据各后端的实时延迟决定故障转移和对冲
+
+    规则按顺序匹配，第一条命中的规则给出候选后端（首选在前），
+    未命中任何规则时按配置顺序使用全部后端。规则可按以下条件匹配（均可省略）：
+        flag       请求携带的路由标记
+        languages  语言对列表，如["en-zh", "*-ja"]
+        min_chars  待翻译文本的最少字符数
+        max_chars  待翻译文本的最多字符数
+    路由标记与后端同名时直接以该后端为首选。候选中熔断冷却中的后端、
+    延迟EWMA超过max_latency的后端排到其余后端之后（过慢的后端定期放行探测请求）。
+
+    首选后端失败时立即转到下一个候选；超过其p95延迟仍未返回时，
+    向下一个候选发出对冲请求并采用先成功的结果，对冲请求数受HEDGE_RATIO限制。
+    """
+
+    def __init__(
+        self,
+        backends: List[Backend],
+        rules: Optional[List[Dict[str, Any]]] = None,
+        hedge_delay: float = HEDGE_DELAY,
+        hedge_min_delay: float = HEDGE_MIN_DELAY,
+        hedge_ratio: float = HEDGE_RATIO,
+    ):
+        """初始化路由器
+
+        Args:
+            backends: 后端列表，至少一个
+            rules: 路由规则列表
+            hedge_delay: 样本不足以估计p95时首选后端的等待时间（秒）
+            hedge_min_delay: 对冲等待时间下限（秒）
+            hedge_ratio: 对冲请求数占路由请求数的上限，0表示不对冲
+        """
+        if not backends:
+            raise ValueError("至少需要配置一个模型后端")
+        self.backends = {backend.name: backend for backend in backends}
+        if len(self.backends) != len(backends):
+            raise ValueError("模型后端名称不能重复")
+        self.rules = rules or []
+        for rule in self.rules:
+            unknown = [name for name in rule.get("backends", []) if name not in self.backends]
+            if not rule.get("backends") or unknown:
+                raise ValueError(f"路由规则引用了不存在的后端：{rule}")
+        self.hedge_delay = hedge_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_ratio = hedge_ratio
+        self._lock = threading.Lock()
+
+        self.routed = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    @property
+    def default(self) -> Backend:
+        """第一个后端，未命中规则时的首选"""
+        return next(iter(self.backends.values()))
+
+    def flags(self) -> List[str]:
+        """返回可用的路由标记：规则中的标记和后端名称"""
+        flags = [rule["flag"] for rule in self.rules if rule.get("flag")]
+        return list(dict.fromkeys(flags + list(self.backends)))
+
+    def select(self, route: Optional[Dict[str, Any]] = None) -> List[Backend]:
+        """按路由规则返回候选后端（首选在前）
+
+        Args:
+            route: make_route()构造的路由依据，为空时使用默认顺序
+
+        Returns:
+            候选后端列表
+        """
+        with self._lock:
+            self.routed += 1
+
+        candidates = list(self.backends.values())
+        flag = route.get("flag") if route else None
+        if flag in self.backends:
+            named = self.backends[flag]
+            candidates = [named] + [backend for backend in candidates if backend is not named]
+        elif route:
+            for rule in self.rules:
+                if self._matches(rule, route):
+                    candidates = [self.backends[name] for name in rule["backends"]]
+                    break
+
+        # 稳定排序：可用且不慢的后端保持原有优先级排在前面
+        return sorted(candidates, key=self._rank)
+
+    @staticmethod
+    def _rank(backend: Backend) -> tuple:
+        # 熔断中的后端不占用过慢后端的探测名额
+        if not backend.available():
+            return (True, False)
+        return (False, backend.demoted())
+
+    @staticmethod
+    def _matches(rule: Dict[str, Any], route: Dict[str, Any]) -> bool:
+        if rule.get("flag") and rule["flag"] != route.get("flag"):
+            return False
+        if rule.get("languages") and not _match_languages(
+            rule["languages"], route["source_language"], route["target_language"]
+        ):
+            return False
+        if rule.get("min_chars") is not None and route["chars"] < rule["min_chars"]:
+            return False
+        if rule.get("max_chars") is not None and route["chars"] > rule["max_chars"]:
+            return False
+        return True
+
+    def hedge_after(self, backend: Backend) -> float:
+        """返回向backend发出请求后，等待多久仍未返回时发出对冲请求（秒）"""
+        p95 = backend.percentile(0.95)
+        return max(self.hedge_min_delay, self.hedge_delay if p95 is None else p95)
+
+    def try_hedge(self) -> bool:
+        """在对冲预算内登记一次对冲请求，超出预算时返回False"""
+        with self._lock:
+            if self.hedges + 1 > self.hedge_ratio * self.routed:
+                return False
+            self.hedges += 1
+            return True
+
+    def record_hedge_win(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+
+    def record_failover(self) -> None:
+        with self._lock:
+            self.failovers += 1
+
+    async def aclose(self) -> None:
+        """关闭各后端的客户端连接池（共享的客户端只关闭一次）"""
+        clients = {id(backend.client): backend.client for backend in self.backends.values()}
+        for client in clients.values():
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "routed": self.routed,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "hedge_ratio": self.hedge_ratio,
+            "rules": len(self.rules),
+            "backends": {name: backend.stats() for name, backend in self.backends.items()},
+        }
+
+
+def _load_json(name: str) -> Any:
+    value = os.getenv(name, "").strip()
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError as e:
+        raise ValueError(f"{name}不是有效的JSON：{str(e)}")
+
+
+def create_model_router(default_client: Any) -> ModelRouter:
+    """根据环境变量创建路由器
+
+    TONGYI_BACKENDS为后端列表（JSON），每项包含name、model，可选cost、max_latency，
+    以及base_url（单独的接口地址，如另一个模拟服务；为空时共用default_client）；
+    TONGYI_ROUTES为路由规则列表（JSON）。未配置后端时只有一个使用TONGYI_MODEL的default后端。
+
+    Args:
+        default_client: 共享的通义千问客户端
+
+    Returns:
+        模型路由器
+    """
+    from utils.tongyi_client import create_tongyi_client
+
+    specs = _load_json("TONGYI_BACKENDS") or [{"name": "default", "model": DEFAULT_MODEL}]
+    backends = []
+    for spec in specs:
+        if not spec.get("name") or not spec.get("model"):
+            raise ValueError(f"模型后端缺少name或model：{spec}")
+        client = default_client
+        if spec.get("base_url"):
+            client = create_tongyi_client(base_url=spec["base_url"])
+        backends.append(Backend(
+            name=spec["name"],
+            model=spec["model"],
+            client=client,
+            cost=float(spec.get("cost", 1.0)),
+            max_latency=spec.get("max_latency"),
+        ))
+
+    return ModelRouter(backends, rules=_load_json("TONGYI_ROUTES"))
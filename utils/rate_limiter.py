@@ -0,0 +1,283 @@
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class TokenBucket:
+    """令牌桶：按固定速率补充令牌，允许短时突发
+
+    reserve()立即扣除令牌（允许透支）并返回调用方需要等待的秒数，
+    同步和异步调用方各自用time.sleep或asyncio.sleep等待，
+    并发请求因此按速率自然错开，而不是同时醒来重试。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发量），默认等于一秒的令牌数
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """预订令牌
+
+        Args:
+            amount: 需要的令牌数
+            now: 当前时间（time.monotonic）
+
+        Returns:
+            需要等待的秒数
+        """
+        self._refill(now)
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def adjust(self, amount: float, now: float) -> None:
+        """按实际用量修正已扣除的令牌（amount为正表示多扣）"""
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self, now: float) -> None:
+        """清空令牌，之后的请求按当前速率重新排队"""
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+
+class AdaptiveRateLimiter:
+    """进程级自适应限流：请求数/秒和token数/分钟两个令牌桶
+
+    收到429限流响应时请求速率减半并清空令牌桶（乘性减），
+    之后每次成功调用按上限的固定比例逐步恢复（加性增），
+    使吞吐稳定在配额上限附近而不会反复触发限流。
+    """
+
+    # 限流后速率下限占配置上限的比例
+    MIN_RATE_RATIO = 0.05
+    # 每次成功调用恢复的速率占配置上限的比例
+    RECOVERY_RATIO = 0.02
+    # 两次降速的最小间隔（秒）：同一次限流会让多个在途请求同时收到429，只应降速一次
+    DECREASE_INTERVAL = 1.0
+
+    def __init__(self, requests_per_second: float = 0, tokens_per_minute: float = 0):
+        """初始化限流器
+
+        Args:
+            requests_per_second: 每秒请求数上限，小于等于0表示不限
+            tokens_per_minute: 每分钟token数上限，小于等于0表示不限
+        """
+        self.max_rate = requests_per_second
+        self.requests = TokenBucket(requests_per_second) if requests_per_second > 0 else None
+        self.tokens = (
+            TokenBucket(tokens_per_minute / 60, capacity=tokens_per_minute / 6)
+            if tokens_per_minute > 0
+            else None
+        )
+        self._lock = threading.Lock()
+        self._decreased_at = float("-inf")
+
+        self.throttled = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def reserve(self, estimated_tokens: int = 0) -> float:
+        """为一次调用预订配额
+
+        Args:
+            estimated_tokens: 预估的token用量（输入+输出）
+
+        Returns:
+            调用前需要等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self.requests is not None:
+                delay = self.requests.reserve(1, now)
+            if self.tokens is not None and estimated_tokens:
+                delay = max(delay, self.tokens.reserve(estimated_tokens, now))
+            if delay > 0:
+                self.waits += 1
+                self.wait_seconds += delay
+            return delay
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """按实际token用量修正预估"""
+        if self.tokens is None or actual_tokens is None:
+            return
+        with self._lock:
+            self.tokens.adjust(estimated_tokens - actual_tokens, time.monotonic())
+
+    def on_success(self) -> None:
+        """成功调用后逐步恢复速率"""
+        if self.requests is None or self.requests.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.requests.rate = min(
+                self.max_rate, self.requests.rate + self.max_rate * self.RECOVERY_RATIO
+            )
+
+    def on_throttled(self) -> None:
+        """收到429后降低速率并清空令牌桶"""
+        with self._lock:
+            self.throttled += 1
+            now = time.monotonic()
+            if now - self._decreased_at < self.DECREASE_INTERVAL:
+                return
+            self._decreased_at = now
+            if self.requests is not None:
+                self.requests.rate = max(
+                    self.max_rate * self.MIN_RATE_RATIO, self.requests.rate / 2
+                )
+                self.requests.drain(now)
+            if self.tokens is not None:
+                self.tokens.drain(now)
+
+    def stats(self) -> Dict[str, Any]:
+        """返回限流器状态"""
+        return {
+            "max_requests_per_second": self.max_rate or None,
+            "current_requests_per_second": (
+                round(self.requests.rate, 3) if self.requests is not None else None
+            ),
+            "tokens_per_minute": (
+                round(self.tokens.rate * 60) if self.tokens is not None else None
+            ),
+            "throttled": self.throttled,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+class CircuitBreaker:
+    """熔断器：上游连续失败时快速失败，冷却后放行单个探测请求
+
+    状态依次为closed（正常）→ open（熔断，直接拒绝）→
+    half_open（冷却结束，只放行一个探测请求）；探测成功则恢复closed，失败则重新open。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """初始化熔断器
+
+        Args:
+            failure_threshold: 触发熔断的连续失败次数，小于等于0表示不启用
+            recovery_timeout: 熔断后等待多久放行探测请求（秒）
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        # 探测请求的发出时间，为None表示没有在途的探测请求
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+        self.rejected = 0
+        self.trips = 0
+
+    def allow(self) -> bool:
+        """判断是否允许发出请求"""
+        if self.failure_threshold <= 0:
+            return True
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                if now - self.opened_at < self.recovery_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_started = None
+            # 半开状态只放行一个探测请求；探测请求被取消而未回报结果时，超时后再放行一个
+            if (
+                self._probe_started is not None
+                and now - self._probe_started < self.recovery_timeout
+            ):
+                self.rejected += 1
+                return False
+            self._probe_started = now
+            return True
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_started = None
+
+    def on_failure(self) -> None:
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe_started = None
+
+    def retry_after(self) -> float:
+        """熔断状态下距离放行探测请求的剩余秒数"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+
+    def stats(self) -> Dict[str, Any]:
+        """返回熔断器状态"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_after": round(self.retry_after(), 3),
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """带完全抖动的指数退避时间
+
+    在 [0, min(cap, base * 2^attempt)] 内均匀取值，
+    避免并发请求在同一时刻集中重试。
+
+    Args:
+        attempt: 已失败的次数（从0开始）
+        base: 基础退避时间（秒）
+        cap: 退避时间上限（秒）
+
+    Returns:
+        退避秒数
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def create_rate_limiter() -> AdaptiveRateLimiter:
+    """根据环境变量创建限流器"""
+    return AdaptiveRateLimiter(
+        requests_per_second=float(os.getenv("TONGYI_RATE_LIMIT_RPS", "50")),
+        tokens_per_minute=float(os.getenv("TONGYI_RATE_LIMIT_TPM", "0")),
+    )
+
+
+def create_circuit_breaker() -> CircuitBreaker:
+    """根据环境变量创建熔断器"""
+    return CircuitBreaker(
+        failure_threshold=int(os.getenv("TONGYI_BREAKER_THRESHOLD", "5")),
+        recovery_timeout=float(os.getenv("TONGYI_BREAKER_TIMEOUT", "30")),
+    )
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from utils.metrics import stage
+
+
+class SingleFlight:
+    """合并相同键的并发调用：同一时刻只执行一次，所有等待方共享结果或异常"""
+
+    def __init__(self):
+        # 键 -> 正在执行的异步任务
+        self._tasks: Dict[str, asyncio.Future] = {}
+        # 键 -> (完成事件, 结果容器)，用于同步调用
+        self._calls: Dict[str, Tuple[threading.Event, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def ado(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """执行异步调用，已有相同键的调用在途时直接等待其结果
+
+        共享调用在独立任务中运行，某个等待方被取消（如客户端断开）
+        不会影响其他等待方。共享调用的各阶段耗时只记在发起方的请求上，
+        其余等待方记录一个singleflight_wait阶段。
+
+        Args:
+            key: 合并键
+            func: 返回协程的无参函数
+
+        Returns:
+            共享调用的结果
+        """
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(func())
+            self._tasks[key] = task
+            self.leaders += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+            return await asyncio.shield(task)
+
+        self.coalesced += 1
+        with stage("singleflight_wait"):
+            return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # 所有等待方都已取消时，避免“异常未被获取”的警告
+        if not task.cancelled():
+            task.exception()
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """同步版本的ado，等待方阻塞直到共享调用完成"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = (threading.Event(), {})
+                self._calls[key] = call
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        event, outcome = call
+        if not leader:
+            with stage("singleflight_wait"):
+                event.wait()
+        else:
+            try:
+                outcome["result"] = func()
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                event.set()
+
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    def stats(self) -> Dict[str, Any]:
+        """返回合并统计信息"""
+        return {
+            "in_flight": len(self._tasks) + len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
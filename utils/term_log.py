@@ -0,0 +1,294 @@
+import json
+import os
+import shutil
+import threading
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+def fsync_directory(path: str) -> None:
+    """同步目录项，保证重命名/删除在掉电后仍然生效（不支持的平台上忽略）"""
+    try:
+        fd = os.open(path or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _encode(item: Dict[str, str]) -> bytes:
+    """编码一条日志记录：8位十六进制CRC32 + 空格 + JSON + 换行"""
+    payload = json.dumps(
+        {"term": item["term"], "translation": item["translation"]}, ensure_ascii=False
+    ).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def _decode(line: bytes) -> Optional[Dict[str, str]]:
+    """解码一条日志记录，不完整或校验失败时返回None"""
+    if len(line) < 10 or not line.endswith(b"\n") or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        record = json.loads(payload.decode("utf-8"))
+        return {"term": record["term"], "translation": record["translation"]}
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class TermLog:
+    """术语写前日志（WAL）
+
+    每次术语变更以一条带CRC校验的JSON行追加到日志文件末尾，
+    写入即返回（数据已交给操作系统，进程崩溃不会丢失），
+    fsync由后台线程按sync_interval批量执行，掉电时最多丢失最近一个间隔内的写入。
+
+    检查点时当前日志被重命名为<日志>.checkpoint段，新写入进入新日志；
+    快照写完后删除该段。启动时先重放遗留的段再重放当前日志，
+    记录按写入顺序覆盖，重复重放结果不变。
+    """
+
+    def __init__(self, path: str, sync_interval: Optional[float] = None):
+        """初始化写前日志
+
+        Args:
+            path: 日志文件路径（首次写入时创建）
+            sync_interval: 批量fsync的间隔（秒），0表示每次写入都fsync，
+                为空时读取TERMINOLOGY_WAL_SYNC_INTERVAL环境变量
+        """
+        self.path = path
+        self.segment_path = f"{path}.checkpoint"
+        if sync_interval is None:
+            sync_interval = float(os.getenv("TERMINOLOGY_WAL_SYNC_INTERVAL", "0.05"))
+        self.sync_interval = sync_interval
+        self._fd: Optional[int] = None
+        # 打开的日志文件标识 (st_dev, st_ino)，用于发现其他进程已轮转日志
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        # 跟随读取（共享模式下同步其他进程的写入）：正在读取的日志文件及其标识、未读完的半行
+        self._follow_file = None
+        self._follow_id: Optional[Tuple[int, int]] = None
+        self._follow_buffer = b""
+        self.appended = 0
+        self.syncs = 0
+
+    def size(self) -> int:
+        """返回当前日志的字节数"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def has_segment(self) -> bool:
+        """是否存在未完成检查点遗留的日志段"""
+        return os.path.exists(self.segment_path)
+
+    def replay(self) -> Iterator[Dict[str, str]]:
+        """按写入顺序返回遗留段和当前日志中的全部记录，跳过损坏的行"""
+        for path in (self.segment_path, self.path):
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            corrupted = 0
+            for line in data.splitlines(keepends=True):
+                record = _decode(line)
+                if record is None:
+                    corrupted += 1
+                    continue
+                yield record
+            if corrupted:
+                print(f"术语日志{path}中有{corrupted}行损坏或不完整，已跳过")
+
+    def follow(self) -> List[Dict[str, str]]:
+        """按写入顺序返回上次调用以来追加到日志中的记录（含其他进程写入的）
+
+        持有正在读取的日志文件，即使它已被检查点重命名为日志段或删除，
+        也会先读完其剩余记录，再转到新的日志文件。首次调用（或rewind之后）
+        从遗留的检查点段或当前日志的开头读起。写到一半的行留到下次读取。
+
+        Returns:
+            新记录列表
+        """
+        records: List[Dict[str, str]] = []
+        corrupted = 0
+        if self._follow_file is None:
+            for path in (self.segment_path, self.path):
+                if self._follow_open(path):
+                    break
+            else:
+                return records
+
+        while True:
+            data = self._follow_buffer + self._follow_file.read()
+            complete, _, self._follow_buffer = data.rpartition(b"\n")
+            for line in complete.split(b"\n") if complete else []:
+                if not line:
+                    continue
+                record = _decode(line + b"\n")
+                if record is None:
+                    corrupted += 1
+                else:
+                    records.append(record)
+
+            # 日志已被轮转：当前文件不会再有写入，转到新的日志文件
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                break
+            if (stat.st_dev, stat.st_ino) == self._follow_id or not self._follow_open(self.path):
+                break
+
+        if corrupted:
+            print(f"术语日志{self.path}中有{corrupted}行损坏或不完整，已跳过")
+        return records
+
+    def rewind(self) -> None:
+        """下次follow从遗留的检查点段或当前日志的开头重新读取"""
+        self._follow_close()
+
+    def _follow_open(self, path: str) -> bool:
+        """切换跟随读取的文件，文件不存在时返回False"""
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return False
+        self._follow_close()
+        stat = os.fstat(f.fileno())
+        self._follow_file = f
+        self._follow_id = (stat.st_dev, stat.st_ino)
+        return True
+
+    def _follow_close(self) -> None:
+        if self._follow_file is not None:
+            self._follow_file.close()
+        self._follow_file = None
+        self._follow_id = None
+        self._follow_buffer = b""
+
+    def append(self, items: List[Dict[str, str]]) -> None:
+        """追加一批术语变更，一次write系统调用写入
+
+        Args:
+            items: 术语列表，每项包含term和translation
+        """
+        data = b"".join(_encode(item) for item in items)
+        with self._lock:
+            self._open()
+            os.write(self._fd, data)
+            self.appended += len(items)
+            if self.sync_interval <= 0:
+                os.fsync(self._fd)
+                self.syncs += 1
+            else:
+                self._dirty = True
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                    self._flusher.start()
+
+    def sync(self) -> None:
+        """立即把已写入的日志刷到磁盘"""
+        with self._lock:
+            if self._fd is None or not self._dirty:
+                return
+            # 复制文件描述符后在锁外fsync，期间的追加写入不必等待磁盘
+            fd = os.dup(self._fd)
+            self._dirty = False
+        try:
+            os.fsync(fd)
+            self.syncs += 1
+        finally:
+            os.close(fd)
+
+    def rotate(self) -> bool:
+        """把当前日志转为检查点段，之后的写入进入新日志
+
+        若上次检查点未完成（进程中途退出）遗留了日志段，
+        当前日志追加到遗留段之后，保持记录顺序。
+
+        Returns:
+            是否存在需要写入快照的日志段
+        """
+        with self._lock:
+            self._close()
+            if not os.path.exists(self.path):
+                return self.has_segment()
+            if self.has_segment():
+                with open(self.path, "rb") as src, open(self.segment_path, "ab") as dst:
+                    if dst.tell() > 0:
+                        dst.write(b"\n")  # 隔离遗留段末尾可能不完整的记录
+                    shutil.copyfileobj(src, dst)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.segment_path)
+            fsync_directory(os.path.dirname(self.path))
+            return True
+
+    def discard_segment(self) -> None:
+        """快照写入完成后删除检查点段"""
+        if self.has_segment():
+            os.remove(self.segment_path)
+            fsync_directory(os.path.dirname(self.path))
+
+    def close(self) -> None:
+        """停止后台fsync线程并关闭日志（关闭前刷盘）"""
+        self._stop.set()
+        with self._lock:
+            self._close()
+        self._follow_close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"wal_bytes": self.size(), "wal_appended": self.appended, "wal_syncs": self.syncs}
+
+    def _open(self) -> None:
+        """打开日志文件（调用方需持有锁）；日志已被其他进程轮转时重新打开"""
+        if self._fd is not None:
+            try:
+                stat = os.stat(self.path)
+                if (stat.st_dev, stat.st_ino) == self._file_id:
+                    return
+            except FileNotFoundError:
+                pass
+            self._close()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        stat = os.fstat(self._fd)
+        self._file_id = (stat.st_dev, stat.st_ino)
+        # 上次写入中途崩溃时末尾可能是不完整的记录，先补换行使其自成一行
+        if stat.st_size > 0:
+            os.lseek(self._fd, -1, os.SEEK_END)
+            if os.read(self._fd, 1) != b"\n":
+                os.write(self._fd, b"\n")
+
+    def _close(self) -> None:
+        """刷盘并关闭日志文件（调用方需持有锁）"""
+        if self._fd is None:
+            return
+        if self._dirty:
+            os.fsync(self._fd)
+            self.syncs += 1
+            self._dirty = False
+        os.close(self._fd)
+        self._fd = None
+        self._file_id = None
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.sync_interval):
+            try:
+                self.sync()
+            except OSError as e:
+                print(f"术语日志刷盘出错：{str(e)}")
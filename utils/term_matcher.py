@@ -0,0 +1,134 @@
+from collections import deque
+from typing import Dict, List
+
+# 节点转移表的键为 (节点编号 << 21) | 字符码点
+_CHAR_BITS = 21
+
+
+def fold_case(text: str) -> str:
+    """逐字符忽略大小写并保持长度不变
+
+    str.lower()并不保持长度（如'İ'变为'i̇'），之后的位置和词边界检查都会错位；
+    折叠后长度不为1的字符保留原样。
+    """
+    folded = text.casefold()
+    # 每个字符折叠后至少有一个字符，总长度相同时逐字符一一对应
+    if len(folded) == len(text):
+        return folded
+    return "".join(
+        char if len(lowered) != 1 else lowered
+        for char, lowered in ((char, char.casefold()) for char in text)
+    )
+
+
+def _is_word_char(char: str) -> bool:
+    """判断是否为英文单词字符（用于词边界检查）"""
+    return char.isascii() and (char.isalnum() or char == "_")
+
+
+def _ends_word(text: str, end: int) -> bool:
+    """判断位置end处是否为词尾，允许英文复数后缀s/es"""
+    for suffix in ("", "s", "es"):
+        if not text.startswith(suffix, end):
+            continue
+        after = end + len(suffix)
+        if after >= len(text) or not _is_word_char(text[after]):
+            return True
+    return False
+
+
+class TermMatcher:
+    """基于Aho-Corasick自动机的多模式精确术语匹配
+
+    对输入文本只做一次线性扫描即可找出全部术语出现，耗时与术语库规模无关。
+    英文术语忽略大小写并要求落在词边界上（允许复数后缀），中文术语按子串匹配。
+    """
+
+    def __init__(self, terms: List[str]):
+        """编译自动机
+
+        Args:
+            terms: 术语列表，匹配结果以列表下标表示
+        """
+        self.size = len(terms)
+        self._goto: Dict[int, int] = {}
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._lengths: List[int] = []
+        # 术语首/尾是否为英文单词字符，是则需要检查词边界
+        self._bound_start: List[bool] = []
+        self._bound_end: List[bool] = []
+
+        children: List[List[int]] = [[]]
+        for term_id, term in enumerate(terms):
+            key = fold_case(term.strip())
+            self._lengths.append(len(key))
+            self._bound_start.append(bool(key) and _is_word_char(key[0]))
+            self._bound_end.append(bool(key) and _is_word_char(key[-1]))
+            if not key:
+                continue
+
+            node = 0
+            for char in key:
+                edge = (node << _CHAR_BITS) | ord(char)
+                child = self._goto.get(edge)
+                if child is None:
+                    child = len(self._fail)
+                    self._goto[edge] = child
+                    self._fail.append(0)
+                    self._output.append([])
+                    children.append([])
+                    children[node].append(edge)
+                node = child
+            self._output[node].append(term_id)
+
+        # 广度优先构建失败指针，并合并失败链上的输出
+        queue = deque(self._goto[edge] for edge in children[0])
+        while queue:
+            node = queue.popleft()
+            for edge in children[node]:
+                child = self._goto[edge]
+                code = edge & ((1 << _CHAR_BITS) - 1)
+                fallback = self._fail[node]
+                while fallback and ((fallback << _CHAR_BITS) | code) not in self._goto:
+                    fallback = self._fail[fallback]
+                target = self._goto.get((fallback << _CHAR_BITS) | code, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child].extend(self._output[self._fail[child]])
+                queue.append(child)
+
+    def find_all(self, text: str) -> List[int]:
+        """查找文本中出现的全部术语
+
+        Args:
+            text: 要搜索的文本
+
+        Returns:
+            按首次出现位置排序、去重后的术语下标
+        """
+        folded = fold_case(text)
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        found: List[int] = []
+        seen = set()
+        node = 0
+        for pos, char in enumerate(folded):
+            code = ord(char)
+            while node and ((node << _CHAR_BITS) | code) not in goto:
+                node = fail[node]
+            node = goto.get((node << _CHAR_BITS) | code, 0)
+
+            for term_id in output[node]:
+                if term_id in seen:
+                    continue
+                start = pos - self._lengths[term_id] + 1
+                if self._bound_start[term_id] and start > 0 and _is_word_char(folded[start - 1]):
+                    continue
+                if self._bound_end[term_id] and not _ends_word(folded, pos + 1):
+                    continue
+                seen.add(term_id)
+                found.append(term_id)
+
+        return found
@@ -0,0 +1,311 @@
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+# 槽位记录：术语和译文在各自字符串池中的字节区间，以及术语的CRC32哈希
+SLOT_DTYPE = np.dtype([
+    ("term_start", np.int64),
+    ("term_end", np.int64),
+    ("translation_start", np.int64),
+    ("translation_end", np.int64),
+    ("hash", np.uint32),
+])
+# 哈希表元素为术语下标（int32，最多约21亿个术语），空位标记为-1
+EMPTY = -1
+# 哈希表最大装载率，超过后容量翻倍
+MAX_LOAD = 0.5
+# 译文字符串池中的失效字节（被覆盖的旧译文）超过该比例时导出整理后的副本
+_STALE_RATIO = 0.25
+
+
+def _term_hash(key: bytes) -> int:
+    """术语哈希（CRC32，跨进程稳定，哈希表可以直接写入磁盘索引）"""
+    return zlib.crc32(key)
+
+
+def _grow(array: np.ndarray, needed: int) -> np.ndarray:
+    """确保数组可写且容量不少于needed，不足时按倍数扩容"""
+    if len(array) >= needed and array.flags.writeable:
+        return array
+    capacity = max(needed, len(array) * 2, 16)
+    grown = np.empty(capacity, dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+def _table_size(count: int) -> int:
+    """返回能以不超过MAX_LOAD的装载率容纳count个术语的哈希表大小（2的幂）"""
+    size = 16
+    while count > size * MAX_LOAD:
+        size *= 2
+    return size
+
+
+def _insert_all(table: np.ndarray, hashes: np.ndarray, slots: np.ndarray) -> None:
+    """以线性探测将一批（互不重复的）术语写入哈希表
+
+    每轮把落在同一空位上的候选中的第一个写入，其余候选继续探测下一个位置，
+    轮数只取决于最长探测链，整体为向量化操作。
+    """
+    mask = len(table) - 1
+    positions = hashes.astype(np.int64) & mask
+    while slots.size:
+        candidates = np.flatnonzero(table[positions] == EMPTY)
+        _, first = np.unique(positions[candidates], return_index=True)
+        winners = candidates[first]
+        table[positions[winners]] = slots[winners]
+
+        remaining = np.ones(slots.size, dtype=bool)
+        remaining[winners] = False
+        slots = slots[remaining]
+        positions = (positions[remaining] + 1) & mask
+
+
+class _Column:
+    """术语或译文列的只读序列视图，按需从字符串池解码"""
+
+    __slots__ = ("_store", "_field")
+
+    def __init__(self, store: "TermStore", field: str):
+        self._store = store
+        self._field = field
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(key, slice):
+            return self._store.decode_range(self._field, *key.indices(len(self._store))[:2])
+        return self._store.decode(self._field, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self[:])
+
+
+class TermStore:
+    """紧凑的术语存储
+
+    术语和译文分别以UTF-8字节拼接在两个字符串池（numpy uint8数组）中，
+    每个术语占用一条定长槽位记录（字节区间 + 哈希），精确查找通过开放寻址哈希表完成。
+    与 Python列表 + dict 相比不再为每个术语创建字符串、整数和字典项对象，
+    全部数据都是少量连续数组，可以原样写入二进制索引并以只读内存映射方式加载。
+
+    术语只追加不删除；修改译文时新译文追加到字符串池末尾，旧字节在导出时整理回收。
+    已写入的字节和槽位记录不会被原地改写（槽位整条替换），读取方无需加锁。
+    """
+
+    def __init__(self):
+        self._slots = np.empty(0, dtype=SLOT_DTYPE)
+        self._term_arena = np.empty(0, dtype=np.uint8)
+        self._translation_arena = np.empty(0, dtype=np.uint8)
+        self._table = np.full(_table_size(0), EMPTY, dtype=np.int32)
+        self._count = 0
+        self._term_bytes = 0
+        self._translation_bytes = 0
+        # 译文字符串池中被覆盖的旧译文字节数
+        self._stale_bytes = 0
+        self.terms = _Column(self, "term")
+        self.translations = _Column(self, "translation")
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[str, str]]) -> "TermStore":
+        """批量构建存储，重复术语保留首次出现的位置和最后一次出现的译文"""
+        merged: Dict[str, str] = {}
+        for term, translation in items:
+            merged[term] = translation
+
+        store = cls()
+        if not merged:
+            return store
+
+        terms = [term.encode("utf-8") for term in merged]
+        translations = [translation.encode("utf-8") for translation in merged.values()]
+        del merged
+
+        slots = np.empty(len(terms), dtype=SLOT_DTYPE)
+        for prefix, values in (("term", terms), ("translation", translations)):
+            ends = np.cumsum([len(value) for value in values], dtype=np.int64)
+            slots[f"{prefix}_end"] = ends
+            slots[f"{prefix}_start"] = ends - [len(value) for value in values]
+        slots["hash"] = [_term_hash(term) for term in terms]
+
+        table = np.full(_table_size(len(terms)), EMPTY, dtype=np.int32)
+        _insert_all(table, slots["hash"], np.arange(len(terms), dtype=np.int64))
+
+        return cls.from_arrays({
+            "slots": slots,
+            "term_arena": np.frombuffer(b"".join(terms), dtype=np.uint8),
+            "translation_arena": np.frombuffer(b"".join(translations), dtype=np.uint8),
+            "table": table,
+        })
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "TermStore":
+        """由to_arrays()导出的数组构建存储，数组可以是只读内存映射，首次写入时才复制"""
+        store = cls()
+        store._slots = arrays["slots"]
+        store._term_arena = arrays["term_arena"]
+        store._translation_arena = arrays["translation_arena"]
+        store._table = arrays["table"]
+        store._count = len(store._slots)
+        store._term_bytes = len(store._term_arena)
+        store._translation_bytes = len(store._translation_arena)
+        return store
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """导出紧凑数组（去掉预留容量），译文字符串池中失效字节较多时导出整理后的副本"""
+        arrays = {
+            "slots": self._slots[: self._count],
+            "term_arena": self._term_arena[: self._term_bytes],
+            "translation_arena": self._translation_arena[: self._translation_bytes],
+            "table": self._table,
+        }
+        if self._stale_bytes > self._translation_bytes * _STALE_RATIO:
+            arrays.update(self._compacted_translations())
+        return arrays
+
+    def snapshot(self) -> "TermStore":
+        """返回当前内容的只读快照，之后的写入对快照不可见
+
+        只复制槽位记录和哈希表，字符串池与原存储共享（已写入的字节不会被改写）。
+        """
+        arrays = {
+            "slots": self._slots[: self._count].copy(),
+            "term_arena": self._term_arena[: self._term_bytes],
+            "translation_arena": self._translation_arena[: self._translation_bytes],
+            "table": self._table.copy(),
+        }
+        for array in arrays.values():
+            array.flags.writeable = False
+        return TermStore.from_arrays(arrays)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, term: str) -> bool:
+        return self.get(term) is not None
+
+    def nbytes(self) -> int:
+        """返回存储占用的字节数（含预留容量）"""
+        return sum(
+            array.nbytes
+            for array in (self._slots, self._term_arena, self._translation_arena, self._table)
+        )
+
+    def get(self, term: str) -> Optional[int]:
+        """返回术语的下标，不存在时返回None"""
+        key = term.encode("utf-8")
+        slot, _ = self._probe(key, _term_hash(key))
+        return slot
+
+    def put(self, term: str, translation: str) -> Tuple[int, bool]:
+        """写入术语：已存在时更新译文，否则追加
+
+        Returns:
+            (术语下标, 是否为新术语)
+        """
+        key = term.encode("utf-8")
+        value = translation.encode("utf-8")
+        key_hash = _term_hash(key)
+        slot, position = self._probe(key, key_hash)
+
+        if slot is not None:
+            _, _, old_start, old_end, _ = self._slots.item(slot)
+            if self._translation_arena[old_start:old_end].tobytes() != value:
+                self._slots = _grow(self._slots, self._count)
+                start, end = self._append("translation", value)
+                term_start, term_end, _, _, _ = self._slots.item(slot)
+                # 整条替换槽位，并发读取方不会看到新旧区间混杂的记录
+                self._slots[slot] = (term_start, term_end, start, end, key_hash)
+                self._stale_bytes += old_end - old_start
+            return slot, False
+
+        slot = self._count
+        self._slots = _grow(self._slots, slot + 1)
+        term_start, term_end = self._append("term", key)
+        translation_start, translation_end = self._append("translation", value)
+        self._slots[slot] = (term_start, term_end, translation_start, translation_end, key_hash)
+        self._count += 1
+
+        if self._count > len(self._table) * MAX_LOAD:
+            self._rehash()
+        else:
+            if not self._table.flags.writeable:
+                self._table = self._table.copy()
+            self._table[position] = slot
+        return slot, True
+
+    def decode(self, field: str, index: int) -> str:
+        """解码单个术语或译文"""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("术语下标越界")
+        term_start, term_end, translation_start, translation_end, _ = self._slots.item(index)
+        if field == "term":
+            return self._term_arena[term_start:term_end].tobytes().decode("utf-8")
+        return self._translation_arena[translation_start:translation_end].tobytes().decode("utf-8")
+
+    def decode_range(self, field: str, start: int, stop: int) -> List[str]:
+        """批量解码下标在[start, stop)内的术语或译文"""
+        if stop <= start:
+            return []
+        records = self._slots[start:stop]
+        starts = records[f"{field}_start"]
+        ends = records[f"{field}_end"]
+        base = int(starts.min())
+        data = self._arena(field)[base:int(ends.max())].tobytes()
+        return [
+            data[begin:end].decode("utf-8")
+            for begin, end in zip((starts - base).tolist(), (ends - base).tolist())
+        ]
+
+    def _arena(self, field: str) -> np.ndarray:
+        return self._term_arena if field == "term" else self._translation_arena
+
+    def _append(self, field: str, value: bytes) -> Tuple[int, int]:
+        """向字符串池追加字节，返回其区间"""
+        attr = f"_{field}_bytes"
+        start = getattr(self, attr)
+        end = start + len(value)
+        arena = _grow(self._arena(field), end)
+        arena[start:end] = np.frombuffer(value, dtype=np.uint8)
+        setattr(self, f"_{field}_arena", arena)
+        setattr(self, attr, end)
+        return start, end
+
+    def _probe(self, key: bytes, key_hash: int) -> Tuple[Optional[int], int]:
+        """线性探测哈希表，返回 (术语下标或None, 命中位置或可插入的空位)"""
+        table, slots, arena = self._table, self._slots, self._term_arena
+        mask = len(table) - 1
+        position = key_hash & mask
+        while True:
+            slot = table.item(position)
+            if slot == EMPTY:
+                return None, position
+            start, end, _, _, slot_hash = slots.item(slot)
+            if slot_hash == key_hash and arena[start:end].tobytes() == key:
+                return slot, position
+            position = (position + 1) & mask
+
+    def _rehash(self) -> None:
+        """哈希表扩容为两倍并重新插入全部术语"""
+        table = np.full(_table_size(self._count), EMPTY, dtype=np.int32)
+        _insert_all(
+            table, self._slots["hash"][: self._count], np.arange(self._count, dtype=np.int64)
+        )
+        self._table = table
+
+    def _compacted_translations(self) -> Dict[str, np.ndarray]:
+        """按术语顺序重新排列的译文字符串池及对应槽位记录（不修改当前存储）"""
+        values = self.decode_range("translation", 0, self._count)
+        encoded = [value.encode("utf-8") for value in values]
+        ends = np.cumsum([len(value) for value in encoded], dtype=np.int64)
+        slots = self._slots[: self._count].copy()
+        slots["translation_end"] = ends
+        slots["translation_start"] = ends - [len(value) for value in encoded]
+        return {
+            "slots": slots,
+            "translation_arena": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        }
@@ -1,74 +1,347 @@
+import glob
 import json
 import os
-from typing import Any, Dict, List, Optional, Tuple
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import numpy as np
-from sklearn.neighbors import NearestNeighbors
-from sklearn.feature_extraction.text import TfidfVectorizer
+import scipy.sparse as sp
+
+try:
+    import fcntl
+except ImportError:  # Windows上没有fcntl，退化为进程内加锁
+    fcntl = None
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from utils.index_backends import IndexBackend, create_index_backend
+from utils.term_log import TermLog, fsync_directory
+from utils.term_matcher import TermMatcher
+from utils.term_store import TermStore
+from utils.terminology_index import (
+    default_index_path,
+    read_index,
+    read_manifest,
+    source_signature,
+    write_index,
+)
+
+# 哈希向量空间维度（固定词表，新增术语无需重新拟合）
+N_FEATURES = 2 ** 18
+# 待合并行数超过 max(最小值, 比例 × 已合并行数) 时触发后台合并
+COMPACT_MIN_PENDING = 256
+COMPACT_RATIO = 0.25
+# 写前日志超过该字节数时在后台写入JSON快照并清理日志
+WAL_CHECKPOINT_BYTES = int(os.getenv("TERMINOLOGY_WAL_CHECKPOINT_BYTES", str(8 * 1024 * 1024)))
+# 写入JSON快照时每次解码的术语数
+_SNAPSHOT_CHUNK = 10000
+# 术语匹配模式：exact（自动机精确匹配）、fuzzy（向量近邻）、hybrid（两者结合）
+MATCH_MODES = ("exact", "fuzzy", "hybrid")
+# 中英文句子边界
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?。！？；;\n])\s*")
+
+
+class _IndexSnapshot:
+    """术语索引的只读快照
+
+    写入方每次变更都会发布新的快照，读取方只需持有快照引用，
+    因此永远不会看到构建到一半的索引。
+    """
+
+    __slots__ = (
+        "raw", "matrix", "idf", "pending", "pending_count", "pending_rows",
+        "size", "_pending_matrix",
+    )
+
+    def __init__(
+        self,
+        raw: sp.csr_matrix,
+        matrix: sp.csr_matrix,
+        idf: np.ndarray,
+        pending: List[sp.csr_matrix],
+        pending_count: int,
+        pending_rows: int,
+    ):
+        self.raw = raw  # 已合并术语的原始词频
+        self.matrix = matrix  # 已合并术语的TF-IDF向量（L2归一化）
+        self.idf = idf
+        self.pending = pending  # 追加写入的原始词频块，仅前pending_count块可见
+        self.pending_count = pending_count
+        self.pending_rows = pending_rows
+        self.size = raw.shape[0] + pending_rows
+        self._pending_matrix = None
+
+    def pending_matrix(self) -> Optional[sp.csr_matrix]:
+        """返回待合并块的TF-IDF向量（按快照惰性计算）"""
+        if self.pending_count == 0:
+            return None
+        if self._pending_matrix is None:
+            rows = sp.vstack(self.pending[: self.pending_count], format="csr")
+            self._pending_matrix = normalize(rows.multiply(self.idf).tocsr())
+        return self._pending_matrix
 
 
 class TerminologyDatabase:
     """基于向量的术语数据库，用于保持翻译一致性"""
 
-    def __init__(self, data_path: str = "data/terminology.json"):
+    def __init__(
+        self,
+        data_path: str = "data/terminology.json",
+        match_mode: Optional[str] = None,
+        index_path: Optional[str] = None,
+        use_index: bool = True,
+        index_backend: Optional[IndexBackend] = None,
+        shared: Optional[bool] = None,
+        reload_interval: Optional[float] = None,
+    ):
         """初始化术语数据库
 
         Args:
             data_path: 术语JSON文件路径
+            match_mode: 默认匹配模式（'exact'、'fuzzy'或'hybrid'），
+                为空时读取TERMINOLOGY_MATCH_MODE环境变量
+            index_path: 预编译二进制索引目录，为空时使用JSON同名的.index目录
+            use_index: 是否优先从二进制索引加载
+            index_backend: 近邻检索后端，为空时按TERMINOLOGY_INDEX_BACKEND创建
+            shared: 是否与其他进程共享术语库（写入时加文件锁追加共享的写前日志，
+                其他进程读取日志增量），为空时读取TERMINOLOGY_SHARED环境变量
+            reload_interval: 同步其他进程写入（日志增量和新版本二进制索引）的间隔（秒），
+                大于0时在后台热更新，为空时读取TERMINOLOGY_RELOAD_INTERVAL环境变量
         """
         self.data_path = data_path
-        self.vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 4))
-        self.knn = None
-        self.terms = []
-        self.translations = []
-        self.embeddings = None
-
-        # 如果文件存在，加载术语
+        self.index_path = index_path or default_index_path(data_path)
+        self.backend = index_backend or create_index_backend()
+        if shared is None:
+            shared = os.getenv("TERMINOLOGY_SHARED", "0") == "1"
+        self.shared = shared
+        if reload_interval is None:
+            reload_interval = float(os.getenv("TERMINOLOGY_RELOAD_INTERVAL", "0"))
+        self.match_mode = match_mode or os.getenv("TERMINOLOGY_MATCH_MODE", "exact")
+        if self.match_mode not in MATCH_MODES:
+            raise ValueError(f"不支持的术语匹配模式：{self.match_mode}")
+        self.vectorizer = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=(2, 4),
+            n_features=N_FEATURES,
+            alternate_sign=False,
+            norm=None,
+        )
+        # 术语和译文的紧凑存储，行号即向量索引中的行号
+        self.store = TermStore()
+        # 每个特征出现在多少个术语中
+        self._doc_freq = np.zeros(N_FEATURES, dtype=np.int32)
+        self._pending: List[sp.csr_matrix] = []
+        self._pending_rows = 0
+        self._snapshot = self._empty_snapshot()
+        self._write_lock = threading.RLock()
+        self._compacting = False
+        self._checkpointing = False
+        # 术语变更先追加到写前日志，JSON快照由检查点在后台重写
+        self.log = TermLog(os.path.splitext(data_path)[0] + ".wal")
+        # 精确匹配自动机（主自动机, 增量自动机），术语增加后在下次查询时更新
+        self._matchers: Tuple[Optional[TermMatcher], Optional[TermMatcher]] = (None, None)
+        self._matcher_lock = threading.Lock()
+        self._matcher_rebuilding = False
+        # 术语变更时的回调，参数为发生变更的术语列表
+        self._listeners: List[Callable[[List[str]], None]] = []
+        # 当前加载的二进制索引代数，0表示未从索引加载
+        self.generation = 0
+        self._stop_watcher = threading.Event()
+
+        # 如果文件存在，优先从最新的二进制索引加载，否则解析JSON
         if os.path.exists(data_path):
-            self.load_terminology()
+            if not (use_index and self.load_index()):
+                self.load_terminology()
         else:
             # 初始化为空数据库并创建文件
             os.makedirs(os.path.dirname(data_path), exist_ok=True)
             self.save_terminology()
 
+        # 重放JSON快照之后的术语变更
+        self._recover()
+
+        if reload_interval > 0:
+            self.start_watcher(reload_interval)
+
+    @property
+    def terms(self) -> Sequence[str]:
+        """术语的只读序列视图，按行号访问"""
+        return self.store.terms
+
+    @property
+    def translations(self) -> Sequence[str]:
+        """译文的只读序列视图，按行号访问"""
+        return self.store.translations
+
     def load_terminology(self) -> None:
         """从文件加载术语"""
         try:
             with open(self.data_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
 
-            # 重置数据结构
-            self.terms = []
-            self.translations = []
-
-            # 加载术语
-            for item in data:
-                self.terms.append(item["term"])
-                self.translations.append(item["translation"])
+            with self._write_lock:
+                # 加载术语（重复术语只保留一行）
+                self.store = TermStore.from_items(
+                    (item["term"], item["translation"]) for item in data
+                )
 
-            # 创建向量和KNN索引
-            if self.terms:
-                self.embeddings = self.vectorizer.fit_transform(self.terms)
-                self.knn = NearestNeighbors(n_neighbors=min(5, len(self.terms)), metric="cosine")
-                self.knn.fit(self.embeddings)
+                # 一次性构建索引
+                self._rebuild_index()
 
         except Exception as e:
             print(f"加载术语时出错：{str(e)}")
             # 初始化为空
-            self.terms = []
-            self.translations = []
-            self.embeddings = None
-            self.knn = None
+            with self._write_lock:
+                self.store = TermStore()
+                self._doc_freq = np.zeros(N_FEATURES, dtype=np.int32)
+                self._pending = []
+                self._pending_rows = 0
+                self._matchers = (None, None)
+                self._snapshot = self._empty_snapshot()
+
+    def load_index(self) -> bool:
+        """从预编译的二进制索引加载术语
+
+        向量数组以只读方式内存映射，多个进程共享同一份物理页。
+
+        Returns:
+            是否成功加载；索引不存在或已过期时返回False
+        """
+        try:
+            index = read_index(self.index_path, self.data_path, N_FEATURES)
+        except Exception as e:
+            print(f"加载术语索引时出错：{str(e)}")
+            return False
+
+        if index is None:
+            return False
+
+        with self._write_lock:
+            self.store = index["store"]
+            self._doc_freq = index["doc_freq"]
+            self._pending = []
+            self._pending_rows = 0
+            self._matchers = (None, None)
+            self._snapshot = _IndexSnapshot(
+                index["raw"], index["matrix"], index["idf"], self._pending, 0, 0
+            )
+            self.generation = index["manifest"].get("generation", 1)
+
+        return True
+
+    def save_index(self, index_path: Optional[str] = None) -> str:
+        """合并索引并写入二进制索引目录
+
+        Args:
+            index_path: 索引目录，为空时使用默认位置
+
+        Returns:
+            实际写入的索引目录
+        """
+        index_path = index_path or self.index_path
+        manifest = read_manifest(index_path)
+        generation = max(self.generation, manifest.get("generation", 0) if manifest else 0) + 1
+        with self._write_lock:
+            self._index_pending()
+        if self._snapshot.pending_count:
+            self.compact()
+
+        with self._write_lock:
+            # 若后台合并仍在进行，待合并块也一并写入；
+            # 期间新增的术语也先计算向量，保证写入的术语与向量行数一致
+            self._index_pending()
+            snapshot = self._snapshot
+            raw, matrix = snapshot.raw, snapshot.matrix
+            if snapshot.pending_count:
+                blocks = snapshot.pending[: snapshot.pending_count]
+                raw = sp.vstack([raw] + blocks, format="csr")
+                matrix = sp.vstack([matrix, snapshot.pending_matrix()], format="csr")
+
+            write_index(
+                index_path,
+                store=self.store,
+                raw=raw,
+                matrix=matrix,
+                idf=snapshot.idf,
+                doc_freq=self._doc_freq,
+                source=source_signature(self.data_path),
+                generation=generation,
+            )
+            if index_path == self.index_path:
+                self.generation = generation
+
+        return index_path
+
+    def start_watcher(self, interval: float) -> None:
+        """在后台定期同步其他进程的写入：读取写前日志的增量，
+        发现检查点发布的新版本二进制索引时原子切换
+
+        Args:
+            interval: 检查间隔（秒）
+        """
+        def watch():
+            while not self._stop_watcher.wait(interval):
+                try:
+                    with self._write_lock:
+                        self._sync_shared()
+                except Exception as e:
+                    print(f"同步术语库更新时出错：{str(e)}")
+
+        threading.Thread(target=watch, daemon=True).start()
+
+    def stop_watcher(self) -> None:
+        """停止后台热更新"""
+        self._stop_watcher.set()
+
+    @contextmanager
+    def _shared_lock(self) -> Iterator[None]:
+        """跨进程写锁，共享模式下串行化各worker的写入"""
+        if not self.shared or fcntl is None:
+            yield
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        with open(f"{self.index_path}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
 
     def save_terminology(self) -> None:
-        """保存术语到文件"""
-        data = [
-            {"term": term, "translation": translation}
-            for term, translation in zip(self.terms, self.translations)
-        ]
+        """将当前术语写入JSON快照"""
+        self._write_snapshot(self.store.snapshot())
+
+    def _write_snapshot(self, store: TermStore) -> None:
+        """分块解码并写入JSON快照：先写临时文件并刷盘，再原子替换，写到一半退出不会损坏原文件"""
+        temp_path = f"{self.data_path}.tmp-{os.getpid()}"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            # 与json.dump(..., indent=2)的输出格式一致
+            f.write("[")
+            for start in range(0, len(store), _SNAPSHOT_CHUNK):
+                stop = min(start + _SNAPSHOT_CHUNK, len(store))
+                pairs = zip(store.terms[start:stop], store.translations[start:stop])
+                for offset, (term, translation) in enumerate(pairs):
+                    f.write(",\n" if start + offset else "\n")
+                    f.write(
+                        f'  {{\n    "term": {json.dumps(term, ensure_ascii=False)},\n'
+                        f'    "translation": {json.dumps(translation, ensure_ascii=False)}\n  }}'
+                    )
+            f.write("\n]" if len(store) else "]")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.data_path)
+        fsync_directory(os.path.dirname(self.data_path))
+
+    def add_listener(self, callback: Callable[[List[str]], None]) -> None:
+        """注册术语变更回调
 
-        with open(self.data_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        Args:
+            callback: 每次写入后调用一次，参数为本次新增或修改的全部术语
+        """
+        self._listeners.append(callback)
 
     def add_term(self, term: str, translation: str) -> None:
         """添加术语到术语数据库
@@ -77,22 +350,297 @@ class TerminologyDatabase:
             term: 源术语
             translation: 术语的翻译
         """
-        # 检查术语是否已存在
-        if term in self.terms:
-            idx = self.terms.index(term)
-            self.translations[idx] = translation
+        self.add_terms([{"term": term, "translation": translation}])
+
+    def add_terms(self, items: List[Dict[str, str]]) -> None:
+        """批量添加术语，只保存一次文件
+
+        新术语以追加方式写入索引，达到阈值后再合并，
+        因此单次插入的摊还代价与术语库规模无关。
+
+        Args:
+            items: 术语列表，每项包含term和translation
+        """
+        with self._write_lock, self._shared_lock():
+            self._sync_shared()
+
+            # 先追加写前日志再修改内存，日志写入后即视为提交；
+            # 精确匹配立即可见，新术语的向量在下次模糊检索或合并时批量计算。
+            # 共享模式下其他进程从同一份日志读取增量，无需重新发布索引
+            self.log.append(items)
+            for item in items:
+                self.store.put(item["term"], item["translation"])
+
+        # 批量写入时同步合并，单条写入时在后台合并
+        self._maybe_compact(background=len(items) == 1)
+        self._maybe_checkpoint()
+
+        # 通知依赖这些术语的组件（如翻译缓存），整批只通知一次
+        terms = [item["term"] for item in items]
+        for callback in self._listeners:
+            callback(terms)
+
+    def stats(self) -> Dict[str, Any]:
+        """返回术语库状态"""
+        snapshot = self._snapshot
+        size = len(self.store)
+        return {
+            "terms": size,
+            # 待合并的向量块行数，加上尚未计算向量的新术语
+            "pending": snapshot.pending_rows + size - snapshot.size,
+            "store_bytes": self.store.nbytes(),
+            **self.log.stats(),
+            "generation": self.generation,
+            "shared": self.shared,
+            "match_mode": self.match_mode,
+            **self.backend.stats(),
+        }
+
+    def compact(self) -> None:
+        """将待合并块并入主索引并按最新文档频率重新计算IDF"""
+        with self._write_lock:
+            if self._compacting:
+                return
+            self._compacting = True
+            self._index_pending()
+            snapshot = self._snapshot
+            doc_freq = self._doc_freq.copy()
+
+        try:
+            # 耗时的矩阵运算不持有写锁，期间写入继续追加到待合并块
+            count = snapshot.pending_count
+            raw = sp.vstack(
+                [snapshot.raw] + snapshot.pending[:count], format="csr"
+            )
+            idf = self._compute_idf(doc_freq, raw.shape[0])
+            matrix = normalize(raw.multiply(idf).tocsr())
+
+            with self._write_lock:
+                self._pending = self._pending[count:]
+                self._pending_rows -= snapshot.pending_rows
+                self._snapshot = _IndexSnapshot(
+                    raw, matrix, idf,
+                    self._pending, len(self._pending), self._pending_rows,
+                )
+        finally:
+            self._compacting = False
+
+    def _maybe_compact(self, background: bool = True) -> None:
+        """待合并行数过多时触发合并"""
+        snapshot = self._snapshot
+        limit = max(COMPACT_MIN_PENDING, int(snapshot.raw.shape[0] * COMPACT_RATIO))
+        pending = snapshot.pending_rows + len(self.store) - snapshot.size
+        if pending <= limit or self._compacting:
+            return
+
+        if background:
+            threading.Thread(target=self.compact, daemon=True).start()
+        else:
+            self.compact()
+
+    def _index_pending(self) -> None:
+        """为尚未计算向量的新术语批量计算向量并发布快照（调用方需持有写锁）"""
+        snapshot = self._snapshot
+        if len(self.store) <= snapshot.size:
+            return
+
+        # 新术语的向量作为一个块追加，无需重新拟合
+        block = self.vectorizer.transform(self.terms[snapshot.size:]).tocsr()
+        self._doc_freq += np.bincount(
+            block.indices, minlength=N_FEATURES
+        ).astype(np.int32)
+        self._pending.append(block)
+        self._pending_rows += block.shape[0]
+
+        # 发布包含新术语的快照
+        self._snapshot = _IndexSnapshot(
+            snapshot.raw, snapshot.matrix, snapshot.idf,
+            self._pending, len(self._pending), self._pending_rows,
+        )
+
+    def _read_snapshot(self) -> _IndexSnapshot:
+        """返回包含全部已写入术语的向量索引快照"""
+        snapshot = self._snapshot
+        if snapshot.size < len(self.store):
+            with self._write_lock:
+                self._index_pending()
+                snapshot = self._snapshot
+        return snapshot
+
+    def _sync_shared(self) -> int:
+        """共享模式下同步其他进程已写入的术语（调用方需持有写锁；同时持有跨进程锁时同步是完整的）
+
+        其他进程执行检查点后发布了新版本二进制索引时先切换到该索引，
+        再从头重放遗留的日志段和当前日志（索引之后的写入都在其中，重复重放结果不变）；
+        否则只读取日志的增量。
+
+        Returns:
+            应用的日志记录数
+        """
+        if not self.shared:
+            return 0
+        manifest = read_manifest(self.index_path)
+        if manifest and manifest.get("generation", 0) > self.generation:
+            if self.load_index():
+                self.log.rewind()
+                print(f"术语索引已热更新至第{self.generation}代")
+        items = self.log.follow()
+        for item in items:
+            self.store.put(item["term"], item["translation"])
+        return len(items)
+
+    def _recover(self) -> None:
+        """重放写前日志中JSON快照之后的术语变更"""
+        if self.shared:
+            # 从头跟随读取日志，之后的同步只读取增量
+            with self._write_lock, self._shared_lock():
+                replayed = self._sync_shared()
+        else:
+            items = list(self.log.replay())
+            with self._write_lock:
+                for item in items:
+                    self.store.put(item["term"], item["translation"])
+            replayed = len(items)
+        if replayed:
+            print(f"已从术语日志重放{replayed}条变更：{self.log.path}")
+
+        # 上次检查点未完成时立即补做，避免遗留的日志段长期存在
+        if self.log.has_segment():
+            self.checkpoint()
+
+    def checkpoint(self) -> bool:
+        """将当前术语写成JSON快照并删除已包含在快照中的写前日志
+
+        日志轮转在写锁内完成，耗时的快照写入不持有写锁，期间的写入进入新日志。
+
+        Returns:
+            是否执行了检查点；没有日志或其他线程/进程正在执行时返回False
+        """
+        with self._write_lock:
+            if self._checkpointing:
+                return False
+            self._checkpointing = True
+
+        try:
+            with self._checkpoint_lock() as acquired:
+                if not acquired:
+                    return False
+                # 清理上次写快照中途退出遗留的临时文件
+                for path in glob.glob(f"{glob.escape(self.data_path)}.tmp-*"):
+                    os.remove(path)
+                with self._write_lock, self._shared_lock():
+                    self._sync_shared()
+                    if not self.log.rotate():
+                        return False
+                    snapshot = self.store.snapshot()
+                self._write_snapshot(snapshot)
+                self.log.discard_segment()
+
+                # JSON签名已变化，已有的二进制索引需要重新发布，否则会被判定为过期；
+                # 在检查点锁内发布，下一次检查点总能看到最新一代索引
+                if self.shared or read_manifest(self.index_path) is not None:
+                    self.save_index()
+            return True
+        finally:
+            self._checkpointing = False
+
+    def _maybe_checkpoint(self) -> None:
+        """写前日志过大时在后台执行检查点"""
+        if self._checkpointing or self.log.size() < WAL_CHECKPOINT_BYTES:
+            return
+        threading.Thread(target=self.checkpoint, daemon=True).start()
+
+    @contextmanager
+    def _checkpoint_lock(self) -> Iterator[bool]:
+        """跨进程检查点锁（非阻塞），其他进程正在执行检查点时返回False"""
+        if not self.shared or fcntl is None:
+            yield True
+            return
+
+        with open(f"{self.data_path}.checkpoint.lock", "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        """停止后台热更新，并把写前日志刷到磁盘"""
+        self.stop_watcher()
+        self.log.close()
+
+    def _rebuild_index(self) -> None:
+        """根据全部术语重建索引（调用方需持有写锁）"""
+        if self.terms:
+            raw = self.vectorizer.transform(self.terms).tocsr()
         else:
-            # 添加新术语
-            self.terms.append(term)
-            self.translations.append(translation)
+            raw = sp.csr_matrix((0, N_FEATURES), dtype=np.float64)
+
+        self._doc_freq = np.bincount(
+            raw.indices, minlength=N_FEATURES
+        ).astype(np.int32)
+        idf = self._compute_idf(self._doc_freq, raw.shape[0])
+        self._pending = []
+        self._pending_rows = 0
+        self._matchers = (None, None)
+        self._snapshot = _IndexSnapshot(
+            raw, normalize(raw.multiply(idf).tocsr()), idf, self._pending, 0, 0
+        )
+
+    def _empty_snapshot(self) -> _IndexSnapshot:
+        """创建空索引快照"""
+        empty = sp.csr_matrix((0, N_FEATURES), dtype=np.float64)
+        return _IndexSnapshot(empty, empty, np.ones(N_FEATURES), self._pending, 0, 0)
+
+    @staticmethod
+    def _compute_idf(doc_freq: np.ndarray, n_docs: int) -> np.ndarray:
+        """计算平滑IDF（与TfidfTransformer(smooth_idf=True)一致）"""
+        return np.log((1 + n_docs) / (1 + doc_freq)) + 1
+
+    def _encode_query(self, snapshot: _IndexSnapshot, texts: List[str]) -> sp.csr_matrix:
+        """将查询文本编码为TF-IDF向量
+
+        只保留术语库中出现过的n-gram，与原先固定词表的TF-IDF行为一致。
+        """
+        query = self.vectorizer.transform(texts).tocsr()
+        query.data[self._doc_freq[query.indices] == 0] = 0
+        query.eliminate_zeros()
+        return normalize(query.multiply(snapshot.idf).tocsr())
+
+    def _knn(
+        self,
+        snapshot: _IndexSnapshot,
+        texts: List[str],
+        threshold: float,
+        max_results: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """批量近邻查询：一次编码全部文本并交给索引后端检索
 
-            # 重新创建向量和KNN索引
-            self.embeddings = self.vectorizer.fit_transform(self.terms)
-            self.knn = NearestNeighbors(n_neighbors=min(5, len(self.terms)), metric="cosine")
-            self.knn.fit(self.embeddings)
+        Args:
+            snapshot: 索引快照
+            texts: 查询文本列表
+            threshold: 相似度阈值 (0-1)
+            max_results: 每条查询返回的最大结果数量
 
-        # 保存更新
-        self.save_terminology()
+        Returns:
+            (查询行号, 术语下标)，按行号升序、行内按相似度降序排列
+        """
+        query = self._encode_query(snapshot, texts)
+
+        # 由索引后端找出超过阈值的候选
+        rows, cols, scores = self.backend.query(snapshot, query, threshold)
+
+        # 按 (行号, 相似度降序, 术语下标) 排序后，每行只保留前max_results项
+        order = np.lexsort((cols, -scores, rows))
+        rows, cols = rows[order], cols[order]
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows, side="left")
+        keep = rank < max_results
+
+        return rows[keep], cols[keep]
 
     def search(self, text: str, threshold: float = 0.3, max_results: int = 5) -> List[Dict[str, str]]:
         """在文本中搜索匹配的术语
@@ -105,55 +653,184 @@ class TerminologyDatabase:
         Returns:
             匹配的术语和翻译列表
         """
-        if not self.terms or self.knn is None:
-            return []
+        return self.search_many([text], threshold, max_results)[0]
 
-        # 编码文本
-        text_vector = self.vectorizer.transform([text])
+    def search_many(
+        self, texts: List[str], threshold: float = 0.3, max_results: int = 5
+    ) -> List[List[Dict[str, str]]]:
+        """批量搜索多段文本中的匹配术语
 
-        # 搜索
-        distances, indices = self.knn.kneighbors(text_vector, n_neighbors=min(max_results, len(self.terms)))
+        Args:
+            texts: 要搜索术语的文本列表
+            threshold: 相似度阈值 (0-1)
+            max_results: 每段文本返回的最大结果数量
 
-        # 按阈值过滤并返回结果
-        results = []
+        Returns:
+            与输入顺序一致的匹配结果列表
+        """
+        results: List[List[Dict[str, str]]] = [[] for _ in texts]
+        snapshot = self._read_snapshot()
+        if snapshot.size == 0 or not texts:
+            return results
+
+        rows, cols = self._knn(snapshot, texts, threshold, max_results)
+        for row, idx in zip(rows.tolist(), cols.tolist()):
+            results[row].append({
+                "term": self.terms[idx],
+                "translation": self.translations[idx]
+            })
 
-        for i, idx in enumerate(indices[0]):
-            # 余弦距离转换为相似度 (1 - 距离)
-            similarity = 1 - distances[0][i]
-            if similarity > threshold:
-                results.append({
-                    "term": self.terms[idx],
-                    "translation": self.translations[idx]
-                })
+        return results
 
+    def _get_matchers(self, size: int) -> List[Tuple[TermMatcher, int]]:
+        """返回覆盖前size个术语的精确匹配自动机及各自的术语偏移
+
+        新增术语先编译进一个小的增量自动机，增量过大时再在后台重编主自动机，
+        与向量索引的合并策略一致。
+        """
+        base, delta = self._matchers
+        if self._matcher_coverage(base, delta) < size:
+            with self._matcher_lock:
+                base, delta = self._matchers
+                if base is None:
+                    base, delta = TermMatcher(self.terms[:size]), None
+                elif self._matcher_coverage(base, delta) < size:
+                    delta = TermMatcher(self.terms[base.size:size])
+                self._matchers = (base, delta)
+
+            limit = max(COMPACT_MIN_PENDING, int(base.size * COMPACT_RATIO))
+            if delta is not None and delta.size > limit and not self._matcher_rebuilding:
+                self._matcher_rebuilding = True
+                threading.Thread(
+                    target=self._rebuild_matcher, args=(size,), daemon=True
+                ).start()
+
+        matchers = [(base, 0)]
+        if delta is not None:
+            matchers.append((delta, base.size))
+        return matchers
+
+    def _rebuild_matcher(self, size: int) -> None:
+        """在后台重新编译覆盖前size个术语的主自动机"""
+        try:
+            base = TermMatcher(self.terms[:size])
+            with self._matcher_lock:
+                covered = self._matcher_coverage(*self._matchers)
+                delta = TermMatcher(self.terms[size:covered]) if covered > size else None
+                self._matchers = (base, delta)
+        finally:
+            self._matcher_rebuilding = False
+
+    @staticmethod
+    def _matcher_coverage(
+        base: Optional[TermMatcher], delta: Optional[TermMatcher]
+    ) -> int:
+        """返回自动机已覆盖的术语数量"""
+        if base is None:
+            return 0
+        return base.size + (delta.size if delta is not None else 0)
+
+    def exact_search(self, text: str) -> List[Dict[str, str]]:
+        """精确查找文本中出现的全部术语
+
+        Args:
+            text: 要搜索的文本
+
+        Returns:
+            文本中出现的术语和翻译列表
+        """
+        size = len(self.store)
+        if size == 0:
+            return []
+
+        results = []
+        for matcher, offset in self._get_matchers(size):
+            for idx in matcher.find_all(text):
+                idx += offset
+                results.append(
+                    {"term": self.terms[idx], "translation": self.translations[idx]}
+                )
         return results
 
-    def batch_search(self, text: str, threshold: float = 0.3) -> List[Dict[str, str]]:
+    def batch_search(
+        self, text: str, threshold: float = 0.3, mode: Optional[str] = None
+    ) -> List[Dict[str, str]]:
         """搜索可能出现在文本中的所有术语
 
         Args:
             text: 要搜索的文本
-            threshold: 相似度阈值 (0-1)
+            threshold: 模糊匹配的相似度阈值 (0-1)
+            mode: 匹配模式（'exact'、'fuzzy'或'hybrid'），为空时使用默认模式
 
         Returns:
             潜在术语匹配列表
         """
-        # 对于较长的文本，拆分为句子并搜索每个句子
-        # 用于演示目的的简单句子拆分
-        sentences = text.split(". ")
+        return self.batch_search_many([text], threshold, mode)[0]
+
+    def batch_search_many(
+        self, texts: List[str], threshold: float = 0.3, mode: Optional[str] = None
+    ) -> List[List[Dict[str, str]]]:
+        """批量搜索多篇文档中可能出现的所有术语
+
+        模糊匹配阶段会把所有文档的全部句子编码为一个稀疏矩阵，
+        只做一次近邻查询，过滤和去重均在NumPy中完成。
 
-        all_results = []
-        for sentence in sentences:
-            matches = self.search(sentence, threshold)
-            all_results.extend(matches)
+        Args:
+            texts: 要搜索的文档列表
+            threshold: 模糊匹配的相似度阈值 (0-1)
+            mode: 匹配模式（'exact'、'fuzzy'或'hybrid'），为空时使用默认模式
+
+        Returns:
+            与输入顺序一致的去重术语匹配列表
+        """
+        mode = mode or self.match_mode
+        if mode not in MATCH_MODES:
+            raise ValueError(f"不支持的术语匹配模式：{mode}")
+
+        all_results: List[List[Dict[str, str]]] = [[] for _ in texts]
+
+        # 第一阶段：自动机精确匹配
+        if mode in ("exact", "hybrid"):
+            for doc, text in enumerate(texts):
+                all_results[doc].extend(self.exact_search(text))
+
+        # 第二阶段：按句子做向量近邻搜索，补充近似匹配
+        # 纯精确匹配无需为新术语计算向量
+        snapshot = self._snapshot if mode == "exact" else self._read_snapshot()
+        if mode in ("fuzzy", "hybrid") and snapshot.size > 0:
+            sentences = []
+            sentence_docs = []
+            for doc, text in enumerate(texts):
+                for sentence in _SENTENCE_PATTERN.split(text):
+                    if sentence:
+                        sentences.append(sentence)
+                        sentence_docs.append(doc)
+
+            if sentences:
+                rows, cols = self._knn(snapshot, sentences, threshold, 5)
+                docs = np.asarray(sentence_docs, dtype=np.int64)[rows]
+
+                # 每篇文档内按首次出现去重
+                pairs = docs * snapshot.size + cols
+                _, first = np.unique(pairs, return_index=True)
+                first.sort()
+                for doc, idx in zip(docs[first].tolist(), cols[first].tolist()):
+                    all_results[doc].append({
+                        "term": self.terms[idx],
+                        "translation": self.translations[idx]
+                    })
 
         # 去除重复结果
-        unique_results = []
-        seen_terms = set()
+        unique_all = []
+        for results in all_results:
+            unique_results = []
+            seen_terms = set()
+
+            for result in results:
+                if result["term"] not in seen_terms:
+                    seen_terms.add(result["term"])
+                    unique_results.append(result)
 
-        for result in all_results:
-            if result["term"] not in seen_terms:
-                seen_terms.add(result["term"])
-                unique_results.append(result)
+            unique_all.append(unique_results)
 
-        return unique_results
+        return unique_all
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+术语库二进制索引 - 将术语表预编译为可内存映射的磁盘格式
+
+索引是一个目录，包含manifest.json以及若干.npy数组：
+哈希向量的原始词频与TF-IDF两组CSR数组、IDF、文档频率，
+以及术语存储的数组（术语/译文UTF-8字符串池、槽位记录和哈希表，见utils.term_store）。
+各worker以只读方式内存映射这些数组，启动耗时与术语库规模基本无关，
+且多个进程共享同一份物理页。
+
+构建索引:
+    python -m utils.terminology_index --data data/terminology.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+import scipy.sparse as sp
+
+from utils.term_store import TermStore
+
+INDEX_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+
+
+def default_index_path(data_path: str) -> str:
+    """返回术语JSON文件对应的默认索引目录"""
+    return os.path.splitext(data_path)[0] + ".index"
+
+
+def source_signature(data_path: str) -> Dict[str, int]:
+    """返回术语JSON文件的签名，用于判断索引是否过期"""
+    stat = os.stat(data_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_index(
+    index_path: str,
+    store: TermStore,
+    raw: sp.csr_matrix,
+    matrix: sp.csr_matrix,
+    idf: np.ndarray,
+    doc_freq: np.ndarray,
+    source: Optional[Dict[str, int]] = None,
+    generation: int = 1,
+) -> None:
+    """将已合并的术语索引写入磁盘
+
+    先写入临时目录再整体替换，读取方不会看到写到一半的索引。
+
+    Args:
+        index_path: 索引目录
+        store: 术语存储，行号与向量矩阵的行对应
+        raw: 原始词频CSR矩阵
+        matrix: TF-IDF向量CSR矩阵
+        idf: IDF向量
+        doc_freq: 文档频率向量
+        source: 源JSON文件签名
+        generation: 索引代数，每次更新递增，供其他进程判断是否需要热更新
+    """
+    parent = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".terminology_index_", dir=parent)
+
+    arrays = {
+        "raw_data": raw.data,
+        "raw_indices": raw.indices,
+        "raw_indptr": raw.indptr,
+        "matrix_data": matrix.data,
+        "matrix_indices": matrix.indices,
+        "matrix_indptr": matrix.indptr,
+        "idf": idf,
+        "doc_freq": doc_freq,
+    }
+    # 术语存储的数组原样写入，加载时无需逐个解码字符串或重建哈希表
+    for name, array in store.to_arrays().items():
+        arrays[f"store_{name}"] = array
+
+    for name, array in arrays.items():
+        np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "generation": generation,
+        "count": len(store),
+        "n_features": int(raw.shape[1]),
+        "source": source,
+        "created_at": time.time(),
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    # 原子替换旧索引
+    backup = None
+    if os.path.exists(index_path):
+        backup = f"{index_path}.old-{os.getpid()}"
+        os.replace(index_path, backup)
+    os.replace(staging, index_path)
+    if backup:
+        shutil.rmtree(backup, ignore_errors=True)
+
+
+def read_manifest(index_path: str) -> Optional[Dict[str, Any]]:
+    """读取索引清单，索引不存在时返回None"""
+    manifest_path = os.path.join(index_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_index(
+    index_path: str, data_path: Optional[str] = None, n_features: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """以只读内存映射方式加载索引
+
+    Args:
+        index_path: 索引目录
+        data_path: 源JSON文件，提供时会检查索引是否过期
+        n_features: 期望的哈希维度，不一致时视为无效
+
+    Returns:
+        索引内容；索引不存在、过期或格式不兼容时返回None
+    """
+    manifest = read_manifest(index_path)
+    if manifest is None:
+        return None
+
+    if manifest.get("version") != INDEX_VERSION:
+        print(f"术语索引版本不兼容：{index_path}")
+        return None
+    if n_features is not None and manifest.get("n_features") != n_features:
+        print(f"术语索引维度不匹配：{index_path}")
+        return None
+    if data_path and os.path.exists(data_path):
+        if manifest.get("source") != source_signature(data_path):
+            print(f"术语索引已过期，请重新构建：{index_path}")
+            return None
+
+    def load(name: str, mmap: bool = True) -> np.ndarray:
+        return np.load(
+            os.path.join(index_path, f"{name}.npy"), mmap_mode="r" if mmap else None
+        )
+
+    count = manifest["count"]
+    shape = (count, manifest["n_features"])
+    raw = sp.csr_matrix(
+        (load("raw_data"), load("raw_indices"), load("raw_indptr")), shape=shape, copy=False
+    )
+    matrix = sp.csr_matrix(
+        (load("matrix_data"), load("matrix_indices"), load("matrix_indptr")),
+        shape=shape,
+        copy=False,
+    )
+
+    return {
+        "manifest": manifest,
+        "store": TermStore.from_arrays({
+            name: load(f"store_{name}")
+            for name in ("slots", "term_arena", "translation_arena", "table")
+        }),
+        "raw": raw,
+        "matrix": matrix,
+        "idf": load("idf"),
+        # 文档频率会随新增术语更新，需要可写副本
+        "doc_freq": load("doc_freq", mmap=False),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="构建术语库二进制索引")
+    parser.add_argument("--data", default="data/terminology.json", help="术语JSON文件路径")
+    parser.add_argument("--output", help="索引目录，默认与JSON文件同名的.index目录")
+    args = parser.parse_args()
+
+    from utils.terminology_db import TerminologyDatabase
+
+    start = time.perf_counter()
+    db = TerminologyDatabase(data_path=args.data, use_index=False)
+    index_path = db.save_index(args.output)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ 已为{len(db.terms)}个术语构建索引：{index_path}（耗时{elapsed:.2f}秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+import dashscope
+import requests
+
+# DashScope文本生成接口路径（相对于DASHSCOPE_BASE_URL）
+GENERATION_PATH = "/services/aigc/text-generation/generation"
+DEFAULT_BASE_URL = "https://dashscope.aliyuncs.com/api/v1"
+
+
+def _result(
+    status_code: int,
+    content: Optional[str] = None,
+    usage: Any = None,
+    code: Optional[str] = None,
+    message: Optional[str] = None,
+) -> Dict[str, Any]:
+    """构造与后端无关的统一响应"""
+    return {
+        "status_code": status_code,
+        "content": content,
+        "usage": usage,
+        "code": code,
+        "message": message,
+    }
+
+
+class SDKClient:
+    """通过DashScope SDK调用通义千问，每次调用由SDK自行建立连接"""
+
+    name = "sdk"
+
+    @staticmethod
+    def _convert(response: Any) -> Dict[str, Any]:
+        if response.status_code == 200:
+            return _result(
+                200,
+                content=response.output.choices[0].message.content,
+                usage=response.usage,
+            )
+        return _result(response.status_code, code=response.code, message=response.message)
+
+    def call(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """同步调用
+
+        Args:
+            params: Generation调用参数
+
+        Returns:
+            统一响应字典（status_code、content、usage、code、message）
+        """
+        return self._convert(dashscope.Generation.call(**params))
+
+    async def acall(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """异步调用"""
+        return self._convert(await dashscope.AioGeneration.call(**params))
+
+    async def astream(self, params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """以增量输出模式流式调用，逐个产出统一响应"""
+        responses = await dashscope.AioGeneration.call(
+            **params, stream=True, incremental_output=True
+        )
+        async for response in responses:
+            yield self._convert(response)
+
+    async def aclose(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"client": self.name}
+
+
+class HTTPClient:
+    """直接调用DashScope HTTP接口的连接池客户端
+
+    同步调用复用requests.Session，异步调用复用aiohttp.ClientSession，
+    两者都保持keep-alive连接池，避免每次请求重新建立TCP/TLS连接，
+    并对连接、读取分别设置超时。超时和网络错误以异常抛出，由调用方的重试逻辑处理。
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        api_key: Optional[str] = None,
+        pool_size: int = 32,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        keepalive_expiry: float = 30.0,
+    ):
+        """初始化HTTP客户端
+
+        Args:
+            base_url: DashScope接口地址，可指向本地模拟服务
+            api_key: DashScope API密钥，为空时读取DASHSCOPE_API_KEY
+            pool_size: 连接池最大连接数
+            connect_timeout: 建立连接的超时（秒）
+            read_timeout: 等待响应数据的超时（秒）
+            keepalive_expiry: 空闲连接保留时间（秒）
+        """
+        self.url = base_url.rstrip("/") + GENERATION_PATH
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keepalive_expiry = keepalive_expiry
+
+        self._session: Optional[requests.Session] = None
+        # aiohttp会话绑定到创建它的事件循环，每个事件循环一个会话
+        self._async_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+        self.requests = 0
+        self.errors = 0
+
+    def _headers(self, stream: bool = False) -> Dict[str, str]:
+        api_key = self.api_key or os.getenv("DASHSCOPE_API_KEY") or dashscope.api_key
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        if stream:
+            headers["Accept"] = "text/event-stream"
+            headers["X-DashScope-SSE"] = "enable"
+        return headers
+
+    @staticmethod
+    def _body(params: Dict[str, Any], stream: bool = False) -> Dict[str, Any]:
+        """将Generation调用参数转换为HTTP请求体"""
+        parameters = {
+            key: value
+            for key, value in params.items()
+            if key not in ("model", "messages")
+        }
+        if stream:
+            parameters["incremental_output"] = True
+        return {
+            "model": params["model"],
+            "input": {"messages": params["messages"]},
+            "parameters": parameters,
+        }
+
+    @staticmethod
+    def _payload(status_code: int, text: str) -> Dict[str, Any]:
+        """解析响应体，网关等返回的非JSON错误页按消息文本处理"""
+        try:
+            return json.loads(text)
+        except ValueError:
+            return {"code": str(status_code), "message": text[:200]}
+
+    @staticmethod
+    def _convert(status_code: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if status_code == 200 and "output" in payload:
+            output = payload["output"]
+            if "choices" in output:
+                content = output["choices"][0]["message"]["content"]
+            else:
+                content = output.get("text")
+            return _result(200, content=content, usage=payload.get("usage"))
+        return _result(
+            status_code if status_code != 200 else 500,
+            code=payload.get("code"),
+            message=payload.get("message"),
+        )
+
+    def _get_session(self) -> requests.Session:
+        if self._session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=self.pool_size
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    async def _get_async_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            # 新的事件循环（如每次调用asyncio.run）：先释放已关闭的循环遗留的会话
+            for other, stale in list(self._async_sessions.items()):
+                if other.is_closed():
+                    self._async_sessions.pop(other, None)
+                    await self._close_session(stale, other)
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_size, keepalive_timeout=self.keepalive_expiry
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.connect_timeout, sock_read=self.read_timeout
+                ),
+            )
+            self._async_sessions[loop] = session
+        return session
+
+    @staticmethod
+    async def _close_session(
+        session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        """关闭会话：在其所属的事件循环中关闭；该循环已结束时从当前循环关闭其连接池"""
+        if session.closed:
+            return
+        if loop is asyncio.get_running_loop():
+            await session.close()
+        elif loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), loop))
+        else:
+            connector = session.connector
+            session.detach()
+            if connector is not None:
+                await connector.close()
+
+    def call(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """同步调用
+
+        Args:
+            params: Generation调用参数
+
+        Returns:
+            统一响应字典（status_code、content、usage、code、message）
+        """
+        self.requests += 1
+        try:
+            response = self._get_session().post(
+                self.url,
+                json=self._body(params),
+                headers=self._headers(),
+                timeout=(self.connect_timeout, self.read_timeout),
+            )
+            return self._convert(
+                response.status_code, self._payload(response.status_code, response.text)
+            )
+        except Exception:
+            self.errors += 1
+            raise
+
+    async def acall(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """异步调用"""
+        self.requests += 1
+        try:
+            async with (await self._get_async_session()).post(
+                self.url, json=self._body(params), headers=self._headers()
+            ) as response:
+                text = await response.text()
+            return self._convert(response.status, self._payload(response.status, text))
+        except Exception:
+            self.errors += 1
+            raise
+
+    async def astream(self, params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """以增量输出模式流式调用，解析SSE事件并逐个产出统一响应"""
+        self.requests += 1
+        try:
+            async with (await self._get_async_session()).post(
+                self.url,
+                json=self._body(params, stream=True),
+                headers=self._headers(stream=True),
+            ) as response:
+                if response.status != 200:
+                    text = await response.text()
+                    yield self._convert(response.status, self._payload(response.status, text))
+                    return
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8").strip()
+                    if line.startswith("data:"):
+                        yield self._convert(200, json.loads(line[len("data:"):]))
+        except Exception:
+            self.errors += 1
+            raise
+
+    async def aclose(self) -> None:
+        """关闭连接池（包括其他事件循环中创建的会话）"""
+        sessions, self._async_sessions = self._async_sessions, {}
+        for loop, session in sessions.items():
+            await self._close_session(session, loop)
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "client": self.name,
+            "url": self.url,
+            "pool_size": self.pool_size,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+def create_tongyi_client(name: Optional[str] = None, base_url: Optional[str] = None):
+    """根据名称或环境变量创建通义千问客户端
+
+    Args:
+        name: 客户端类型（'http'或'sdk'），为空时读取TONGYI_CLIENT
+        base_url: 接口地址，为空时读取DASHSCOPE_BASE_URL（仅http客户端支持）
+
+    Returns:
+        SDKClient或HTTPClient实例
+    """
+    name = name or os.getenv("TONGYI_CLIENT", "http")
+    if name == SDKClient.name:
+        if base_url:
+            raise ValueError("sdk客户端不支持单独指定接口地址，请使用http客户端")
+        return SDKClient()
+    if name != HTTPClient.name:
+        raise ValueError(f"不支持的通义千问客户端：{name}")
+
+    return HTTPClient(
+        base_url=base_url or os.getenv("DASHSCOPE_BASE_URL", DEFAULT_BASE_URL),
+        pool_size=int(
+            os.getenv("TONGYI_POOL_SIZE", os.getenv("TONGYI_MAX_CONCURRENCY", "32"))
+        ),
+        connect_timeout=float(os.getenv("TONGYI_CONNECT_TIMEOUT", "5")),
+        read_timeout=float(os.getenv("TONGYI_READ_TIMEOUT", "60")),
+        keepalive_expiry=float(os.getenv("TONGYI_KEEPALIVE_EXPIRY", "30")),
+    )
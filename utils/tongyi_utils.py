@@ -1,14 +1,70 @@
-import json
+import asyncio
+import math
 import os
+import re
 import time
-from typing import Any, Dict, List, Optional
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import dashscope
 from dotenv import load_dotenv
 
+from utils.rate_limiter import backoff_delay, create_rate_limiter
+from utils.language_detection import detect_language
+from utils.metrics import (
+    UPSTREAM_BACKEND_REQUESTS,
+    UPSTREAM_HEDGES,
+    UPSTREAM_REQUESTS,
+    UPSTREAM_RETRIES,
+    UPSTREAM_TOKENS,
+    record_stage,
+    stage,
+)
+from utils.model_router import DEFAULT_MODEL, Backend, ModelRouter, create_model_router
+from utils.tongyi_client import create_tongyi_client
+
 # 加载环境变量
 load_dotenv()
 
+# 同时发往通义千问API的最大异步请求数
+MAX_CONCURRENT_REQUESTS = int(os.getenv("TONGYI_MAX_CONCURRENCY", "32"))
+
+# 事件循环 -> 限制上游并发的信号量；信号量绑定首个使用它的事件循环，因此每个循环各用一个
+_api_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+_client = None
+_router: Optional[ModelRouter] = None
+
+# 进程级限流器，所有调用共享（熔断器按模型后端区分，见model_router）
+_rate_limiter = create_rate_limiter()
+
+
+def _get_api_semaphore() -> asyncio.Semaphore:
+    """获取当前事件循环限制上游并发的信号量（每个循环首次使用时创建）"""
+    loop = asyncio.get_running_loop()
+    semaphore = _api_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        _api_semaphores[loop] = semaphore
+    return semaphore
+
+
+def get_tongyi_client():
+    """获取共享的通义千问客户端（首次使用时按TONGYI_CLIENT创建）"""
+    global _client
+    if _client is None:
+        _client = create_tongyi_client()
+    return _client
+
+
+def get_model_router() -> ModelRouter:
+    """获取共享的模型路由器（首次使用时按TONGYI_BACKENDS和TONGYI_ROUTES创建）"""
+    global _router
+    if _router is None:
+        _router = create_model_router(get_tongyi_client())
+    return _router
+
 
 def validate_credentials() -> bool:
     """验证阿里云凭证是否正确设置
@@ -27,20 +83,83 @@ def validate_credentials() -> bool:
     return True
 
 
-def detect_language(text: str) -> str:
-    """检测提供文本的语言
+# 系统提示词中术语和上下文部分的token预算
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1024"))
+# 单条上下文原文/译文的最大字符数，超出部分截断
+CONTEXT_MAX_CHARS = int(os.getenv("PROMPT_CONTEXT_MAX_CHARS", "200"))
+
+_CJK_PATTERN = re.compile(r"[\u3000-\u303f\u3400-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """估算文本的token数
+
+    中日韩字符及全角标点约1字1个token，其余字符约4个字符1个token。
 
     Args:
-        text: 要检测语言的文本
+        text: 要估算的文本
+
+    Returns:
+        估算的token数
+    """
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def estimate_messages_tokens(messages: List[Dict[str, str]]) -> int:
+    """估算消息列表的输入token数（每条消息另计少量格式开销）"""
+    return sum(estimate_tokens(message["content"]) + 4 for message in messages)
+
+
+def _select_terminology(
+    text: str, terminology: List[Dict[str, str]]
+) -> List[Dict[str, str]]:
+    """过滤未在原文中出现的术语，并按相关度排序
+
+    相关度为术语在原文中覆盖的字符数（出现次数 × 长度），
+    出现多、词条长（更具体）的术语排在前面。
+    """
+    folded = text.lower()
+    ranked = []
+    for item in terminology:
+        term = item["term"].strip().lower()
+        if term and term in folded:
+            ranked.append((folded.count(term) * len(term), item))
+    ranked.sort(key=lambda entry: entry[0], reverse=True)
+    return [item for _, item in ranked]
+
+
+def _bigrams(text: str) -> set:
+    folded = text.lower()
+    return {folded[i:i + 2] for i in range(len(folded) - 1)}
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    return text if len(text) <= max_chars else text[:max_chars] + "…"
+
+
+def _select_context(
+    text: str, context: List[Dict[str, str]]
+) -> List[Tuple[int, Dict[str, str]]]:
+    """按与原文的字符二元组重合度排序上下文，越靠后（越新）的条目略微优先
 
     Returns:
-        语言代码 ('en' 或 'zh')
+        按相关度从高到低排列的 (原位置, 已截断的上下文条目)
     """
-    # 简化的启发式方法：检查是否存在中文字符
-    for char in text:
-        if "\u4e00" <= char <= "\u9fff":
-            return "zh"
-    return "en"
+    text_bigrams = _bigrams(text)
+    ranked = []
+    for position, item in enumerate(context):
+        source = item.get("source", "")
+        target = item.get("target", "")
+        source_bigrams = _bigrams(source)
+        overlap = len(text_bigrams & source_bigrams) / (len(source_bigrams) or 1)
+        recency = (position + 1) / len(context)
+        ranked.append((overlap + 0.1 * recency, position, {
+            "source": _truncate(source, CONTEXT_MAX_CHARS),
+            "target": _truncate(target, CONTEXT_MAX_CHARS),
+        }))
+    ranked.sort(key=lambda entry: entry[0], reverse=True)
+    return [(position, item) for _, position, item in ranked]
 
 
 def create_tongyi_messages(
@@ -49,15 +168,20 @@ def create_tongyi_messages(
     target_language: str,
     context: Optional[List[Dict[str, str]]] = None,
     terminology: Optional[List[Dict[str, str]]] = None,
+    token_budget: Optional[int] = None,
 ) -> List[Dict[str, str]]:
     """为通义千问API创建消息格式
 
+    术语和上下文按相关度依次放入系统提示词，总量不超过token预算：
+    原文中未出现的术语会被丢弃，上下文按与原文的重合度挑选并截断过长的条目。
+
     Args:
         text: 要翻译的文本
         source_language: 源语言代码 ('en'、'zh' 或 'auto')
         target_language: 目标语言代码 ('en' 或 'zh')
         context: 上下文的先前翻译
         terminology: 要使用的术语匹配
+        token_budget: 术语和上下文部分的token上限，为空时使用PROMPT_TOKEN_BUDGET
 
     Returns:
         格式化的通义千问API消息
@@ -66,23 +190,37 @@ def create_tongyi_messages(
     if source_language == "auto":
         source_language = detect_language(text)
 
+    budget = PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+
     # 基础系统提示词
     system_content = f"""你是一位专业翻译，专门从事{source_language}到{target_language}的翻译。
 准确翻译提供的文本，同时保持原始含义、语调和格式。
 """
 
-    # 如果有术语指导，则添加
-    if terminology and len(terminology) > 0:
-        terms_str = "\n".join(
-            [f"- {item['term']}: {item['translation']}" for item in terminology]
-        )
+    # 如果有术语指导，则按相关度在预算内添加
+    term_lines = []
+    for item in _select_terminology(text, terminology or []):
+        line = f"- {item['term']}: {item['translation']}"
+        cost = estimate_tokens(line) + 1
+        if cost > budget:
+            break
+        budget -= cost
+        term_lines.append(line)
+    if term_lines:
+        terms_str = "\n".join(term_lines)
         system_content += f"\n在翻译中请一致使用以下术语：\n{terms_str}\n"
 
-    # 如果有上下文指导，则添加
-    if context and len(context) > 0:
-        context_str = "\n".join(
-            [f"'{item['source']}' 被翻译为 '{item['target']}'" for item in context]
-        )
+    # 如果有上下文指导，则用剩余预算挑选最相关的条目，并保持原有顺序
+    selected = []
+    for position, item in _select_context(text, context or []):
+        line = f"'{item['source']}' 被翻译为 '{item['target']}'"
+        cost = estimate_tokens(line) + 1
+        if cost > budget:
+            continue
+        budget -= cost
+        selected.append((position, line))
+    if selected:
+        context_str = "\n".join(line for _, line in sorted(selected))
         system_content += f"\n请与这些先前的翻译保持一致：\n{context_str}\n"
 
     messages = [
@@ -96,52 +234,530 @@ def create_tongyi_messages(
     return messages
 
 
+# 批量翻译时用于分隔片段的编号标记
+BATCH_DELIMITER = "<<<{index}>>>"
+_BATCH_DELIMITER_PATTERN = re.compile(r"<<<(\d+)>>>")
+
+
+def create_tongyi_batch_messages(
+    segments: List[str],
+    source_language: str,
+    target_language: str,
+    context: Optional[List[Dict[str, str]]] = None,
+    terminology: Optional[List[Dict[str, str]]] = None,
+) -> List[Dict[str, str]]:
+    """将多个片段打包为一次通义千问API请求的消息
+
+    Args:
+        segments: 要翻译的片段列表
+        source_language: 源语言代码 ('en'、'zh' 或 'auto')
+        target_language: 目标语言代码 ('en' 或 'zh')
+        context: 上下文的先前翻译
+        terminology: 要使用的术语匹配
+
+    Returns:
+        格式化的通义千问API消息
+    """
+    packed_text = "\n".join(
+        f"{BATCH_DELIMITER.format(index=i + 1)}\n{segment}"
+        for i, segment in enumerate(segments)
+    )
+
+    messages = create_tongyi_messages(
+        text=packed_text,
+        source_language=source_language,
+        target_language=target_language,
+        context=context,
+        terminology=terminology,
+    )
+
+    messages[0]["content"] += (
+        f"\n待翻译文本由{len(segments)}个片段组成，每个片段以<<<编号>>>标记开头。"
+        "请逐段翻译，原样保留每个片段前的编号标记，"
+        "不要合并、拆分或省略任何片段，也不要添加任何额外说明。\n"
+    )
+
+    return messages
+
+
+def split_batch_translation(content: str, count: int) -> Optional[List[str]]:
+    """按编号标记拆分批量翻译结果
+
+    Args:
+        content: 模型返回的翻译文本
+        count: 期望的片段数量
+
+    Returns:
+        按顺序排列的片段译文；无法可靠解析时返回None
+    """
+    parts = _BATCH_DELIMITER_PATTERN.split(content)
+    # split结果形如 [前导文本, 编号1, 译文1, 编号2, 译文2, ...]
+    if len(parts) != 2 * count + 1 or parts[0].strip():
+        return None
+
+    translations = []
+    for i in range(count):
+        if int(parts[2 * i + 1]) != i + 1:
+            return None
+        translations.append(parts[2 * i + 2].strip())
+
+    return translations
+
+
+def _build_request_params(
+    messages: List[Dict[str, str]], model: str = DEFAULT_MODEL
+) -> Dict[str, Any]:
+    """构造通义千问API的调用参数
+
+    Args:
+        messages: 发送到API的消息
+        model: 模型名，路由到其他后端时按后端替换
+
+    Returns:
+        Generation调用参数
+    """
+    return {
+        "model": model,
+        "messages": messages,
+        "result_format": "message",
+        "temperature": 0.3,  # 较低的温度以提高翻译准确性
+        "max_tokens": 4096,
+    }
+
+
+def _estimate_tokens(params: Dict[str, Any]) -> int:
+    """粗略估算一次调用的token用量（输入+输出），用于tokens/分钟限流
+
+    译文长度按与待翻译文本相当估算，调用完成后按实际用量修正。
+    """
+    messages = params["messages"]
+    return estimate_messages_tokens(messages) + estimate_tokens(messages[-1]["content"])
+
+
+def _actual_tokens(usage: Any) -> Optional[int]:
+    """从响应的usage中读取实际token用量"""
+    if not usage:
+        return None
+    try:
+        return int(usage["total_tokens"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _parse_response(
+    response: Dict[str, Any], backend: Backend, estimated_tokens: int = 0
+) -> Optional[Dict[str, Any]]:
+    """解析通义千问API响应，并据此更新限流器和该后端的熔断器
+
+    429视为限流信号，降低请求速率，不改变熔断器状态；5xx计为上游故障；
+    2xx和其他4xx（客户端错误）说明上游可用，重置熔断器的连续失败计数。
+
+    Args:
+        response: 客户端返回的统一响应字典
+        backend: 发出请求的后端
+        estimated_tokens: 调用前预估的token用量
+
+    Returns:
+        成功时返回结果字典，否则返回None
+    """
+    status_code = response["status_code"]
+    UPSTREAM_REQUESTS.inc(status=status_code)
+    if status_code >= 500:
+        backend.breaker.on_failure()
+    elif status_code != 429:
+        backend.breaker.on_success()
+
+    if status_code == 200:
+        _rate_limiter.on_success()
+        _rate_limiter.record_usage(estimated_tokens, _actual_tokens(response["usage"]))
+        _record_usage(response["usage"])
+        return {
+            "success": True,
+            "content": response["content"],
+            "usage": response["usage"],
+            "model": backend.model,
+        }
+
+    if status_code == 429:
+        _rate_limiter.on_throttled()
+    print(f"API错误（{backend.name}）：{response['code']} - {response['message']}")
+    return None
+
+
+def _record_usage(usage: Any) -> None:
+    """累计上游返回的token用量"""
+    if not isinstance(usage, dict):
+        return
+    for kind in ("input_tokens", "output_tokens"):
+        if isinstance(usage.get(kind), int):
+            UPSTREAM_TOKENS.inc(usage[kind], type=kind[:-len("_tokens")])
+
+
+def _record_attempt(
+    backend: Backend,
+    seconds: Optional[float],
+    result: Optional[Dict[str, Any]],
+    estimated_tokens: int,
+) -> None:
+    """记录一次后端调用的结果、耗时和token用量"""
+    tokens = 0
+    if result is not None:
+        tokens = _actual_tokens(result["usage"]) or estimated_tokens
+    backend.record(seconds, result is not None, tokens)
+    UPSTREAM_BACKEND_REQUESTS.inc(
+        backend=backend.name, result="success" if result is not None else "error"
+    )
+
+
+def _failure_reason(response: Optional[Dict[str, Any]]) -> str:
+    """重试原因：throttled（429）、server_error（5xx）、client_error或exception（请求异常）"""
+    if response is None:
+        return "exception"
+    if response["status_code"] == 429:
+        return "throttled"
+    if response["status_code"] >= 500:
+        return "server_error"
+    return "client_error"
+
+
+def _circuit_open_error(backends: List[Backend]) -> str:
+    retry_after = math.ceil(min(backend.breaker.retry_after() for backend in backends))
+    return f"上游服务暂不可用（已熔断），请{retry_after}秒后重试"
+
+
+def upstream_stats() -> Dict[str, Any]:
+    """返回上游客户端、限流器、熔断器和模型路由的状态"""
+    router = get_model_router()
+    return {
+        **get_tongyi_client().stats(),
+        "rate_limiter": _rate_limiter.stats(),
+        # 默认后端的熔断器，各后端的熔断器见router.backends
+        "circuit_breaker": router.default.breaker.stats(),
+        "router": router.stats(),
+    }
+
+
+def _attempt(
+    backend: Backend, params: Dict[str, Any], estimated_tokens: int
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """向一个后端发出一次同步请求
+
+    Returns:
+        (成功时的结果字典或None, 上游响应或None)
+    """
+    with stage("rate_limit_wait"):
+        time.sleep(_rate_limiter.reserve(estimated_tokens))
+
+    response = None
+    result = None
+    start = time.perf_counter()
+    try:
+        with stage("upstream_request"):
+            response = backend.client.call({**params, "model": backend.model})
+        result = _parse_response(response, backend, estimated_tokens)
+
+    except Exception as e:
+        backend.breaker.on_failure()
+        UPSTREAM_REQUESTS.inc(status="error")
+        print(f"调用通义API（{backend.name}）时出错：{str(e)}")
+
+    _record_attempt(backend, time.perf_counter() - start, result, estimated_tokens)
+    return result, response
+
+
 def call_tongyi_api(
-    messages: List[Dict[str, str]], max_retries: int = 3
+    messages: List[Dict[str, str]],
+    max_retries: int = 3,
+    route: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
-    """调用通义千问API，包含重试逻辑
+    """调用通义千问API，包含模型路由、限流、熔断和重试逻辑
+
+    首选后端失败时依次转到其余候选后端；同步调用不做对冲。
 
     Args:
         messages: 发送到API的消息
         max_retries: 最大重试次数
+        route: make_route()构造的路由依据，为空时使用默认后端
 
     Returns:
         API响应
     """
-    retry_count = 0
-    backoff_time = 1
+    router = get_model_router()
+    backends = router.select(route)
+    params = _build_request_params(messages)
+    estimated_tokens = _estimate_tokens(params)
+
+    for attempt in range(max_retries):
+        response = None
+        sent = False
+        for backend in backends:
+            if not backend.breaker.allow():
+                continue
+            if sent:
+                router.record_failover()
+            sent = True
+            result, response = _attempt(backend, params, estimated_tokens)
+            if result is not None:
+                return result
+
+        if not sent:
+            return {"success": False, "error": _circuit_open_error(backends)}
+
+        if attempt + 1 < max_retries:
+            # 带抖动的指数退避
+            UPSTREAM_RETRIES.inc(reason=_failure_reason(response))
+            delay = backoff_delay(attempt)
+            print(f"{delay:.2f}秒后重试...")
+            with stage("backoff"):
+                time.sleep(delay)
+
+    return {"success": False, "error": "超出最大重试次数"}
+
+
+async def _aattempt(
+    backend: Backend, params: Dict[str, Any], estimated_tokens: int
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """向一个后端发出一次异步请求，被取消时按已等待时间记录延迟
 
-    while retry_count < max_retries:
+    Returns:
+        (成功时的结果字典或None, 上游响应或None)
+    """
+    with stage("rate_limit_wait"):
+        await asyncio.sleep(_rate_limiter.reserve(estimated_tokens))
+
+    response = None
+    result = None
+    # 延迟只统计请求发出之后的部分，不含本地排队
+    start = None
+    try:
+        semaphore = _get_api_semaphore()
+        with stage("concurrency_wait"):
+            await semaphore.acquire()
         try:
-            response = dashscope.Generation.call(
-                model="qwen-plus",
-                messages=messages,
-                result_format="message",
-                temperature=0.3,  # 较低的温度以提高翻译准确性
-                max_tokens=4096,
+            start = time.perf_counter()
+            with stage("upstream_request"):
+                response = await backend.client.acall({**params, "model": backend.model})
+        finally:
+            semaphore.release()
+        result = _parse_response(response, backend, estimated_tokens)
+
+    except asyncio.CancelledError:
+        if start is not None:
+            backend.record_cancelled(time.perf_counter() - start)
+            UPSTREAM_BACKEND_REQUESTS.inc(backend=backend.name, result="cancelled")
+        raise
+    except Exception as e:
+        backend.breaker.on_failure()
+        UPSTREAM_REQUESTS.inc(status="error")
+        print(f"调用通义API（{backend.name}）时出错：{str(e)}")
+
+    elapsed = time.perf_counter() - start if start is not None else None
+    _record_attempt(backend, elapsed, result, estimated_tokens)
+    return result, response
+
+
+async def _arace(
+    router: ModelRouter,
+    backends: List[Backend],
+    params: Dict[str, Any],
+    estimated_tokens: int,
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], bool]:
+    """向候选后端发出请求：失败时立即转到下一个候选，
+    首选后端超过其p95延迟仍未返回时向下一个候选发出对冲请求，采用先成功的结果
+
+    Returns:
+        (成功时的结果字典或None, 最后一个上游响应或None, 是否发出过请求)
+    """
+    remaining = iter(backends)
+    tasks: Dict[asyncio.Future, Backend] = {}
+
+    def launch() -> Optional[Backend]:
+        # 跳过熔断中的后端
+        for backend in remaining:
+            if backend.breaker.allow():
+                task = asyncio.ensure_future(_aattempt(backend, params, estimated_tokens))
+                tasks[task] = backend
+                return backend
+        return None
+
+    primary = launch()
+    if primary is None:
+        return None, None, False
+
+    hedge = None
+    hedge_after = None
+    if len(backends) > 1 and router.hedge_ratio > 0:
+        hedge_after = router.hedge_after(primary)
+
+    response = None
+    try:
+        while tasks:
+            done, _ = await asyncio.wait(
+                list(tasks), timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED
             )
+            # 只对冲一次
+            hedge_after = None
+            if not done:
+                if router.try_hedge():
+                    hedge = launch()
+                    if hedge is not None:
+                        UPSTREAM_HEDGES.inc(result="launched")
+                continue
+
+            for task in done:
+                backend = tasks.pop(task)
+                result, response = task.result()
+                if result is not None:
+                    if backend is hedge:
+                        router.record_hedge_win()
+                        UPSTREAM_HEDGES.inc(result="won")
+                    return result, response, True
+
+            # 在途请求全部失败时立即转到下一个候选
+            if not tasks and launch() is not None:
+                router.record_failover()
+    finally:
+        # 已有结果时取消仍在途的请求
+        for task in tasks:
+            task.cancel()
+
+    return None, response, True
+
+
+async def acall_tongyi_api(
+    messages: List[Dict[str, str]],
+    max_retries: int = 3,
+    route: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """call_tongyi_api的异步版本
 
-            if response.status_code == 200:
-                return {
-                    "success": True,
-                    "content": response.output.choices[0].message.content,
-                    "usage": response.usage,
-                }
-            else:
-                print(f"API错误：{response.code} - {response.message}")
+    使用客户端的异步接口，限流等待和退避期间不阻塞事件循环，
+    并通过信号量限制同时在途的上游请求数；慢请求会对冲到下一个候选后端。
 
-        except Exception as e:
-            print(f"调用通义API时出错：{str(e)}")
+    Args:
+        messages: 发送到API的消息
+        max_retries: 最大重试次数
+        route: make_route()构造的路由依据，为空时使用默认后端
 
-        # 指数退避
-        print(f"{backoff_time}秒后重试...")
-        time.sleep(backoff_time)
-        backoff_time *= 2
-        retry_count += 1
+    Returns:
+        API响应
+    """
+    router = get_model_router()
+    backends = router.select(route)
+    params = _build_request_params(messages)
+    estimated_tokens = _estimate_tokens(params)
+
+    for attempt in range(max_retries):
+        result, response, sent = await _arace(router, backends, params, estimated_tokens)
+        if result is not None:
+            return result
+        if not sent:
+            return {"success": False, "error": _circuit_open_error(backends)}
+
+        if attempt + 1 < max_retries:
+            # 带抖动的指数退避
+            UPSTREAM_RETRIES.inc(reason=_failure_reason(response))
+            delay = backoff_delay(attempt)
+            print(f"{delay:.2f}秒后重试...")
+            with stage("backoff"):
+                await asyncio.sleep(delay)
 
     return {"success": False, "error": "超出最大重试次数"}
 
 
+async def astream_tongyi_api(
+    messages: List[Dict[str, str]],
+    max_retries: int = 3,
+    route: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[str]:
+    """以增量输出模式流式调用通义千问API
+
+    只有在尚未产出任何内容时才会重试或转到下一个候选后端，避免客户端收到重复片段；
+    流式调用不做对冲。
+
+    Args:
+        messages: 发送到API的消息
+        max_retries: 最大重试次数
+        route: make_route()构造的路由依据，为空时使用默认后端
+
+    Yields:
+        译文的增量片段
+    """
+    router = get_model_router()
+    backends = router.select(route)
+    params = _build_request_params(messages)
+    estimated_tokens = _estimate_tokens(params)
+
+    for attempt in range(max_retries):
+        last = None
+        sent = False
+        for backend in backends:
+            if not backend.breaker.allow():
+                continue
+            if sent:
+                router.record_failover()
+            sent = True
+            with stage("rate_limit_wait"):
+                await asyncio.sleep(_rate_limiter.reserve(estimated_tokens))
+
+            emitted = False
+            last = None
+            result = None
+            try:
+                async with _get_api_semaphore():
+                    start = time.perf_counter()
+                    async for response in backend.client.astream(
+                        {**params, "model": backend.model}
+                    ):
+                        last = response
+                        if response["status_code"] != 200:
+                            break
+                        if response["content"]:
+                            if not emitted:
+                                record_stage("upstream_first_token", time.perf_counter() - start)
+                            emitted = True
+                            yield response["content"]
+            except Exception as e:
+                backend.breaker.on_failure()
+                UPSTREAM_REQUESTS.inc(status="error")
+                _record_attempt(backend, None, None, estimated_tokens)
+                if emitted:
+                    raise
+                print(f"流式调用通义API（{backend.name}）时出错：{str(e)}")
+                continue
+
+            # 最后一个事件决定调用结果（成功时携带累计用量）；
+            # 流式耗时与输出长度相关，不计入延迟统计
+            if last is None or (not emitted and last["status_code"] == 200):
+                # 没有任何输出的流视为上游故障，转到下一个候选后端或重试，
+                # 不能当作空译文返回
+                backend.breaker.on_failure()
+                UPSTREAM_REQUESTS.inc(status="empty")
+                _record_attempt(backend, None, None, estimated_tokens)
+                print(f"流式调用通义API（{backend.name}）没有返回任何内容")
+                last = None
+                continue
+            result = _parse_response(last, backend, estimated_tokens)
+            _record_attempt(backend, None, result, estimated_tokens)
+            if result is not None:
+                return
+            if emitted:
+                raise Exception(f"API错误：{last['code']} - {last['message']}")
+
+        if not sent:
+            raise Exception(_circuit_open_error(backends))
+
+        if attempt + 1 < max_retries:
+            # 带抖动的指数退避
+            UPSTREAM_RETRIES.inc(reason=_failure_reason(last))
+            delay = backoff_delay(attempt)
+            print(f"{delay:.2f}秒后重试...")
+            with stage("backoff"):
+                await asyncio.sleep(delay)
+
+    raise Exception("翻译失败：超出最大重试次数")
+
+
 def extract_translation(response: Dict[str, Any]) -> str:
     """从API响应中提取翻译文本
 
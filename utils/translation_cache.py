@@ -0,0 +1,278 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+
+class TranslationCache:
+    """翻译结果缓存：内存LRU + TTL，可选SQLite磁盘层"""
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl: float = 86400,
+        db_path: Optional[str] = None,
+    ):
+        """初始化翻译缓存
+
+        Args:
+            max_size: 内存中最多保留的条目数
+            ttl: 条目有效期（秒），小于等于0表示永不过期
+            db_path: SQLite缓存文件路径，为空时不启用磁盘层
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.db_path = db_path
+
+        # key -> (过期时间, 翻译结果, 涉及的术语)
+        self._entries: OrderedDict = OrderedDict()
+        # 术语 -> 使用了该术语的缓存键
+        self._term_index: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._db = None
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "terms TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache_terms ("
+                "term TEXT NOT NULL, key TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_terms ON cache_terms(term)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(
+        text: str,
+        source_language: str,
+        target_language: str,
+        terminology: Optional[List[Dict[str, str]]] = None,
+        context: Optional[List[Dict[str, str]]] = None,
+        route: Optional[str] = None,
+    ) -> str:
+        """根据规范化后的请求生成缓存键
+
+        文本按原样参与计算：缓存的是未去除首尾空白的文本的译文，
+        仅首尾空白不同的输入不能共用同一条目。
+
+        Args:
+            text: 要翻译的文本
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            terminology: 术语匹配
+            context: 上下文翻译
+            route: 显式指定的路由标记，为空时按路由规则选择模型的请求共用同一键
+
+        Returns:
+            缓存键（SHA-256十六进制串）
+        """
+        payload = {
+            "text": text,
+            "source": source_language,
+            "target": target_language,
+            "terminology": sorted(
+                (item["term"], item["translation"]) for item in terminology or []
+            ),
+            "context": [
+                (item.get("source", ""), item.get("target", ""))
+                for item in context or []
+            ],
+        }
+        if route:
+            payload["route"] = route
+        raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存的翻译结果
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            翻译文本，未命中时返回None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._remove(key)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, terms, expires_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if row[2] >= now:
+                        # 提升到内存层
+                        self._insert(key, row[0], json.loads(row[1]), row[2])
+                        self.disk_hits += 1
+                        return row[0]
+                    self._delete_from_disk([key])
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str, terms: Optional[List[str]] = None) -> None:
+        """写入翻译结果
+
+        Args:
+            key: 缓存键
+            value: 翻译文本
+            terms: 影响该结果的术语，用于术语变更时失效
+        """
+        terms = list(terms or [])
+        expires_at = time.time() + self.ttl if self.ttl > 0 else float("inf")
+        with self._lock:
+            self._insert(key, value, terms, expires_at)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, terms, expires_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, value, json.dumps(terms, ensure_ascii=False), expires_at),
+                )
+                self._db.execute("DELETE FROM cache_terms WHERE key = ?", (key,))
+                self._db.executemany(
+                    "INSERT INTO cache_terms (term, key) VALUES (?, ?)",
+                    [(term, key) for term in terms],
+                )
+                self._db.commit()
+
+    def invalidate_term(self, term: str) -> int:
+        """使所有依赖指定术语的缓存条目失效
+
+        Args:
+            term: 发生变更的术语
+
+        Returns:
+            失效的条目数量
+        """
+        return self.invalidate_terms([term])
+
+    def invalidate_terms(self, terms: List[str]) -> int:
+        """使所有依赖任一指定术语的缓存条目失效，磁盘层只提交一次
+
+        Args:
+            terms: 发生变更的术语列表
+
+        Returns:
+            失效的条目数量
+        """
+        with self._lock:
+            keys: Set[str] = set()
+            for term in terms:
+                keys.update(self._term_index.get(term, ()))
+            for key in keys:
+                self._remove(key)
+
+            if self._db is not None:
+                disk_keys = set()
+                for term in dict.fromkeys(terms):
+                    rows = self._db.execute(
+                        "SELECT key FROM cache_terms WHERE term = ?", (term,)
+                    ).fetchall()
+                    disk_keys.update(row[0] for row in rows)
+                self._delete_from_disk(list(disk_keys))
+                keys.update(disk_keys)
+
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """清空全部缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._term_index.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache")
+                self._db.execute("DELETE FROM cache_terms")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """返回缓存统计信息"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "disk_enabled": self._db is not None,
+        }
+
+    def _insert(
+        self, key: str, value: str, terms: List[str], expires_at: float
+    ) -> None:
+        """写入内存层并按LRU淘汰（调用方需持有锁）"""
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, value, terms)
+        for term in terms:
+            self._term_index.setdefault(term, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        """从内存层移除条目（调用方需持有锁）"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for term in entry[2]:
+            keys = self._term_index.get(term)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._term_index[term]
+
+    def _delete_from_disk(self, keys: List[str]) -> None:
+        """从磁盘层删除条目（调用方需持有锁）"""
+        if not keys:
+            return
+        self._db.executemany("DELETE FROM cache WHERE key = ?", [(k,) for k in keys])
+        self._db.executemany(
+            "DELETE FROM cache_terms WHERE key = ?", [(k,) for k in keys]
+        )
+        self._db.commit()
+
+
+def create_translation_cache() -> TranslationCache:
+    """根据环境变量创建翻译缓存
+
+    Returns:
+        已配置的TranslationCache
+    """
+    return TranslationCache(
+        max_size=int(os.getenv("TRANSLATION_CACHE_SIZE", "10000")),
+        ttl=float(os.getenv("TRANSLATION_CACHE_TTL", "86400")),
+        db_path=os.getenv("TRANSLATION_CACHE_DB") or None,
+    )
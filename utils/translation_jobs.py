@@ -0,0 +1,528 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+
+# 片段状态
+PENDING = "pending"
+CLAIMED = "running"
+DONE = "done"
+ERROR = "error"
+
+# 没有可领取的片段时，worker等待新任务或重试时间到达的最长间隔（秒）
+POLL_INTERVAL = 1.0
+
+
+class JobStore:
+    """基于SQLite的批量翻译任务存储
+
+    任务和全部片段在提交时一次性落盘；worker按块领取片段时写入租约到期时间，
+    进程中途退出后，已领取但未完成的片段在租约到期后会被重新领取，
+    已完成的片段不会重复翻译。多个进程共享同一数据库文件时，
+    领取操作在IMMEDIATE事务中执行，同一片段不会被同时领取。
+    """
+
+    def __init__(self, db_path: str):
+        """初始化任务存储
+
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 手动管理事务；WAL模式下进程崩溃不会丢失已提交的事务
+        self._db = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, "
+            "source_language TEXT NOT NULL, target_language TEXT NOT NULL, "
+            "context TEXT, use_terminology INTEGER NOT NULL, separators TEXT, "
+            "glossaries TEXT, route TEXT, total INTEGER NOT NULL, completed INTEGER NOT NULL DEFAULT 0, "
+            "failed INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);"
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "job_id TEXT NOT NULL, idx INTEGER NOT NULL, text TEXT NOT NULL, "
+            "status TEXT NOT NULL, translated_text TEXT, detected_language TEXT, "
+            "error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+            "available_at REAL NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (job_id, idx));"
+            "CREATE INDEX IF NOT EXISTS segments_status ON segments (job_id, status, idx);"
+        )
+        # 旧版本创建的数据库没有glossaries、route列
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        for column in ("glossaries", "route"):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+        self._lock = threading.Lock()
+
+    def create_job(
+        self,
+        segments: List[str],
+        source_language: str,
+        target_language: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        use_terminology: bool = True,
+        separators: Optional[List[str]] = None,
+        glossaries: Optional[List[str]] = None,
+        route: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """创建任务并写入全部片段
+
+        空白片段无需翻译，直接记为完成（译文为原样）。
+
+        Args:
+            segments: 待翻译片段
+            source_language: 源语言代码（'en'、'zh'或'auto'）
+            target_language: 目标语言代码
+            context: 上下文翻译
+            use_terminology: 是否使用术语数据库
+            separators: 文档任务的块间分隔符，用于下载时拼接全文
+            glossaries: 使用的术语表名称，为空时使用默认术语表
+            route: 路由标记，为空时按路由规则选择模型
+
+        Returns:
+            任务信息
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        blank = sum(1 for segment in segments if not segment.strip())
+        rows = (
+            (
+                job_id, index, segment,
+                PENDING if segment.strip() else DONE,
+                None if segment.strip() else segment,
+            )
+            for index, segment in enumerate(segments)
+        )
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO jobs (id, status, source_language, target_language, "
+                    "context, use_terminology, separators, glossaries, route, total, "
+                    "completed, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        job_id,
+                        COMPLETED if blank == len(segments) else QUEUED,
+                        source_language,
+                        target_language,
+                        json.dumps(context or [], ensure_ascii=False),
+                        int(use_terminology),
+                        (
+                            json.dumps(separators, ensure_ascii=False)
+                            if separators is not None
+                            else None
+                        ),
+                        json.dumps(glossaries) if glossaries else None,
+                        route,
+                        len(segments),
+                        blank,
+                        now,
+                        now,
+                    ),
+                )
+                self._db.executemany(
+                    "INSERT INTO segments (job_id, idx, text, status, translated_text) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """返回任务信息，不存在时返回None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status, source_language, target_language, context, "
+                "use_terminology, separators, total, completed, failed, "
+                "created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "source_language": row[2],
+            "target_language": row[3],
+            "context": json.loads(row[4]) if row[4] else [],
+            "use_terminology": bool(row[5]),
+            "separators": json.loads(row[6]) if row[6] else None,
+            "total": row[7],
+            "completed": row[8],
+            "failed": row[9],
+            "created_at": row[10],
+            "updated_at": row[11],
+        }
+
+    def cancel_job(self, job_id: str) -> bool:
+        """取消未完成的任务，已领取的片段完成后不再继续领取"""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                (CANCELLED, time.time(), job_id, QUEUED, RUNNING),
+            )
+        return cursor.rowcount > 0
+
+    def claim(
+        self, limit: int, lease: float
+    ) -> Optional[Tuple[Dict[str, Any], List[Tuple[int, str]]]]:
+        """按任务提交顺序领取一块待翻译片段
+
+        租约已过期的已领取片段（领取它的进程已退出）优先被重新领取。
+
+        Args:
+            limit: 最多领取的片段数
+            lease: 租约时长（秒），超时未完成的片段可被重新领取
+
+        Returns:
+            (任务信息, [(片段下标, 原文)])；没有可领取的片段时返回None
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                job_ids = [
+                    row[0]
+                    for row in self._db.execute(
+                        "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                        (QUEUED, RUNNING),
+                    )
+                ]
+                for job_id in job_ids:
+                    items = self._db.execute(
+                        "SELECT idx, text FROM segments WHERE job_id = ? AND status = ? "
+                        "AND available_at <= ? ORDER BY idx LIMIT ?",
+                        (job_id, CLAIMED, now, limit),
+                    ).fetchall()
+                    if len(items) < limit:
+                        items += self._db.execute(
+                            "SELECT idx, text FROM segments WHERE job_id = ? AND status = ? "
+                            "AND available_at <= ? ORDER BY idx LIMIT ?",
+                            (job_id, PENDING, now, limit - len(items)),
+                        ).fetchall()
+                    if not items:
+                        continue
+                    self._db.executemany(
+                        "UPDATE segments SET status = ?, available_at = ?, "
+                        "attempts = attempts + 1 WHERE job_id = ? AND idx = ?",
+                        [(CLAIMED, now + lease, job_id, idx) for idx, _ in items],
+                    )
+                    self._db.execute(
+                        "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                        (RUNNING, now, job_id, QUEUED),
+                    )
+                    self._db.execute("COMMIT")
+                    return self._job_options(job_id), items
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return None
+
+    def _job_options(self, job_id: str) -> Dict[str, Any]:
+        """读取翻译片段所需的任务参数（调用方需持有锁）"""
+        row = self._db.execute(
+            "SELECT source_language, target_language, context, use_terminology, "
+            "glossaries, route FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        return {
+            "job_id": job_id,
+            "source_language": row[0],
+            "target_language": row[1],
+            "context": json.loads(row[2]) if row[2] else [],
+            "use_terminology": bool(row[3]),
+            "glossaries": json.loads(row[4]) if row[4] else None,
+            "route": row[5],
+        }
+
+    def complete(
+        self,
+        job_id: str,
+        results: List[Tuple[int, Dict[str, Any]]],
+        max_attempts: int,
+        retry_delay: float,
+    ) -> None:
+        """在一个事务中写入一块片段的结果并更新任务进度
+
+        失败的片段在未达到最大尝试次数时放回待领取状态，retry_delay秒后再被领取，
+        上游短时故障（如熔断）不会让整块片段直接失败。
+
+        Args:
+            job_id: 任务ID
+            results: [(片段下标, 批量翻译结果)]
+            max_attempts: 每个片段的最大尝试次数
+            retry_delay: 失败片段重新领取前的等待时间（秒）
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                completed = failed = 0
+                for idx, result in results:
+                    if result["status"] == "success":
+                        cursor = self._db.execute(
+                            "UPDATE segments SET status = ?, translated_text = ?, "
+                            "detected_language = ?, error = NULL "
+                            "WHERE job_id = ? AND idx = ? AND status = ?",
+                            (
+                                DONE, result["translated_text"], result.get("detected_language"),
+                                job_id, idx, CLAIMED,
+                            ),
+                        )
+                        completed += cursor.rowcount
+                        continue
+                    cursor = self._db.execute(
+                        "UPDATE segments SET status = ?, error = ? "
+                        "WHERE job_id = ? AND idx = ? AND status = ? AND attempts >= ?",
+                        (ERROR, result.get("error"), job_id, idx, CLAIMED, max_attempts),
+                    )
+                    failed += cursor.rowcount
+                    if not cursor.rowcount:
+                        self._db.execute(
+                            "UPDATE segments SET status = ?, error = ?, available_at = ? "
+                            "WHERE job_id = ? AND idx = ? AND status = ?",
+                            (PENDING, result.get("error"), now + retry_delay, job_id, idx, CLAIMED),
+                        )
+                self._db.execute(
+                    "UPDATE jobs SET completed = completed + ?, failed = failed + ?, "
+                    "updated_at = ?, status = CASE "
+                    "WHEN status = ? AND completed + failed + ? >= total THEN ? "
+                    "ELSE status END WHERE id = ?",
+                    (completed, failed, now, RUNNING, completed + failed, COMPLETED, job_id),
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def results(
+        self, job_id: str, offset: int = 0, limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """按片段下标分页返回结果，未完成的片段status为pending或running"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT idx, status, translated_text, detected_language, error "
+                "FROM segments WHERE job_id = ? AND idx >= ? ORDER BY idx LIMIT ?",
+                (job_id, offset, limit),
+            ).fetchall()
+        return [
+            {
+                "index": idx,
+                "status": status,
+                "translated_text": translated_text,
+                "detected_language": detected_language,
+                "error": error if status == ERROR else None,
+            }
+            for idx, status, translated_text, detected_language, error in rows
+        ]
+
+    def iter_results(self, job_id: str, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """逐页遍历全部结果，用于流式下载"""
+        offset = 0
+        while True:
+            page = self.results(job_id, offset, page_size)
+            if not page:
+                return
+            yield from page
+            offset = page[-1]["index"] + 1
+
+    def translations(self, job_id: str) -> List[str]:
+        """按顺序返回全部译文，未成功翻译的片段保留原文"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT COALESCE(translated_text, text) FROM segments "
+                "WHERE job_id = ? ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def wait_seconds(self) -> Optional[float]:
+        """距离最早一个可重新领取的片段还有多少秒，没有未完成任务时返回None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(s.available_at) FROM segments s JOIN jobs j ON j.id = s.job_id "
+                "WHERE j.status IN (?, ?) AND s.status IN (?, ?)",
+                (QUEUED, RUNNING, PENDING, CLAIMED),
+            ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class JobRunner:
+    """批量翻译任务执行器：固定数量的worker从任务存储中按块领取片段，
+    交给TranslationTool.abatch_translate打包翻译
+
+    worker数量决定同时在途的批量调用数，上游速率由进程级限流器控制，
+    worker数足够时吞吐会稳定在配额上限附近。
+    """
+
+    def __init__(
+        self,
+        tool: Any,
+        store: JobStore,
+        workers: int = 8,
+        chunk_size: int = 20,
+        max_attempts: int = 3,
+        lease: float = 300.0,
+        retry_delay: float = 30.0,
+    ):
+        """初始化执行器
+
+        Args:
+            tool: TranslationTool实例
+            store: 任务存储
+            workers: 并发worker数
+            chunk_size: 每次领取的片段数
+            max_attempts: 每个片段的最大尝试次数
+            lease: 领取租约（秒），应大于一次批量调用（含重试）的最长耗时
+            retry_delay: 失败片段重新领取前的等待时间（秒）
+        """
+        self.tool = tool
+        self.store = store
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.retry_delay = retry_delay
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        """启动worker；数据库中未完成的任务会被自动续跑"""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.get_running_loop().create_task(self._worker())
+            for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """停止worker，已领取未完成的片段在租约到期后由下次启动的进程重新领取"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(
+        self,
+        segments: List[str],
+        source_language: str,
+        target_language: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        use_terminology: bool = True,
+        separators: Optional[List[str]] = None,
+        glossaries: Optional[List[str]] = None,
+        route: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """提交任务，落盘后立即返回，由worker在后台翻译"""
+        job = await asyncio.to_thread(
+            self.store.create_job,
+            segments,
+            source_language,
+            target_language,
+            context,
+            use_terminology,
+            separators,
+            glossaries,
+            route,
+        )
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def _idle(self) -> None:
+        """等待新任务提交或最早的重试时间到达"""
+        wait = await asyncio.to_thread(self.store.wait_seconds)
+        timeout = POLL_INTERVAL if wait is None else min(max(wait, 0.05), POLL_INTERVAL)
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                claimed = await asyncio.to_thread(self.store.claim, self.chunk_size, self.lease)
+                if claimed is None:
+                    await self._idle()
+                    continue
+
+                job, items = claimed
+                try:
+                    results = await self.tool.abatch_translate(
+                        segments=[text for _, text in items],
+                        source_language=job["source_language"],
+                        target_language=job["target_language"],
+                        context=job["context"],
+                        use_terminology=job["use_terminology"],
+                        glossaries=job["glossaries"],
+                        route=job["route"],
+                    )
+                except Exception as e:
+                    print(f"批量任务翻译错误：{str(e)}")
+                    results = [{"status": "error", "error": str(e)} for _ in items]
+
+                await asyncio.to_thread(
+                    self.store.complete,
+                    job["job_id"],
+                    [(idx, result) for (idx, _), result in zip(items, results)],
+                    self.max_attempts,
+                    self.retry_delay,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 存储异常（如数据库被锁）不应让worker退出
+                print(f"批量任务worker错误：{str(e)}")
+                await asyncio.sleep(POLL_INTERVAL)
+
+
+def create_job_runner(tool: Any) -> Optional[JobRunner]:
+    """根据环境变量创建批量任务执行器
+
+    Returns:
+        已配置的JobRunner；JOB_WORKERS为0时返回None
+    """
+    workers = int(os.getenv("JOB_WORKERS", "8"))
+    if workers <= 0:
+        return None
+    return JobRunner(
+        tool,
+        JobStore(os.getenv("JOB_DB", "data/jobs.db")),
+        workers=workers,
+        chunk_size=int(os.getenv("JOB_CHUNK_SIZE", "20")),
+        max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+        lease=float(os.getenv("JOB_LEASE_SECONDS", "300")),
+        retry_delay=float(os.getenv("JOB_RETRY_DELAY", "30")),
+    )
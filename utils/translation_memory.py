@@ -0,0 +1,401 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from utils.term_matcher import TermMatcher, fold_case
+
+# 与术语库相同的字符n-gram哈希空间
+N_FEATURES = 2 ** 18
+# 每次查询做精确相似度复核的候选数
+CANDIDATES = 5
+# 未合并的新条目超过该数量时合并进主矩阵
+MERGE_MIN_PENDING = 256
+# 失效的术语达到该数量时改为用自动机逐条扫描，不再逐个术语做子串筛选
+INVALIDATE_SCAN_TERMS = 256
+# 未指定术语范围时的默认范围（使用默认术语表）
+DEFAULT_SCOPE = "default"
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_NUMBER_PATTERN = re.compile(r"\d+(?:[.,:]\d+)*")
+
+
+def _normalize(text: str) -> str:
+    """规范化片段：去除首尾空白并合并连续空白"""
+    return _WHITESPACE_PATTERN.sub(" ", text.strip())
+
+
+class _MemoryShard:
+    """单个语言对、单个术语范围的翻译记忆"""
+
+    def __init__(self):
+        self.sources: List[str] = []
+        self.targets: List[Optional[str]] = []
+        # 规范化原文 -> 行号，用于精确匹配和去重
+        self.rows: Dict[str, int] = {}
+        self.matrix = sp.csr_matrix((0, N_FEATURES), dtype=np.float64)
+        self.pending: List[sp.csr_matrix] = []
+        self.dead = 0
+        # 最早的未淘汰条目的行号
+        self.head = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.rows)
+
+
+class TranslationMemory:
+    """翻译记忆：按字符n-gram索引历史译文，复用高度相似片段的翻译
+
+    候选片段先用哈希n-gram向量的余弦相似度召回，再用编辑距离比
+    （difflib.SequenceMatcher）复核得到最终匹配度，与CAT工具的模糊匹配口径一致。
+    匹配度达到reuse_threshold时直接复用译文；介于hint_threshold与
+    reuse_threshold之间时作为参考译文传入上下文。
+
+    条目按 (源语言, 目标语言, 术语范围) 分片，术语范围标识翻译时使用的术语表组合，
+    在一组术语表下得到的译文不会被复用到使用其他术语表的请求。
+    """
+
+    def __init__(
+        self,
+        max_size: int = 50000,
+        reuse_threshold: float = 0.95,
+        hint_threshold: float = 0.75,
+        db_path: Optional[str] = None,
+    ):
+        """初始化翻译记忆
+
+        Args:
+            max_size: 每个语言对最多保留的条目数，超出时淘汰最早的条目
+            reuse_threshold: 直接复用译文的最低匹配度 (0-1)
+            hint_threshold: 作为参考译文的最低匹配度 (0-1)
+            db_path: SQLite持久化文件路径，为空时只保存在内存中
+        """
+        self.max_size = max_size
+        self.reuse_threshold = reuse_threshold
+        self.hint_threshold = hint_threshold
+        self.db_path = db_path
+
+        self.vectorizer = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=(2, 4),
+            n_features=N_FEATURES,
+            alternate_sign=False,
+        )
+        # (源语言, 目标语言, 术语范围) -> 记忆分片
+        self._shards: Dict[Tuple[str, str, str], _MemoryShard] = {}
+        self._lock = threading.Lock()
+
+        self.reuses = 0
+        self.hints = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._create_table()
+            self._load()
+
+    def _create_table(self) -> None:
+        """创建持久化表；旧版本没有scope列的表迁移为默认术语范围"""
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(memory)")]
+        with self._db:
+            if columns and "scope" not in columns:
+                self._db.execute("ALTER TABLE memory RENAME TO memory_old")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS memory ("
+                "source_language TEXT NOT NULL, target_language TEXT NOT NULL, "
+                "scope TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "PRIMARY KEY (source_language, target_language, scope, source))"
+            )
+            if columns and "scope" not in columns:
+                self._db.execute(
+                    "INSERT INTO memory SELECT source_language, target_language, ?, "
+                    "source, target, created_at FROM memory_old",
+                    (DEFAULT_SCOPE,),
+                )
+                self._db.execute("DROP TABLE memory_old")
+
+    def _load(self) -> None:
+        """从SQLite加载已持久化的条目"""
+        rows = self._db.execute(
+            "SELECT source_language, target_language, scope, source, target FROM memory "
+            "ORDER BY created_at"
+        ).fetchall()
+        grouped: Dict[Tuple[str, str, str], List[Tuple[str, str]]] = {}
+        for source_language, target_language, scope, source, target in rows:
+            grouped.setdefault((source_language, target_language, scope), []).append(
+                (source, target)
+            )
+
+        with self._lock:
+            for pair, entries in grouped.items():
+                shard = self._shards.setdefault(pair, _MemoryShard())
+                for source, target in entries[-self.max_size:]:
+                    shard.rows[source] = len(shard.sources)
+                    shard.sources.append(source)
+                    shard.targets.append(target)
+                if shard.sources:
+                    shard.matrix = self.vectorizer.transform(shard.sources).tocsr()
+
+        print(f"已加载{len(rows)}条翻译记忆")
+
+    def lookup(
+        self,
+        text: str,
+        source_language: str,
+        target_language: str,
+        scope: str = DEFAULT_SCOPE,
+    ) -> Optional[Dict[str, Any]]:
+        """查找最相似的历史片段
+
+        Args:
+            text: 要翻译的文本
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            scope: 术语范围，只在相同范围内的条目中查找
+
+        Returns:
+            {"source", "target", "score", "reuse"}，reuse表示可直接复用；
+            没有达到hint_threshold的匹配时返回None
+        """
+        key = _normalize(text)
+        if not key:
+            return None
+
+        with self._lock:
+            shard = self._shards.get((source_language, target_language, scope))
+            match = self._best_match(shard, key) if shard else None
+
+            if match is None or match["score"] < self.hint_threshold:
+                self.misses += 1
+                return None
+
+            # 数字不一致时（如版本号、金额）不能直接复用
+            match["reuse"] = match["score"] >= self.reuse_threshold and (
+                _NUMBER_PATTERN.findall(key) == _NUMBER_PATTERN.findall(match["source"])
+            )
+            if match["reuse"]:
+                self.reuses += 1
+            else:
+                self.hints += 1
+            return match
+
+    def _best_match(self, shard: _MemoryShard, key: str) -> Optional[Dict[str, Any]]:
+        """在分片中召回候选并复核匹配度（调用方需持有锁）"""
+        row = shard.rows.get(key)
+        if row is not None:
+            return {"source": key, "target": shard.targets[row], "score": 1.0}
+        if not shard.size:
+            return None
+
+        # 稠密查询向量与CSR矩阵相乘只遍历矩阵非零元，避免稀疏乘法的转置开销
+        query = self.vectorizer.transform([key]).toarray().ravel()
+        scores = shard.matrix @ query
+        if shard.pending:
+            # 把零散的新条目压成一个矩阵，后续查询不必每次重新拼接
+            if len(shard.pending) > 1:
+                shard.pending = [sp.vstack(shard.pending, format="csr")]
+            scores = np.concatenate([scores, shard.pending[0] @ query])
+
+        count = min(CANDIDATES, len(scores))
+        candidates = np.argpartition(-scores, count - 1)[:count]
+
+        best = None
+        for row in candidates:
+            # 余弦相似度过低的候选编辑距离比也不会达标
+            if scores[row] <= 0 or shard.targets[row] is None:
+                continue
+            source = shard.sources[row]
+            ratio = SequenceMatcher(None, key, source, autojunk=False).ratio()
+            if best is None or ratio > best["score"]:
+                best = {"source": source, "target": shard.targets[row], "score": ratio}
+        return best
+
+    def add(
+        self,
+        text: str,
+        translation: str,
+        source_language: str,
+        target_language: str,
+        scope: str = DEFAULT_SCOPE,
+    ) -> None:
+        """记录一条成功的翻译
+
+        Args:
+            text: 原文
+            translation: 译文
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            scope: 翻译时使用的术语范围
+        """
+        key = _normalize(text)
+        if not key or not translation:
+            return
+
+        with self._lock:
+            shard = self._shards.setdefault(
+                (source_language, target_language, scope), _MemoryShard()
+            )
+            row = shard.rows.get(key)
+            if row is not None:
+                shard.targets[row] = translation
+            else:
+                shard.rows[key] = len(shard.sources)
+                shard.sources.append(key)
+                shard.targets.append(translation)
+                shard.pending.append(self.vectorizer.transform([key]))
+                self._evict(shard)
+                if len(shard.sources) - shard.matrix.shape[0] >= MERGE_MIN_PENDING:
+                    self._merge(shard)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO memory "
+                    "(source_language, target_language, scope, source, target, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (source_language, target_language, scope, key, translation, time.time()),
+                )
+                self._db.commit()
+
+    def invalidate_term(self, term: str) -> int:
+        """删除原文包含指定术语的条目，避免复用术语变更前的译文
+
+        Args:
+            term: 发生变更的术语
+
+        Returns:
+            删除的条目数量
+        """
+        return self.invalidate_terms([term])
+
+    def invalidate_terms(self, terms: List[str]) -> int:
+        """删除原文包含任一指定术语的条目，整批只遍历一次记忆
+
+        匹配口径与术语精确匹配一致（忽略大小写，英文术语要求落在词边界上）。
+        术语较少时先按子串筛选候选再用自动机确认；术语较多时用自动机
+        逐条扫描，耗时只与记忆条目数有关，与术语数无关。
+
+        Args:
+            terms: 发生变更的术语列表
+
+        Returns:
+            删除的条目数量
+        """
+        needles = list(dict.fromkeys(fold_case(term.strip()) for term in terms if term.strip()))
+        if not needles:
+            return 0
+        matcher = TermMatcher(needles)
+        scan = len(needles) >= INVALIDATE_SCAN_TERMS
+
+        removed = 0
+        with self._lock:
+            for (source_language, target_language, scope), shard in self._shards.items():
+                candidates = list(shard.rows)
+                if not scan:
+                    candidates = [
+                        key for key, folded in ((key, fold_case(key)) for key in candidates)
+                        if any(needle in folded for needle in needles)
+                    ]
+                keys = [key for key in candidates if matcher.find_all(key)]
+                for key in keys:
+                    self._remove(shard, key)
+                if keys and self._db is not None:
+                    self._db.executemany(
+                        "DELETE FROM memory WHERE source_language = ? "
+                        "AND target_language = ? AND scope = ? AND source = ?",
+                        [(source_language, target_language, scope, key) for key in keys],
+                    )
+                    self._db.commit()
+                removed += len(keys)
+                self._maybe_rebuild(shard)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """返回翻译记忆统计信息"""
+        lookups = self.reuses + self.hints + self.misses
+        return {
+            "size": sum(shard.size for shard in self._shards.values()),
+            "language_pairs": len({pair[:2] for pair in self._shards}),
+            "scopes": len({pair[2] for pair in self._shards}),
+            "reuses": self.reuses,
+            "hints": self.hints,
+            "misses": self.misses,
+            "reuse_rate": self.reuses / lookups if lookups else 0.0,
+            "reuse_threshold": self.reuse_threshold,
+            "hint_threshold": self.hint_threshold,
+            "disk_enabled": self._db is not None,
+        }
+
+    def _remove(self, shard: _MemoryShard, key: str) -> None:
+        """将条目标记为删除（调用方需持有锁）"""
+        row = shard.rows.pop(key, None)
+        if row is not None:
+            shard.targets[row] = None
+            shard.dead += 1
+
+    def _evict(self, shard: _MemoryShard) -> None:
+        """超出容量时淘汰最早的条目（调用方需持有锁）
+
+        只淘汰内存副本，磁盘中的条目在下次加载时按容量截断。
+        """
+        while shard.size > self.max_size:
+            while shard.targets[shard.head] is None:
+                shard.head += 1
+            self._remove(shard, shard.sources[shard.head])
+        self._maybe_rebuild(shard)
+
+    def _merge(self, shard: _MemoryShard) -> None:
+        """将未合并的新条目并入主矩阵（调用方需持有锁）"""
+        if shard.pending:
+            shard.matrix = sp.vstack([shard.matrix] + shard.pending, format="csr")
+            shard.pending = []
+
+    def _maybe_rebuild(self, shard: _MemoryShard) -> None:
+        """删除的条目过多时重建分片，回收空间（调用方需持有锁）"""
+        if shard.dead <= max(MERGE_MIN_PENDING, len(shard.sources) // 2):
+            return
+
+        alive = [
+            (source, target)
+            for source, target in zip(shard.sources, shard.targets)
+            if target is not None
+        ]
+        shard.sources = [source for source, _ in alive]
+        shard.targets = [target for _, target in alive]
+        shard.rows = {source: row for row, source in enumerate(shard.sources)}
+        shard.pending = []
+        shard.dead = 0
+        shard.head = 0
+        if shard.sources:
+            shard.matrix = self.vectorizer.transform(shard.sources).tocsr()
+        else:
+            shard.matrix = sp.csr_matrix((0, N_FEATURES), dtype=np.float64)
+
+
+def create_translation_memory() -> Optional[TranslationMemory]:
+    """根据环境变量创建翻译记忆
+
+    Returns:
+        已配置的TranslationMemory；TRANSLATION_MEMORY_SIZE为0时返回None
+    """
+    max_size = int(os.getenv("TRANSLATION_MEMORY_SIZE", "50000"))
+    if max_size <= 0:
+        return None
+    return TranslationMemory(
+        max_size=max_size,
+        reuse_threshold=float(os.getenv("TRANSLATION_MEMORY_REUSE", "0.95")),
+        hint_threshold=float(os.getenv("TRANSLATION_MEMORY_HINT", "0.75")),
+        db_path=os.getenv("TRANSLATION_MEMORY_DB") or None,
+    )